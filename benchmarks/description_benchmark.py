@@ -0,0 +1,59 @@
+#
+# description_benchmark.py
+#
+# Measures feed parse time with descriptions cleaned eagerly by BeautifulSoup (the original approach) against
+# raw descriptions cleaned lazily, plus the cost of the first access to a cleaned description.
+#
+# usage: python -m benchmarks.description_benchmark [--items 3000] [--description-bytes 3000]
+#
+
+import argparse
+import os
+import tempfile
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks.feed_parser_benchmark import write_synthetic_feed
+from tuipod.models.feed_parser import FeedParser
+
+
+def parse(path: str) -> list:
+    """parse a feed file into episodes"""
+    with open(path, "rb") as feed:
+        return [e for batch in FeedParser().parse(feed) for e in batch]
+
+
+def main() -> None:
+    """time eager and lazy description handling"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=3000)
+    parser.add_argument("--description-bytes", type=int, default=3000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "feed.xml")
+        write_synthetic_feed(path, args.items, args.description_bytes)
+
+        started = time.perf_counter()
+        episodes = parse(path)
+        for e in episodes:
+            BeautifulSoup(e.raw_description, "html.parser").get_text()
+        eager = time.perf_counter() - started
+
+        started = time.perf_counter()
+        episodes = parse(path)
+        lazy = time.perf_counter() - started
+
+        started = time.perf_counter()
+        episodes[0].description
+        first_access = time.perf_counter() - started
+
+    print("{0} items, {1} byte descriptions".format(args.items, args.description_bytes))
+    print("parse + eager BeautifulSoup cleaning: {0:9.1f} ms".format(eager * 1000))
+    print("parse, descriptions kept raw:         {0:9.1f} ms ({1:.1f}x faster)".format(lazy * 1000, eager / lazy))
+    print("first access to one description:      {0:9.3f} ms".format(first_access * 1000))
+
+
+if __name__ == "__main__":
+    main()
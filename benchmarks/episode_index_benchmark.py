@@ -0,0 +1,71 @@
+#
+# episode_index_benchmark.py
+#
+# Builds a local episode index over many synthetic podcasts/episodes, then measures query latency for typical
+# searches (including as-you-type prefixes) and the cost of an incremental re-index.
+#
+# usage: python -m benchmarks.episode_index_benchmark [--podcasts 100] [--episodes 1000]
+#
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from tuipod.models.episode import Episode
+from tuipod.models.episode_index import EpisodeIndex
+from tuipod.models.podcast import Podcast
+
+WORDS = ("garden tomato history science music python travel economy space ocean film poetry chess coffee "
+         "design health climate robots language football astronomy cooking philosophy jazz startup").split()
+
+
+def make_podcast(number: int, episode_count: int, rng: random.Random) -> Podcast:
+    """a podcast full of episodes with randomly worded titles and descriptions"""
+    p = Podcast("Podcast {0}".format(number), "https://localhost/{0}/feed".format(number), "")
+    for i in range(episode_count):
+        title = " ".join(rng.choice(WORDS) for _ in range(5))
+        description = "<p>" + " ".join(rng.choice(WORDS) for _ in range(60)) + "</p>"
+        p.add_episode(Episode(title, "https://localhost/{0}/{1}.mp3".format(number, i), description, "", 0))
+    return p
+
+
+def main() -> None:
+    """index, then query"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--podcasts", type=int, default=100)
+    parser.add_argument("--episodes", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    podcasts = [make_podcast(n, args.episodes, rng) for n in range(args.podcasts)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = EpisodeIndex(os.path.join(directory, "episodes.db"))
+
+        started = time.perf_counter()
+        for p in podcasts:
+            index.index_podcast(p)
+        print("indexed {0} episodes in {1:.1f} s".format(args.podcasts * args.episodes, time.perf_counter() - started))
+
+        started = time.perf_counter()
+        unchanged = index.index_podcast(podcasts[0])
+        print("re-index of an unchanged {0}-episode podcast: {1:.1f} ms ({2} written)".format(
+            args.episodes, (time.perf_counter() - started) * 1000, unchanged))
+
+        for query in ("tomato", "jazz coffee", "astro", "philosophy chess space", "zzz"):
+            timings = []
+            for _ in range(20):
+                started = time.perf_counter()
+                results = index.search(query)
+                timings.append((time.perf_counter() - started) * 1000)
+            print("{0:>24}: median {1:6.2f} ms, max {2:6.2f} ms, {3} results".format(
+                repr(query), statistics.median(timings), max(timings), len(results)))
+
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
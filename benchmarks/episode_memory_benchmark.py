@@ -0,0 +1,86 @@
+#
+# episode_memory_benchmark.py
+#
+# Measures the per-episode memory footprint of the original episode representation (per-instance __dict__, a
+# random uuid4 id, a remembered cleaned description, and playback fields) against the slotted episode.
+#
+# Feed strings (title, URL, raw description, ...) are created before measuring, since both representations
+# keep them; descriptions are read once, as indexing subscribed episodes does.
+#
+# usage: python -m benchmarks.episode_memory_benchmark [--episodes 100000]
+#
+
+import argparse
+import gc
+import tracemalloc
+import uuid
+
+from tuipod.models.episode import Episode, html_to_text
+
+
+class LegacyEpisode:
+    """the original episode representation"""
+
+    def __init__(self, title: str, url: str, description: str, pubdate: str, duration: int, guid: str = None) -> None:
+        self.id = uuid.uuid4().hex
+        self.title = title
+        self.url = url
+        self.raw_description = description
+        self._description = None
+        self.pubdate = pubdate
+        self.duration = duration
+        self.guid = guid
+        self.current_position = 0
+        self.source = None
+        self.stream = None
+        self.device = None
+        self.is_playing = False
+
+    @property
+    def description(self) -> str:
+        if self._description is None:
+            self._description = html_to_text.__wrapped__(self.raw_description)
+        return self._description
+
+
+def feed_details(count: int) -> list:
+    """the strings a feed parser would produce for each episode (guid is the enclosure URL, as is common)"""
+    details = []
+    for i in range(count):
+        url = "https://localhost/podcast/episodes/{0}.mp3".format(i)
+        description = "<p>Episode {0}: show notes, <b>links</b> &amp; credits for this week's episode.</p>".format(i)
+        details.append(("Episode {0}: a title of typical length".format(i), url, description,
+                        "Mon, 01 Jan 2024 12:00:00 +0000", "00:45:00", "".join(url)))
+    return details
+
+
+def measure(cls, details: list) -> float:
+    """bytes allocated per episode to build the episodes (and read each description once)"""
+    gc.collect()
+    tracemalloc.start()
+    episodes = [cls(*d) for d in details]
+    for e in episodes:
+        e.description
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated / len(details)
+
+
+def main() -> None:
+    """compare footprints"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--episodes", type=int, default=100000)
+    args = parser.parse_args()
+
+    details = feed_details(args.episodes)
+
+    legacy = measure(LegacyEpisode, details)
+    slotted = measure(Episode, details)
+
+    print("{0} episodes".format(args.episodes))
+    print("original episode: {0:7.0f} bytes/episode".format(legacy))
+    print("slotted episode:  {0:7.0f} bytes/episode ({1:.0f}% smaller)".format(slotted, 100 * (1 - slotted / legacy)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#
+# feed_parser_benchmark.py
+#
+# Compares the original read-everything feed parse against the streaming FeedParser on large synthetic feeds,
+# reporting time-to-first-batch, total time and peak memory (traced Python allocations and process max RSS).
+#
+# usage: python -m benchmarks.feed_parser_benchmark [--items 2000 5000] [--description-bytes 3000]
+#
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+import xml.etree.ElementTree as ET
+
+from bs4 import BeautifulSoup
+
+from tuipod.models.podcast import Podcast
+
+
+def write_synthetic_feed(path: str, items: int, description_bytes: int) -> None:
+    """write an RSS feed with the given number of items, each carrying a padded HTML description"""
+    filler = ("<p>Lorem ipsum <b>dolor</b> sit amet, consectetur adipiscing elit.</p>" * (description_bytes // 70 + 1))[:description_bytes]
+    with open(path, "wt", encoding="utf-8") as feed:
+        feed.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        feed.write('<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd"><channel>\n')
+        feed.write("<title>Synthetic Feed</title>\n")
+        for i in range(items):
+            feed.write("<item>")
+            feed.write("<title>Episode {0}</title>".format(i))
+            feed.write('<enclosure url="https://localhost/episodes/{0}.mp3" type="audio/mpeg" length="1"/>'.format(i))
+            feed.write("<description><![CDATA[{0}]]></description>".format(filler))
+            feed.write("<pubDate>Mon, 01 Jan 2024 12:00:00 +0000</pubDate>")
+            feed.write("<itunes:duration>01:00:00</itunes:duration>")
+            feed.write("</item>\n")
+        feed.write("</channel></rss>\n")
+
+
+def legacy_parse(url: str):
+    """the original approach: read the whole body, build the whole tree, then walk it"""
+    with urllib.request.urlopen(url) as response:
+        result = response.read()
+
+    episodes = []
+    for e in ET.fromstring(result).iter("item"):
+        enclosure = e.find("enclosure")
+        if not enclosure is None:
+            raw_description = e.find("description").text
+            description = BeautifulSoup(raw_description, "html.parser").get_text() if raw_description else ""
+            episodes.append((e.find("title").text, enclosure.attrib["url"], description, e.find("pubDate").text))
+
+    yield episodes
+
+
+def streaming_parse(url: str):
+    """the streaming approach: batches of episodes as their items close"""
+    yield from Podcast("benchmark", url, "").stream_episode_list()
+
+
+def measure(mode: str, url: str) -> dict:
+    """run one parse mode and report its timings and memory high-water marks"""
+    parse = legacy_parse if mode == "legacy" else streaming_parse
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    first_batch = None
+    count = 0
+
+    for batch in parse(url):
+        if first_batch is None:
+            first_batch = time.perf_counter() - started
+        count += len(batch)
+
+    total = time.perf_counter() - started
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mode": mode,
+        "episodes": count,
+        "first_batch_ms": round(first_batch * 1000, 1),
+        "total_ms": round(total * 1000, 1),
+        "traced_peak_mb": round(traced_peak / 1024 / 1024, 1),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+
+def main() -> None:
+    """generate the feeds, then measure each mode in a fresh interpreter so max RSS isn't shared"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, nargs="+", default=[2000, 5000])
+    parser.add_argument("--description-bytes", type=int, default=3000)
+    parser.add_argument("--measure", nargs=2, metavar=("MODE", "URL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("{0:>7} {1:>9} {2:>10} {3:>15} {4:>10} {5:>16} {6:>12}".format(
+            "items", "feed MB", "mode", "first batch ms", "total ms", "traced peak MB", "max RSS MB"))
+
+        for items in args.items:
+            path = os.path.join(directory, "feed-{0}.xml".format(items))
+            write_synthetic_feed(path, items, args.description_bytes)
+            url = "file://" + urllib.request.pathname2url(os.path.abspath(path))
+            size = os.path.getsize(path) / 1024 / 1024
+
+            for mode in ("legacy", "streaming"):
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.feed_parser_benchmark", "--measure", mode, url],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                result = json.loads(output)
+                print("{0:>7} {1:>9.1f} {2:>10} {3:>15} {4:>10} {5:>16} {6:>12}".format(
+                    items, size, mode, result["first_batch_ms"], result["total_ms"],
+                    result["traced_peak_mb"], result["max_rss_mb"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#
+# row_lookup_benchmark.py
+#
+# Simulates holding the arrow key down through a large episode list: one row-highlight lookup per row, comparing
+# the original JSON row keys plus linear scan against the id-keyed registry.
+#
+# usage: python -m benchmarks.row_lookup_benchmark [--episodes 5000]
+#
+
+import argparse
+import json
+import time
+
+from tuipod.models.episode import Episode
+from tuipod.models.podcast import Podcast
+
+
+def make_podcast(episode_count: int) -> Podcast:
+    """a podcast with the given number of episodes"""
+    p = Podcast("benchmark", "https://localhost/feed", "")
+    for i in range(episode_count):
+        p.add_episode(Episode("Episode {0}".format(i), "https://localhost/episodes/{0}.mp3".format(i), "", "", 0))
+    return p
+
+
+def legacy_walk(episodes: [Episode]) -> float:
+    """the original approach: JSON row keys, decoded and matched by a linear scan on every highlight"""
+    row_keys = [json.dumps((e.id, e.url)) for e in episodes]
+
+    started = time.perf_counter()
+    for row_key in row_keys:
+        episode_id = json.loads(row_key)[0]
+        for e in episodes:
+            if e.id == episode_id:
+                break
+    return time.perf_counter() - started
+
+
+def registry_walk(episodes: [Episode]) -> float:
+    """the registry approach: the row key is the id, looked up directly"""
+    registry = {e.id: e for e in episodes}
+    row_keys = [e.id for e in episodes]
+
+    started = time.perf_counter()
+    for row_key in row_keys:
+        registry.get(row_key)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    """walk every row of each list size with both approaches"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--episodes", type=int, nargs="+", default=[500, 5000])
+    args = parser.parse_args()
+
+    print("{0:>9} {1:>10} {2:>16} {3:>16}".format("episodes", "mode", "total ms", "per row us"))
+    for count in args.episodes:
+        episodes = make_podcast(count).episodes
+        for mode, walk in (("legacy", legacy_walk), ("registry", registry_walk)):
+            elapsed = walk(episodes)
+            print("{0:>9} {1:>10} {2:>16.2f} {3:>16.3f}".format(count, mode, elapsed * 1000, elapsed / count * 1000000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#
+# startup_benchmark.py
+#
+# Measures application startup: the import time of the app module (with -X importtime, in a fresh interpreter
+# each run), which of the libraries meant to be imported on first use were imported anyway, and the time until
+# the subscription list is first shown (run headless, with a Textual pilot, against a generated OPML file).
+#
+# usage: python -m benchmarks.startup_benchmark [--runs 5] [--subscriptions 200]
+#
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_MODULE = "tuipod.ui.podcast_app"
+
+# libraries the app imports on first use, rather than on startup
+DEFERRED_MODULES = ["miniaudio", "numpy", "pynput", "bs4", "textual.widgets._markdown", "tuipod.models.player"]
+
+
+def import_times(module: str) -> dict:
+    """the cumulative import time (in microseconds) of each module imported by importing a module, in a fresh interpreter"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + module], capture_output=True, text=True, check=True)
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+async def first_paint(subscriptions: int) -> float:
+    """seconds from starting the app until its subscription list is shown"""
+    from textual.widgets import DataTable
+    from tuipod.ui.podcast_app import PodcastApp
+
+    outlines = "".join('<outline text="Podcast {0}" xmlUrl="https://localhost/{0}.xml" type="rss" />'.format(i) for i in range(subscriptions))
+    with open("subscriptions.opml", "wt", encoding="utf-8") as opml:
+        opml.write('<?xml version="1.0" encoding="utf-8"?><opml version="1.0"><body><outline text="feeds">{0}</outline></body></opml>'.format(outlines))
+
+    started = time.perf_counter()
+    app = PodcastApp()
+    async with app.run_test() as pilot:
+        table = app.query_one("#PodcastList", DataTable)
+        while table.row_count < subscriptions:
+            await pilot.pause(0.001)
+        return time.perf_counter() - started
+
+
+def main() -> None:
+    """report startup times"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--subscriptions", type=int, default=200)
+    args = parser.parse_args()
+
+    runs = [import_times(APP_MODULE) for _ in range(args.runs)]
+    median = statistics.median(r[APP_MODULE] for r in runs)
+
+    print("import {0}: {1:.1f} ms (median of {2} runs)".format(APP_MODULE, median / 1000, args.runs))
+    print("slowest imports (cumulative):")
+    for name, microseconds in sorted(runs[-1].items(), key=lambda i: i[1], reverse=True)[1:11]:
+        print("  {0:8.1f} ms  {1}".format(microseconds / 1000, name))
+
+    imported = [m for m in DEFERRED_MODULES if m in runs[-1]]
+    print("deferred libraries imported on startup: {0}".format(", ".join(imported) if imported else "none"))
+
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            seconds = asyncio.run(first_paint(args.subscriptions))
+        finally:
+            os.chdir(cwd)
+    print("subscription list ({0} subscriptions) shown after: {1:.1f} ms".format(args.subscriptions, seconds * 1000))
+
+
+if __name__ == "__main__":
+    main()
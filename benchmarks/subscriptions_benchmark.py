@@ -0,0 +1,69 @@
+#
+# subscriptions_benchmark.py
+#
+# Measures importing a large OPML export (feeds in nested category outlines, some listed twice) and writing the
+# subscription list back out: the time taken and the peak memory allocated by each.
+#
+# usage: python -m benchmarks.subscriptions_benchmark [--feeds 10000] [--categories 50]
+#
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from tuipod.models.subscription_list import SubscriptionList
+
+
+def write_export(path: str, feeds: int, categories: int) -> None:
+    """write an OPML export of feeds, spread across nested categories (every tenth feed also listed at the top)"""
+    with open(path, "wt", encoding="utf-8") as opml:
+        opml.write('<?xml version="1.0" encoding="utf-8"?>\n<opml version="2.0"><head><title>export</title></head><body>\n')
+        for c in range(categories):
+            opml.write('<outline text="Category {0}"><outline text="Subcategory {0}">\n'.format(c))
+            for i in range(c, feeds, categories):
+                opml.write('<outline type="rss" text="Podcast {0} &amp; friends" xmlUrl="https://localhost/feeds/{0}.xml?a=1&amp;b=2" />\n'.format(i))
+            opml.write('</outline></outline>\n')
+        for i in range(0, feeds, 10):
+            opml.write('<outline type="rss" text="Podcast {0}" xmlUrl="https://localhost/feeds/{0}.xml?a=1&amp;b=2" />\n'.format(i))
+        opml.write('</body></opml>\n')
+
+
+def measure(action) -> tuple:
+    """the seconds taken by, and the peak memory (in bytes) allocated by, an action"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    action()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main() -> None:
+    """report import and write times"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--feeds", type=int, default=10000)
+    parser.add_argument("--categories", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "subscriptions.opml")
+        write_export(path, args.feeds, args.categories)
+        print("export: {0} feeds, {1:.1f} KB".format(args.feeds, os.path.getsize(path) / 1024))
+
+        subscriptions = SubscriptionList(path)
+        seconds, peak = measure(subscriptions.retrieve)
+        print("import: {0} subscriptions in {1:.1f} ms (peak {2:.1f} MB)".format(len(subscriptions), seconds * 1000, peak / 1024 / 1024))
+
+        def write() -> None:
+            subscriptions.persist()
+            subscriptions.flush()
+
+        seconds, peak = measure(write)
+        print("write: {0:.1f} ms (peak {1:.1f} MB)".format(seconds * 1000, peak / 1024 / 1024))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#
+# time_stretch_benchmark.py
+#
+# Measures the cost of playing at each speed through the time stretching stage of the playback pipeline, as a
+# realtime factor (seconds of audio played per second of CPU time) and the share of one core needed to keep up.
+#
+# The input is a synthetic, speech-like signal (a voiced harmonic series with a wandering pitch and syllable-rate
+# loudness, plus a little noise); blocks are read at the size an audio device typically asks for.
+#
+# usage: python -m benchmarks.time_stretch_benchmark [--seconds 120] [--block-frames 1024]
+#
+
+import argparse
+import time
+
+import numpy as np
+
+from tuipod.models.audio_pipeline import TimeStretcher
+from tuipod.models.player import Player
+
+SPEEDS = [0.75, 1.0, 1.25, 1.5, 2.0, 2.5, 3.0]
+
+
+class ArrayFrames:
+    """a pipeline stage reading from an array of samples (standing in for the decoder)"""
+
+    def __init__(self, samples: np.ndarray) -> None:
+        self.samples = samples
+        self.frames_read = 0
+        self.ended = False
+
+    def read(self, frames: int) -> np.ndarray:
+        block = self.samples[self.frames_read:self.frames_read + frames]
+        self.frames_read += len(block)
+        self.ended = self.frames_read >= len(self.samples)
+        return block
+
+
+def speech_like(seconds: float, sample_rate: int) -> np.ndarray:
+    """a stereo, speech-like test signal, as (frames, 2) int16 samples"""
+    rng = np.random.default_rng(1)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(h * phase) / h for h in range(1, 12))
+    loudness = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    signal = 0.2 * voice * loudness + 0.01 * rng.standard_normal(len(t))
+    mono = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+    return np.stack([mono, mono], axis=1)
+
+
+def measure(samples: np.ndarray, speed: float, block_frames: int) -> tuple:
+    """(seconds of output, CPU seconds) to play the samples through at a speed"""
+    stretcher = TimeStretcher(ArrayFrames(samples), Player.OUTPUT_CHANNELS, speed)
+    frames = 0
+    started = time.process_time()
+    while not stretcher.ended:
+        frames += len(stretcher.read(block_frames))
+    return frames / Player.OUTPUT_SAMPLE_RATE, time.process_time() - started
+
+
+def main() -> None:
+    """report the realtime factor at each speed"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=120)
+    parser.add_argument("--block-frames", type=int, default=1024)
+    args = parser.parse_args()
+
+    samples = speech_like(args.seconds, Player.OUTPUT_SAMPLE_RATE)
+
+    print("{0:.0f}s of audio, read in blocks of {1} frames".format(args.seconds, args.block_frames))
+    print("speed  played   cpu      realtime factor  share of a core")
+    for speed in SPEEDS:
+        played, cpu = measure(samples, speed, args.block_frames)
+        factor = played / cpu if cpu > 0 else float("inf")
+        print("{0:4.2f}x {1:6.1f}s {2:7.3f}s {3:12.0f}x {4:14.2%}".format(speed, played, cpu, factor, cpu / played))
+
+
+if __name__ == "__main__":
+    main()
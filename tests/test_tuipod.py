@@ -6,11 +6,42 @@
 # 2024-11-12: Matthew Hickson
 #
 
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
+import wave
 
+import miniaudio
+import numpy as np
+
+from tuipod import cli
+from tuipod.models import network
+from tuipod.models.audio_pipeline import SilenceTrimmer, TimeStretcher
+from tuipod.models.audio_source import HttpAudioSource, RingBuffer
+from tuipod.models.download_manager import Download, DownloadManager
+from tuipod.models.episode_index import EpisodeIndex
+from tuipod.models.feed_cache import FeedCache
+from tuipod.models.feed_refresher import FeedRefresher
+from tuipod.models.feed_parser import FeedParser
+from tuipod.models.playback_state import PlaybackStateStore
+from tuipod.models.player import Player
 from tuipod.models.podcast import Podcast
-from tuipod.models.episode import Episode
-#TODO:  Player, Search, PodcastApp
+from tuipod.models.search import Search
+from tuipod.models.search_providers import GpodderSearchProvider, ITunesSearchProvider
+from tuipod.models.subscription_list import SubscriptionList
+from tuipod.models.episode import Episode, html_to_text, parse_date, parse_duration
+from tuipod.ui.episode_list import EpisodeList
+from tuipod.ui.media_keys import MediaKeys
 
 
 TEST_PODCAST_NAME = "A Podcast"
@@ -20,8 +51,93 @@ TEST_EPISODE_FEED_URL = "https://localhost/podcast/episode1.mp3"
 TEST_PODCAST_DESCRIPTION = "A test podcast."
 TEST_EPISODE_DESCRIPTION = "A test podcast episode."
 TEST_EPISODE_PUBDATE = "2024-01-01 12:00:00"
+TEST_EPISODE_TIMESTAMP = 1704110400
 TEST_EPISODE_DURATION_MINUTES = 5
 
+TEST_DATA_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+
+TEST_FEED_ITEM = """<item>
+<title>Episode {0}</title>
+<enclosure url="https://localhost/podcast/episode{0}.mp3" type="audio/mpeg" />
+<description><![CDATA[<p>Episode <b>{0}</b> notes.</p>]]></description>
+<pubDate>Mon, 01 Jan 2024 12:00:00 +0000</pubDate>
+</item>
+"""
+
+def make_test_feed(item_count: int) -> bytes:
+    """build a small RSS feed with the given number of items"""
+    items = "".join(TEST_FEED_ITEM.format(i) for i in range(item_count))
+    return '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>A Podcast</title>{0}</channel></rss>'.format(items).encode("utf-8")
+
+def write_test_audio(path: str, seconds: float, sample_rate: int = 22050) -> None:
+    """write a mono WAV file of a quiet tone"""
+    with wave.open(path, "wb") as audio:
+        audio.setnchannels(1)
+        audio.setsampwidth(2)
+        audio.setframerate(sample_rate)
+        audio.writeframes(b"".join(int(3000 * math.sin(i / 8)).to_bytes(2, "little", signed=True) for i in range(int(seconds * sample_rate))))
+
+def make_test_tone(seconds: float, frequency: float = 220, sample_rate: int = 44100) -> np.ndarray:
+    """a stereo tone, as (frames, 2) int16 samples"""
+    tone = (8000 * np.sin(2 * np.pi * frequency * np.arange(int(seconds * sample_rate)) / sample_rate)).astype(np.int16)
+    return np.stack([tone, tone], axis=1)
+
+
+class ArrayFrames:
+    """a playback pipeline stage reading from an array of samples (standing in for a decoder)"""
+
+    def __init__(self, samples: np.ndarray) -> None:
+        self.samples = samples
+        self.frames_read = 0
+        self.ended = False
+
+    def read(self, frames: int) -> np.ndarray:
+        block = self.samples[self.frames_read:self.frames_read + frames]
+        self.frames_read += len(block)
+        self.ended = self.frames_read >= len(self.samples)
+        return block
+
+
+class LocalHttpServer:
+    """
+    A throwaway local HTTP server for exercising network code, serving responses from a handler function.
+
+    The handler receives the request handler and returns (status, headers, body). A Content-Length header longer
+    than the body simulates a dropped connection.
+    """
+
+    def __init__(self, handler) -> None:
+        """start the server on a free port"""
+        respond = handler
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, headers, body = respond(self)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if not "Content-Length" in headers:
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client hung up early (e.g. a stream closed before its end)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+        self.url = "http://127.0.0.1:{0}".format(self.server.server_address[1])
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self) -> None:
+        """stop the server"""
+        self.server.shutdown()
+        self.server.server_close()
+
+
 class TestSmokeTest(unittest.TestCase):
 
     def test_sanity_check(self):
@@ -48,7 +164,7 @@ class TestModelTests(unittest.TestCase):
         self.assertEqual(e.title, TEST_EPISODE_NAME)
         self.assertEqual(e.url, TEST_EPISODE_FEED_URL)
         self.assertEqual(e.description, TEST_EPISODE_DESCRIPTION)
-        self.assertEqual(e.pubdate, TEST_EPISODE_PUBDATE)
+        self.assertEqual(e.pubdate, TEST_EPISODE_TIMESTAMP)
         self.assertEqual(e.duration, TEST_EPISODE_DURATION_MINUTES)
 
 
@@ -65,7 +181,7 @@ class TestModelTests(unittest.TestCase):
         self.assertEqual(p.episodes[0].title, TEST_EPISODE_NAME)
         self.assertEqual(p.episodes[0].url, TEST_EPISODE_FEED_URL)
         self.assertEqual(p.episodes[0].description, TEST_EPISODE_DESCRIPTION)
-        self.assertEqual(p.episodes[0].pubdate, TEST_EPISODE_PUBDATE)
+        self.assertEqual(p.episodes[0].pubdate, TEST_EPISODE_TIMESTAMP)
         self.assertEqual(p.episodes[0].duration, TEST_EPISODE_DURATION_MINUTES)
 
 
@@ -84,5 +200,1432 @@ class TestModelTests(unittest.TestCase):
         self.assertEqual(p.episodes, [])
 
 
+    def test_episode_description_is_cleaned_lazily(self):
+        e = Episode(TEST_EPISODE_NAME, TEST_EPISODE_FEED_URL, "<p>Show <b>notes</b> &amp; links</p>", TEST_EPISODE_PUBDATE, TEST_EPISODE_DURATION_MINUTES)
+
+        self.assertEqual(e.raw_description, "<p>Show <b>notes</b> &amp; links</p>")
+        self.assertEqual(e.description, "Show notes & links")
+
+        e.raw_description = "Updated"
+        self.assertEqual(e.description, "Updated")
+
+
+    def test_ids_are_deterministic(self):
+        e1 = Episode(TEST_EPISODE_NAME, TEST_EPISODE_FEED_URL, "", TEST_EPISODE_PUBDATE, TEST_EPISODE_DURATION_MINUTES, "guid-1")
+        e2 = Episode("Renamed", TEST_EPISODE_FEED_URL, "", TEST_EPISODE_PUBDATE, TEST_EPISODE_DURATION_MINUTES, "guid-1")
+        e3 = Episode(TEST_EPISODE_NAME, TEST_EPISODE_FEED_URL, "", TEST_EPISODE_PUBDATE, TEST_EPISODE_DURATION_MINUTES, "guid-2")
+
+        self.assertEqual(e1.id, e2.id)
+        self.assertNotEqual(e1.id, e3.id)
+        self.assertEqual(Podcast("a", TEST_PODCAST_FEED_URL, "").id, Podcast("b", TEST_PODCAST_FEED_URL, "").id)
+
+        # a feed rewriting its enclosure URLs (e.g. a tracking prefix) doesn't change the ids of its episodes
+        moved = Episode(TEST_EPISODE_NAME, "https://tracker.localhost/" + TEST_EPISODE_FEED_URL, "", TEST_EPISODE_PUBDATE, 0, "guid-1", TEST_PODCAST_FEED_URL)
+        self.assertEqual(moved.id, Episode(TEST_EPISODE_NAME, TEST_EPISODE_FEED_URL, "", TEST_EPISODE_PUBDATE, 0, "guid-1", TEST_PODCAST_FEED_URL).id)
+        self.assertNotEqual(moved.id, Episode(TEST_EPISODE_NAME, TEST_EPISODE_FEED_URL, "", TEST_EPISODE_PUBDATE, 0, "guid-1", TEST_PODCAST_FEED_URL + "2").id)
+
+        # slotted, without per-instance dictionaries
+        self.assertFalse(hasattr(e1, "__dict__"))
+        self.assertFalse(hasattr(Podcast("a", TEST_PODCAST_FEED_URL, ""), "__dict__"))
+
+
+    def test_html_to_text(self):
+        self.assertEqual(html_to_text(None), "")
+        self.assertEqual(html_to_text("plain < text"), "plain < text")
+        self.assertEqual(html_to_text("Q&amp;A<br/>time"), "Q&Atime")
+        self.assertTrue(html_to_text("<p>kept</p><script>dropped()</script>").startswith("kept"))
+        self.assertEqual(html_to_text("<p>kept</p><!-- hidden -->"), "kept")
+
+
+class TestFeedParserTests(unittest.TestCase):
+
+    def test_parse_yields_batches(self):
+        parser = FeedParser(batch_size=2)
+        parser.CHUNK_SIZE = 64
+
+        batches = list(parser.parse(io.BytesIO(make_test_feed(5))))
+
+        self.assertEqual([len(b) for b in batches], [2, 2, 1])
+        self.assertEqual(batches[0][0].title, "Episode 0")
+        self.assertEqual(batches[0][0].url, "https://localhost/podcast/episode0.mp3")
+        self.assertEqual(batches[0][0].description, "Episode 0 notes.")
+        self.assertEqual(batches[2][0].title, "Episode 4")
+
+
+    def test_parse_skips_items_without_enclosure(self):
+        feed = b'<rss><channel><item><title>No Audio</title></item>' + TEST_FEED_ITEM.format(1).encode("utf-8") + b'</channel></rss>'
+
+        episodes = [e for b in FeedParser().parse(io.BytesIO(feed)) for e in b]
+
+        self.assertEqual(len(episodes), 1)
+        self.assertEqual(episodes[0].title, "Episode 1")
+
+
+    def test_parse_passes_raw_chunks_to_sink(self):
+        feed = make_test_feed(3)
+        chunks = []
+
+        list(FeedParser().parse(io.BytesIO(feed), sink=chunks.append))
+
+        self.assertEqual(b"".join(chunks), feed)
+
+
+class TestFeedNormalizerTests(unittest.TestCase):
+
+    def parse(self, name: str) -> [Episode]:
+        with open(os.path.join(TEST_DATA_DIRECTORY, name), "rb") as feed:
+            return [e for b in FeedParser().parse(feed) for e in b]
+
+
+    def test_rss_with_itunes_extensions(self):
+        episodes = self.parse("rss_itunes.xml")
+
+        # the text-only trailer has no audio
+        self.assertEqual([e.title for e in episodes], ["Episode 3: Hours Long", "Episode 2: Minutes and Seconds", "Episode 1: Just Seconds"])
+        self.assertEqual([e.duration for e in episodes], [3723, 2730, 3600])
+        self.assertEqual([e.pubdate for e in episodes], [1704794400, 1704189600, 1704110400])
+        self.assertEqual([e.guid for e in episodes], ["hosted-podcast-3", "https://cdn.example.com/episodes/2.mp3", None])
+        # the description, or failing that content:encoded, or failing that itunes:summary
+        self.assertEqual([e.description for e in episodes], ["Show notes with links.", "Only content:encoded notes.", "Only an iTunes summary."])
+
+
+    def test_atom(self):
+        episodes = self.parse("atom.xml")
+
+        self.assertEqual([e.title for e in episodes], ["Second Entry", "First Entry"])
+        self.assertEqual([e.url for e in episodes], ["https://atom.example.com/audio/2.mp3", "https://atom.example.com/audio/1.ogg"])
+        # published, or failing that updated
+        self.assertEqual([e.pubdate for e in episodes], [1706779800, 1705302000])
+        self.assertEqual([e.description for e in episodes], ["A plain summary.", "XHTML content."])
+        self.assertEqual(episodes[0].guid, "tag:atom.example.com,2024:2")
+
+
+    def test_irregular_rss(self):
+        episodes = self.parse("rss_irregular.xml")
+
+        self.assertEqual([e.url for e in episodes], ["https://media.example.com/{0}".format(f) for f in ("a.m4a", "b.mp3", "c.mp3", "d.mp3")])
+        self.assertEqual([e.pubdate for e in episodes], [1688175900, 1688558400, 0, 0])
+        self.assertEqual([e.duration for e in episodes], [65, 754, 0, 0])
+        self.assertIsNone(episodes[1].guid)
+
+
+    def test_parse_date(self):
+        self.assertEqual(parse_date("Mon, 01 Jan 2024 12:00:00 +0000"), TEST_EPISODE_TIMESTAMP)
+        self.assertEqual(parse_date("Mon, 01 Jan 2024 07:00:00 EST"), TEST_EPISODE_TIMESTAMP)
+        self.assertEqual(parse_date("2024-01-01T12:00:00Z"), TEST_EPISODE_TIMESTAMP)
+        self.assertEqual(parse_date(str(TEST_EPISODE_TIMESTAMP)), TEST_EPISODE_TIMESTAMP)
+        self.assertEqual(parse_date(""), 0)
+        self.assertEqual(parse_date("Mon, 31 Feb 2024 12:00:00 +0000"), 0)
+
+
+    def test_parse_duration(self):
+        self.assertEqual(parse_duration("01:02:03"), 3723)
+        self.assertEqual(parse_duration("45:00"), 2700)
+        self.assertEqual(parse_duration("90.5"), 90)
+        self.assertEqual(parse_duration(90), 90)
+        self.assertEqual(parse_duration(""), 0)
+        self.assertEqual(parse_duration("n/a"), 0)
+
+
+class TestNetworkTests(unittest.TestCase):
+
+    def test_open_url_caps_concurrent_requests(self):
+        lock = threading.Lock()
+        active = {}  # current, by host
+        highest = [0, 0]  # maximum overall, maximum for any one host
+
+        def slow_handler(request):
+            host = request.headers.get("Host")
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                highest[0] = max(highest[0], sum(active.values()))
+                highest[1] = max(highest[1], active[host])
+            time.sleep(0.1)
+            with lock:
+                active[host] -= 1
+            return 200, {}, b"ok"
+
+        def fetch(url):
+            with network.open_url(url) as response:
+                response.read()
+
+        # NOTE: enough hosts (each server's port, by either name) that the per-host cap alone would allow more than the overall cap
+        servers = [LocalHttpServer(slow_handler) for _ in range(network.MAX_CONCURRENT_REQUESTS // network.MAX_REQUESTS_PER_HOST)]
+        try:
+            hosts = [s.url for s in servers] + [s.url.replace("127.0.0.1", "localhost") for s in servers]
+            threads = [threading.Thread(target=fetch, args=(url,)) for url in hosts * network.MAX_REQUESTS_PER_HOST * 2]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            for server in servers:
+                server.close()
+
+        self.assertGreater(len(hosts) * network.MAX_REQUESTS_PER_HOST, network.MAX_CONCURRENT_REQUESTS)
+        self.assertGreater(highest[0], network.MAX_REQUESTS_PER_HOST)
+        self.assertLessEqual(highest[0], network.MAX_CONCURRENT_REQUESTS)
+        self.assertLessEqual(highest[1], network.MAX_REQUESTS_PER_HOST)
+
+
+    def test_open_url_caps_requests_per_host(self):
+        lock = threading.Lock()
+        active = {}
+        highest = {}
+
+        def slow_handler(request):
+            host = request.headers.get("Host").split(":")[0]
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                highest[host] = max(highest.get(host, 0), active[host])
+            time.sleep(0.1)
+            with lock:
+                active[host] -= 1
+            return 200, {}, b"ok"
+
+        def fetch(url):
+            with network.open_url(url) as response:
+                response.read()
+
+        server = LocalHttpServer(slow_handler)
+        try:
+            urls = [server.url, server.url.replace("127.0.0.1", "localhost")] * (network.MAX_REQUESTS_PER_HOST * 2)
+            threads = [threading.Thread(target=fetch, args=(url,)) for url in urls]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            server.close()
+
+        self.assertEqual(len(highest), 2)
+        self.assertEqual(max(highest.values()), network.MAX_REQUESTS_PER_HOST)
+
+
+    def test_open_stream_releases_slots_once_the_response_arrives(self):
+        server = LocalHttpServer(lambda request: (200, {}, b"ok" * 1024))
+        try:
+            # as long downloads would, hold open as many streams as the host has request slots
+            streams = [network.open_stream(server.url + "/episode.mp3") for _ in range(network.MAX_REQUESTS_PER_HOST)]
+            for stream in streams:
+                stream.__enter__()
+
+            fetched = []
+
+            def fetch_feed():
+                with network.open_url(server.url + "/feed") as response:
+                    fetched.append(response.read())
+
+            feed = threading.Thread(target=fetch_feed)
+            feed.start()
+            feed.join(5)
+            fetched_while_streaming = list(fetched)
+
+            for stream in streams:
+                stream.__exit__(None, None, None)
+            feed.join()
+        finally:
+            server.close()
+
+        self.assertEqual(fetched_while_streaming, [b"ok" * 1024])
+
+
+    def test_open_url_sends_user_agent(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("User-Agent"))
+            return 200, {}, b"ok"
+
+        server = LocalHttpServer(handler)
+        try:
+            with network.open_url(server.url) as response:
+                response.read()
+        finally:
+            server.close()
+
+        self.assertEqual(seen, [network.USER_AGENT])
+
+
+class TestFeedCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.feed = make_test_feed(3)
+        self.requests = []
+
+        def handler(request):
+            self.requests.append(dict(request.headers))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return 304, {}, b""
+            return 200, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 12:00:00 GMT"}, self.feed
+
+        self.server = LocalHttpServer(handler)
+
+
+    def tearDown(self):
+        self.server.close()
+        self.directory.cleanup()
+
+
+    def test_fresh_entry_skips_network(self):
+        cache = FeedCache(self.directory.name)
+
+        first = Podcast(TEST_PODCAST_NAME, self.server.url, "")
+        list(first.stream_episode_list(feed_cache=cache))
+
+        second = Podcast(TEST_PODCAST_NAME, self.server.url, "")
+        list(second.stream_episode_list(feed_cache=cache))
+
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual([e.url for e in second.episodes], [e.url for e in first.episodes])
+        self.assertEqual(second.episodes[0].description, "Episode 0 notes.")
+
+
+    def test_stale_entry_revalidates_with_conditional_get(self):
+        cache = FeedCache(self.directory.name, ttl_seconds=0)
+
+        list(Podcast(TEST_PODCAST_NAME, self.server.url, "").stream_episode_list(feed_cache=cache))
+
+        p = Podcast(TEST_PODCAST_NAME, self.server.url, "")
+        list(p.stream_episode_list(feed_cache=cache))
+
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.requests[1].get("If-None-Match"), '"v1"')
+        self.assertEqual(self.requests[1].get("If-Modified-Since"), "Mon, 01 Jan 2024 12:00:00 GMT")
+        self.assertEqual(len(p.episodes), 3)
+
+
+    def test_eviction_removes_least_recently_used(self):
+        cache = FeedCache(self.directory.name)
+
+        for name in ("a", "b", "c"):
+            list(Podcast(name, self.server.url + "/" + name, "").stream_episode_list(feed_cache=cache))
+            time.sleep(0.01)
+        cache.get(self.server.url + "/a")
+
+        entry_size = sum(os.path.getsize(os.path.join(self.directory.name, f)) for f in os.listdir(self.directory.name)) / 3
+        cache.max_size_bytes = int(entry_size * 2.5)
+        cache.evict()
+
+        self.assertIsNotNone(cache.get(self.server.url + "/a"))
+        self.assertIsNone(cache.get(self.server.url + "/b"))
+        self.assertIsNotNone(cache.get(self.server.url + "/c"))
+
+
+class TestFeedRefresherTests(unittest.TestCase):
+
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.hits = {}
+        self.conditions = []
+
+        def handler(request):
+            with self.lock:
+                self.hits[request.path] = self.hits.get(request.path, 0) + 1
+                hits = self.hits[request.path]
+            if request.path.startswith("/flaky") and hits == 1:
+                return 503, {}, b""
+            if request.path.startswith("/missing"):
+                return 404, {}, b""
+            if request.path.startswith("/slow"):
+                time.sleep(0.3)
+            if request.path.startswith("/cached"):
+                self.conditions.append(request.headers.get("If-None-Match"))
+                if request.headers.get("If-None-Match") == '"v1"':
+                    return 304, {}, b""
+                return 200, {"ETag": '"v1"'}, make_test_feed(2)
+            return 200, {}, make_test_feed(2)
+
+        self.server = LocalHttpServer(handler)
+
+
+    def tearDown(self):
+        self.server.close()
+
+
+    def test_refresh_retries_transient_failures(self):
+        podcasts = [Podcast("flaky", self.server.url + "/flaky", ""), Podcast("missing", self.server.url + "/missing", "")]
+        progress = []
+
+        results = FeedRefresher(backoff_seconds=0.01).refresh(podcasts, lambda done, total, r: progress.append((done, total)))
+        outcome = {r.podcast.title: r for r in results}
+
+        self.assertTrue(outcome["flaky"].succeeded)
+        self.assertEqual(outcome["flaky"].attempts, 2)
+        self.assertEqual(len(podcasts[0].episodes), 2)
+        self.assertFalse(outcome["missing"].succeeded)
+        self.assertEqual(outcome["missing"].attempts, 1)
+        self.assertEqual(progress, [(1, 2), (2, 2)])
+
+
+    def test_refresh_fetches_feeds_concurrently(self):
+        hosts = [self.server.url, self.server.url.replace("127.0.0.1", "localhost")]
+        podcasts = [Podcast(str(i), "{0}/slow/{1}".format(hosts[i % 2], i), "") for i in range(4)]
+
+        started = time.monotonic()
+        results = FeedRefresher().refresh(podcasts)
+        elapsed = time.monotonic() - started
+
+        self.assertTrue(all(r.succeeded for r in results))
+        self.assertLess(elapsed, 0.3 * len(podcasts))
+
+
+    def test_refresh_revalidates_freshly_cached_feeds(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = FeedCache(directory)
+            podcast = Podcast("cached", self.server.url + "/cached", "")
+
+            # listing the episodes caches the feed (fresh for FeedCache.TTL_SECONDS)
+            for _ in podcast.stream_episode_list(feed_cache=cache):
+                pass
+
+            results = FeedRefresher(cache).refresh([podcast])
+
+        self.assertTrue(results[0].succeeded)
+        self.assertEqual(self.conditions, [None, '"v1"'])
+        self.assertEqual(len(podcast.episodes), 2)
+
+
+    def test_cancelled_refresh_is_not_a_success(self):
+        podcasts = [Podcast("feed", self.server.url + "/feed", "")]
+        results = FeedRefresher().refresh(podcasts, is_cancelled=lambda: True)
+
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0].cancelled)
+        self.assertFalse(results[0].succeeded)
+        self.assertEqual(results[0].attempts, 0)
+        self.assertEqual(self.hits, {})
+
+
+class TestDownloadManagerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.audio = bytes(range(256)) * 4096
+        self.ranges = []
+
+        def handler(request):
+            requested = request.headers.get("Range")
+            self.ranges.append(requested)
+            if not requested is None:
+                start = int(requested[len("bytes="):].rstrip("-"))
+                return 206, {"Content-Range": "bytes {0}-{1}/{2}".format(start, len(self.audio) - 1, len(self.audio))}, self.audio[start:]
+            return 200, {}, self.audio
+
+        self.server = LocalHttpServer(handler)
+        self.url = self.server.url + "/episode1.mp3"
+
+
+    def tearDown(self):
+        self.server.close()
+        self.directory.cleanup()
+
+
+    def test_download_writes_local_file(self):
+        manager = DownloadManager(self.directory.name)
+
+        self.assertIsNone(manager.local_path(self.url))
+
+        download = manager.enqueue(self.url, TEST_EPISODE_NAME)
+        self.assertTrue(download.wait(10))
+
+        self.assertEqual(download.state, Download.COMPLETE)
+        self.assertTrue(download.path.endswith(".mp3"))
+        self.assertEqual(manager.local_path(self.url), download.path)
+        with open(download.path, "rb") as f:
+            self.assertEqual(f.read(), self.audio)
+        self.assertEqual(download.bytes_done, len(self.audio))
+        self.assertGreater(download.throughput, 0)
+
+
+    def test_download_resumes_partial_file(self):
+        manager = DownloadManager(self.directory.name)
+        half = len(self.audio) // 2
+        with open(manager.path_for(self.url) + ".part", "wb") as f:
+            f.write(self.audio[:half])
+
+        download = manager.enqueue(self.url)
+        self.assertTrue(download.wait(10))
+
+        self.assertEqual(self.ranges, ["bytes={0}-".format(half)])
+        self.assertEqual(download.resumed_from, half)
+        with open(download.path, "rb") as f:
+            self.assertEqual(f.read(), self.audio)
+
+
+class TestEpisodeStoreTests(unittest.TestCase):
+
+    def test_refetch_does_not_duplicate_episodes(self):
+        p = Podcast(TEST_PODCAST_NAME, TEST_PODCAST_FEED_URL, TEST_PODCAST_DESCRIPTION)
+
+        for _ in range(3):
+            for batch in FeedParser().parse(io.BytesIO(make_test_feed(4))):
+                p.episode_store.merge(batch)
+
+        self.assertEqual(len(p.episodes), 4)
+
+
+    def test_merge_keeps_identity_and_updates_changes(self):
+        p = Podcast(TEST_PODCAST_NAME, TEST_PODCAST_FEED_URL, TEST_PODCAST_DESCRIPTION)
+        original = Episode(TEST_EPISODE_NAME, TEST_EPISODE_FEED_URL, TEST_EPISODE_DESCRIPTION, TEST_EPISODE_PUBDATE, TEST_EPISODE_DURATION_MINUTES, "guid-1")
+        p.add_episode(original)
+
+        moved_url = TEST_EPISODE_FEED_URL + "?v=2"
+        merged = p.episode_store.merge([Episode("Renamed", moved_url, TEST_EPISODE_DESCRIPTION, TEST_EPISODE_PUBDATE, TEST_EPISODE_DURATION_MINUTES, "guid-1")])
+
+        self.assertIs(merged[0], original)
+        self.assertEqual(original.title, "Renamed")
+        # the id comes from the feed and the guid, so it's the same in the next run (where only the moved URL is seen)
+        self.assertEqual(original.id, Episode("", moved_url, "", 0, 0, "guid-1", TEST_PODCAST_FEED_URL).id)
+        self.assertIs(p.get_episode(original.id), original)
+        self.assertIs(p.get_episode_by_url(moved_url), original)
+        self.assertIsNone(p.get_episode_by_url(TEST_EPISODE_FEED_URL))
+
+
+    def test_episodes_are_ordered_newest_first(self):
+        p = Podcast(TEST_PODCAST_NAME, TEST_PODCAST_FEED_URL, TEST_PODCAST_DESCRIPTION)
+        for day in ("02", "01", "03"):
+            p.add_episode(Episode(day, TEST_EPISODE_FEED_URL + day, "", "Mon, {0} Jan 2024 12:00:00 +0000".format(day), 0))
+
+        self.assertEqual([e.title for e in p.episodes], ["03", "02", "01"])
+
+
+class TestEpisodeListTests(unittest.IsolatedAsyncioTestCase):
+
+    async def test_rows_are_added_incrementally(self):
+        from textual.app import App
+        from textual.widgets import DataTable
+
+        class EpisodeListApp(App):
+            def compose(self):
+                yield EpisodeList()
+
+        episodes = [Episode("Episode {0}".format(i), TEST_EPISODE_FEED_URL + str(i), "", "", 0) for i in range(1000)]
+
+        app = EpisodeListApp()
+        async with app.run_test() as pilot:
+            episode_list = app.query_one(EpisodeList)
+            table = app.query_one(DataTable)
+
+            episode_list.add_episodes(episodes)
+            self.assertGreater(table.row_count, 0)
+            self.assertLess(table.row_count, len(episodes))
+            self.assertTrue(episode_list.is_populating)
+
+            for _ in range(100):
+                if not episode_list.is_populating:
+                    break
+                await pilot.pause()
+
+            self.assertEqual(table.row_count, len(episodes))
+
+            episode_list.clear_episodes()
+            self.assertEqual(table.row_count, 0)
+
+
+class TestEpisodeIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.index = EpisodeIndex(os.path.join(self.directory.name, "episodes.db"))
+        self.podcast = Podcast(TEST_PODCAST_NAME, TEST_PODCAST_FEED_URL, TEST_PODCAST_DESCRIPTION)
+        self.podcast.add_episode(Episode("Gardening basics", TEST_EPISODE_FEED_URL + "1", "<p>All about <b>tomatoes</b></p>", "", 0))
+        self.podcast.add_episode(Episode("Cooking", TEST_EPISODE_FEED_URL + "2", "Tomato soup and bread", "", 0))
+
+
+    def tearDown(self):
+        self.index.close()
+        self.directory.cleanup()
+
+
+    def test_search_matches_titles_and_descriptions(self):
+        self.index.index_podcast(self.podcast)
+
+        self.assertEqual([e.title for e in self.index.search("garden")], ["Gardening basics"])
+        self.assertEqual({e.title for e in self.index.search("tomato")}, {"Gardening basics", "Cooking"})
+        self.assertEqual([e.title for e in self.index.search("tomato bread")], ["Cooking"])
+        self.assertEqual(self.index.search("  "), [])
+
+        # a match has the same id as the podcast's episode (so e.g. its playback position is found)
+        self.assertEqual(self.index.search("garden")[0].id, self.podcast.get_episode_by_url(TEST_EPISODE_FEED_URL + "1").id)
+
+
+    def test_reindex_only_writes_changes(self):
+        self.assertEqual(self.index.index_podcast(self.podcast), 2)
+        self.assertEqual(self.index.index_podcast(self.podcast), 0)
+
+        self.podcast.get_episode_by_url(TEST_EPISODE_FEED_URL + "2").title = "Baking"
+        self.podcast.remove_episode(TEST_EPISODE_FEED_URL + "1")
+
+        self.assertEqual(self.index.index_podcast(self.podcast), 1)
+        self.assertEqual(self.index.search("garden"), [])
+        self.assertEqual([e.title for e in self.index.search("baking")], ["Baking"])
+
+
+    def test_remove_podcast(self):
+        self.index.index_podcast(self.podcast)
+        self.index.remove_podcast(self.podcast.url)
+
+        self.assertEqual(self.index.search("tomato"), [])
+
+
+class TestSearchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.terms = []
+
+        def handler(request):
+            term = request.path.split("term=")[1]
+            self.terms.append(term)
+            body = {"results": [{"collectionName": term, "feedUrl": TEST_PODCAST_FEED_URL + term, "artistName": ""}]}
+            return 200, {"Content-Type": "application/json"}, json.dumps(body).encode("utf-8")
+
+        self.server = LocalHttpServer(handler)
+
+
+    def tearDown(self):
+        self.server.close()
+        self.directory.cleanup()
+
+
+    def make_search(self, **kwargs) -> Search:
+        return Search("", providers=[ITunesSearchProvider(self.server.url + "/search")], **kwargs)
+
+
+    def test_repeat_searches_come_from_cache(self):
+        search = self.make_search(max_cached=2)
+
+        for term in ("alpha", "beta", "Alpha ", "beta", "gamma", "alpha"):
+            asyncio.run(search.search(term))
+
+        # alpha was the least recently used when gamma arrived, so it was evicted
+        self.assertEqual(self.terms, ["alpha", "beta", "gamma", "alpha"])
+        self.assertEqual(search.get_cached_search_results()[0].title, "alpha")
+
+
+    def test_abandoned_searches_free_their_connections_and_are_not_cached(self):
+        def handler(request):
+            term = request.path.split("term=")[1]
+            if term != "gamma":
+                time.sleep(2)
+            body = {"results": [{"collectionName": term, "feedUrl": TEST_PODCAST_FEED_URL + term, "artistName": ""}]}
+            return 200, {"Content-Type": "application/json"}, json.dumps(body).encode("utf-8")
+
+        slow = LocalHttpServer(handler)
+        try:
+            search = Search("", providers=[ITunesSearchProvider(slow.url + "/search"), ITunesSearchProvider(slow.url + "/other")])
+
+            async def superseded() -> float:
+                # as workers cancelled by newer searches would be, each leaving its requests in flight
+                for term in ("alpha", "beta"):
+                    with self.assertRaises(asyncio.TimeoutError):
+                        await asyncio.wait_for(search.search(term), 0.2)
+
+                started = time.monotonic()
+                results = await search.search("gamma")
+                self.assertEqual([p.title for p in results], ["gamma"])
+                return time.monotonic() - started
+
+            # the abandoned requests don't hold the host's connections until the server gets round to them
+            self.assertLess(asyncio.run(superseded()), 0.5)
+        finally:
+            slow.close()
+
+        self.assertIsNone(search._recall("alpha"))
+        self.assertIsNone(search._recall("beta"))
+
+
+    def test_expired_searches_are_repeated(self):
+        search = self.make_search(ttl_seconds=0)
+
+        asyncio.run(search.search("alpha"))
+        asyncio.run(search.search("alpha"))
+
+        self.assertEqual(self.terms, ["alpha", "alpha"])
+
+
+    def test_cache_is_persisted(self):
+        cache_file = os.path.join(self.directory.name, "searches.json")
+
+        asyncio.run(self.make_search(cache_file=cache_file).search("alpha"))
+        results = asyncio.run(self.make_search(cache_file=cache_file).search("alpha"))
+
+        self.assertEqual(self.terms, ["alpha"])
+        self.assertEqual([p.url for p in results], [TEST_PODCAST_FEED_URL + "alpha"])
+
+
+    def test_providers_are_merged_and_slow_ones_abandoned(self):
+        def gpodder_handler(request):
+            body = [
+                {"title": "alpha", "url": TEST_PODCAST_FEED_URL.replace("https://", "http://") + "alpha/", "author": ""},
+                {"title": "other", "url": TEST_PODCAST_FEED_URL + "other", "author": ""}
+            ]
+            return 200, {}, json.dumps(body).encode("utf-8")
+
+        def slow_handler(request):
+            time.sleep(2)
+            return 200, {}, b"[]"
+
+        gpodder = LocalHttpServer(gpodder_handler)
+        slow = LocalHttpServer(slow_handler)
+        try:
+            search = Search("", providers=[
+                ITunesSearchProvider(self.server.url + "/search"),
+                GpodderSearchProvider(gpodder.url + "/search.json"),
+                GpodderSearchProvider(slow.url + "/search.json")
+            ], timeout=0.5)
+
+            async def stream() -> []:
+                return [[p.title for p in podcasts] async for podcasts in search.stream_search("alpha")]
+
+            started = time.monotonic()
+            arrivals = asyncio.run(stream())
+            elapsed = time.monotonic() - started
+        finally:
+            gpodder.close()
+            slow.close()
+
+        # the same feed from both providers is listed once, and the slow provider didn't hold up the others
+        self.assertEqual(sorted(t for titles in arrivals for t in titles), ["alpha", "other"])
+        # NOTE: whichever fast provider answers second may have nothing new left to list
+        self.assertIn(len(arrivals), (1, 2))
+        self.assertLess(elapsed, 1.5)
+
+
+class TestPlaybackStateTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "playback.db")
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def stored_state(self, episode_id: str):
+        """what a fresh store (e.g. after a restart) reads back"""
+        store = PlaybackStateStore(self.path)
+        state = store.get(episode_id)
+        store.close()
+        return state
+
+
+    def test_positions_are_written_in_batches(self):
+        store = PlaybackStateStore(self.path, flush_interval_seconds=60)
+        for position in range(10):
+            store.record_position("episode", position)
+
+        self.assertEqual(store.get("episode").position_seconds, 9)
+        self.assertIsNone(self.stored_state("episode"))
+
+        store.flush()
+        self.assertEqual(self.stored_state("episode").position_seconds, 9)
+        store.close()
+
+
+    def test_completion_is_written_right_away_and_restarts_the_episode(self):
+        store = PlaybackStateStore(self.path, flush_interval_seconds=60)
+        store.record_position("episode", 1234)
+        store.mark_completed("episode")
+
+        state = self.stored_state("episode")
+        self.assertTrue(state.completed)
+        self.assertEqual(state.position_seconds, 0)
+        self.assertIsNotNone(state.last_played)
+        store.close()
+
+
+class TestSubscriptionListTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "subscriptions.opml")
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def stored_subscriptions(self) -> SubscriptionList:
+        """what a fresh list (e.g. after a restart) reads back"""
+        subscriptions = SubscriptionList(self.path)
+        subscriptions.retrieve()
+        return subscriptions
+
+
+    def test_subscriptions_are_indexed_by_url(self):
+        subscriptions = SubscriptionList(self.path)
+        first = subscriptions.add_podcast(Podcast(TEST_PODCAST_NAME, TEST_PODCAST_FEED_URL, ""))
+        second = subscriptions.add_podcast(Podcast("A Duplicate", TEST_PODCAST_FEED_URL, ""))
+
+        self.assertIs(first, second)
+        self.assertEqual(len(subscriptions), 1)
+        self.assertTrue(TEST_PODCAST_FEED_URL in subscriptions)
+
+        subscriptions.remove_podcast(TEST_PODCAST_FEED_URL)
+        self.assertEqual(len(subscriptions), 0)
+        self.assertFalse(first.subscribed)
+
+
+    def test_changes_are_written_in_one_batch(self):
+        subscriptions = SubscriptionList(self.path, write_delay_seconds=60)
+        for i in range(10):
+            subscriptions.add_podcast(Podcast("Podcast {0}".format(i), "https://localhost/{0}.xml".format(i), ""))
+            subscriptions.persist()
+
+        self.assertFalse(os.path.exists(self.path))
+
+        subscriptions.flush()
+        self.assertEqual([p.title for p in self.stored_subscriptions().podcasts], ["Podcast {0}".format(i) for i in range(10)])
+        self.assertEqual(os.listdir(self.directory.name), ["subscriptions.opml"])
+
+
+    def test_writes_keep_the_file_mode(self):
+        subscriptions = SubscriptionList(self.path)
+        subscriptions.add_podcast(Podcast(TEST_PODCAST_NAME, TEST_PODCAST_FEED_URL, ""))
+        subscriptions.persist()
+        subscriptions.flush()
+
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o666 & ~umask)
+
+        os.chmod(self.path, 0o640)
+        subscriptions.remove_podcast(TEST_PODCAST_FEED_URL)
+        subscriptions.persist()
+        subscriptions.flush()
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o640)
+
+
+    def test_export_writes_a_readable_copy(self):
+        subscriptions = SubscriptionList(self.path)
+        subscriptions.add_podcast(Podcast(TEST_PODCAST_NAME, TEST_PODCAST_FEED_URL, ""))
+
+        exported_path = os.path.join(self.directory.name, "feeds.opml")
+        subscriptions.export(exported_path)
+
+        exported = SubscriptionList(exported_path)
+        exported.retrieve()
+        self.assertEqual([p.url for p in exported.podcasts], [TEST_PODCAST_FEED_URL])
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ["feeds.opml"])
+
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(os.stat(exported_path).st_mode & 0o777, 0o666 & ~umask)
+
+
+    def test_pending_changes_are_written_after_a_delay(self):
+        subscriptions = SubscriptionList(self.path, write_delay_seconds=0.05)
+        subscriptions.add_podcast(Podcast(TEST_PODCAST_NAME, TEST_PODCAST_FEED_URL, ""))
+        subscriptions.persist()
+
+        deadline = time.monotonic() + 5
+        while not os.path.exists(self.path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.stored_subscriptions()), 1)
+
+
+    def test_titles_and_urls_are_escaped(self):
+        title = 'Q&A "live" <uncut>'
+        url = "https://localhost/feed?a=1&b=\"2\""
+        subscriptions = SubscriptionList(self.path)
+        subscriptions.add_podcast(Podcast(title, url, ""))
+        subscriptions.persist()
+        subscriptions.flush()
+
+        p = self.stored_subscriptions().get(url)
+        self.assertEqual(p.title, title)
+        self.assertTrue(p.subscribed)
+
+
+    def test_nested_outlines_are_imported(self):
+        with open(self.path, "wt", encoding="utf-8") as opml:
+            opml.write("""<?xml version="1.0" encoding="utf-8"?>
+<opml version="2.0"><head><title>export</title></head><body>
+<outline text="news"><outline text="daily"><outline text="One" xmlUrl="https://localhost/1.xml" /></outline>
+<outline title="Two" xmlUrl=" https://localhost/2.xml " /></outline>
+<outline text="One again" xmlUrl="https://localhost/1.xml" />
+<outline text="no feed" htmlUrl="https://localhost/" />
+</body></opml>""")
+
+        subscriptions = self.stored_subscriptions()
+        self.assertEqual([(p.title, p.url) for p in subscriptions.podcasts], [("One", "https://localhost/1.xml"), ("Two", "https://localhost/2.xml")])
+
+
+class TestAudioSourceTests(unittest.TestCase):
+
+    def setUp(self):
+        self.body = bytes(range(256)) * 40
+        self.ranges = []
+
+        def handler(request):
+            self.ranges.append(request.headers.get("Range"))
+            if request.path.startswith("/ranged") and not request.headers.get("Range") is None:
+                start = int(request.headers["Range"].split("=")[1].rstrip("-"))
+                content_range = "bytes {0}-{1}/{2}".format(start, len(self.body) - 1, len(self.body))
+                return 206, {"Content-Type": "audio/mpeg", "Content-Range": content_range}, self.body[start:]
+            return 200, {"Content-Type": "audio/mpeg"}, self.body
+
+        self.server = LocalHttpServer(handler)
+
+
+    def tearDown(self):
+        self.server.close()
+
+
+    def test_range_request_starts_at_offset(self):
+        source = HttpAudioSource(self.server.url + "/ranged/episode.mp3", 1000)
+
+        self.assertEqual(self.ranges, ["bytes=1000-"])
+        self.assertEqual((source.offset, source.content_length), (1000, len(self.body)))
+        self.assertEqual(source.audio_format, miniaudio.FileFormat.MP3)
+        self.assertEqual(source.read(10), self.body[1000:1010])
+        self.assertEqual(source.position, 1010)
+        source.close()
+
+
+    def test_dropped_connection_is_resumed_with_range(self):
+        def handler(request):
+            self.ranges.append(request.headers.get("Range"))
+            if request.headers.get("Range") is None:
+                return 200, {"Content-Type": "audio/mpeg", "Content-Length": str(len(self.body))}, self.body[:3000]
+            start = int(request.headers["Range"].split("=")[1].rstrip("-"))
+            content_range = "bytes {0}-{1}/{2}".format(start, len(self.body) - 1, len(self.body))
+            return 206, {"Content-Type": "audio/mpeg", "Content-Range": content_range}, self.body[start:]
+
+        server = LocalHttpServer(handler)
+        try:
+            source = HttpAudioSource(server.url + "/episode.mp3")
+            data = b"".join(iter(lambda: source.read(1000), b""))
+            source.close()
+        finally:
+            server.close()
+
+        self.assertEqual(data, self.body)
+        self.assertEqual(self.ranges[-2:], [None, "bytes=3000-"])
+        self.assertEqual(source.reconnects, 1)
+        self.assertIsNone(source.error)
+
+
+    def test_read_ahead_pauses_at_high_watermark(self):
+        self.body = bytes(range(256)) * 4000
+        source = HttpAudioSource(self.server.url + "/plain/episode.mp3", read_ahead_bytes=64 * 1024)
+
+        deadline = time.monotonic() + 5
+        while source.fill < source.high_watermark and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+
+        # full enough: filling has stopped well short of the whole file
+        self.assertGreaterEqual(source.fill, source.high_watermark)
+        self.assertLess(source.bytes_received, len(self.body))
+
+        data = b"".join(iter(lambda: source.read(4096), b""))
+        source.close()
+        self.assertEqual(data, self.body)
+
+
+    def test_ring_buffer_wraps_around(self):
+        ring = RingBuffer(10)
+
+        self.assertEqual(ring.write(b"abcdefgh"), 8)
+        self.assertEqual(ring.read(6), b"abcdef")
+        self.assertEqual(ring.write(b"ijklmnopqr"), 8)
+        self.assertEqual(ring.free, 0)
+        self.assertEqual(ring.read(100), b"ghijklmnop")
+        self.assertEqual(len(ring), 0)
+
+
+    def test_ignored_range_starts_at_beginning(self):
+        source = HttpAudioSource(self.server.url + "/plain/episode.mp3", 1000)
+
+        self.assertEqual(source.offset, 0)
+        self.assertEqual(source.read(len(self.body) + 10), self.body)
+        self.assertEqual(source.read(10), b"")
+        source.close()
+
+
+class TestSilenceTrimmerTests(unittest.TestCase):
+
+    def setUp(self):
+        silence = np.zeros((44100 * 2, 2), dtype=np.int16)
+        pause = np.zeros((4410, 2), dtype=np.int16)
+        # a second of sound, two seconds of silence, a second of sound, a tenth of a second's pause, a second of sound
+        self.samples = np.concatenate([make_test_tone(1), silence, make_test_tone(1), pause, make_test_tone(1)])
+
+
+    def read_all(self, trimmer, block_frames: int = 1024) -> np.ndarray:
+        blocks = []
+        while not trimmer.ended:
+            blocks.append(trimmer.read(block_frames))
+        return np.concatenate(blocks)
+
+
+    def test_long_silences_are_shortened(self):
+        trimmer = SilenceTrimmer(ArrayFrames(self.samples), 2, 44100, enabled=True)
+        output = self.read_all(trimmer, 44100)
+
+        # only the long silence is shortened (to KEEP_SECONDS), the short pause is kept
+        trimmed = 2 - SilenceTrimmer.KEEP_SECONDS
+        self.assertAlmostEqual(trimmer.frames_trimmed / 44100, trimmed, places=2)
+        self.assertEqual(len(output), len(self.samples) - trimmer.frames_trimmed)
+
+
+    def test_disabled_passes_frames_through(self):
+        trimmer = SilenceTrimmer(ArrayFrames(self.samples), 2, 44100)
+        output = self.read_all(trimmer)
+
+        self.assertTrue(np.array_equal(output, self.samples))
+        self.assertEqual(trimmer.frames_trimmed, 0)
+
+
+    def test_work_per_read_is_bounded(self):
+        source = ArrayFrames(np.zeros((44100 * 10, 2), dtype=np.int16))
+        trimmer = SilenceTrimmer(source, 2, 44100, enabled=True)
+
+        block = trimmer.read(1024)
+
+        self.assertEqual(len(block), 1024)
+        self.assertLessEqual(source.frames_read, 1024 * (SilenceTrimmer.MAX_READ_FACTOR + 1))
+
+
+class TestTimeStretcherTests(unittest.TestCase):
+
+    def read_all(self, stretcher, block_frames: int = 1024) -> np.ndarray:
+        blocks = []
+        while not stretcher.ended:
+            blocks.append(stretcher.read(block_frames))
+        return np.concatenate(blocks)
+
+
+    def test_normal_speed_passes_frames_through(self):
+        tone = make_test_tone(1)
+        output = self.read_all(TimeStretcher(ArrayFrames(tone), 2))
+
+        self.assertTrue(np.array_equal(output, tone))
+
+
+    def test_faster_speed_is_shorter_at_the_same_pitch(self):
+        tone = make_test_tone(4)
+        for speed in (1.5, 2.0):
+            output = self.read_all(TimeStretcher(ArrayFrames(tone), 2, speed))
+
+            self.assertAlmostEqual(len(output) / len(tone), 1 / speed, places=2)
+            spectrum = np.abs(np.fft.rfft(output[:44100, 0].astype(np.float64)))
+            self.assertEqual(int(np.argmax(spectrum)), 220)
+
+
+    def test_back_to_normal_speed_carries_on_where_stretching_left_off(self):
+        tone = make_test_tone(2)
+        source = ArrayFrames(tone)
+        stretcher = TimeStretcher(source, 2, 2.0)
+        stretched = stretcher.read(22050)
+
+        stretcher.speed = 1.0
+        rest = self.read_all(stretcher)
+
+        # half a second at double speed took a second of input, and (give or take a segment) the rest plays as is
+        self.assertEqual(len(stretched), 22050)
+        self.assertAlmostEqual(len(rest) / 44100, 1.0, delta=TimeStretcher.FRAME_SIZE / 44100)
+
+
+class TestPlayerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(2):
+            path = os.path.join(self.directory.name, "{0}.wav".format(i))
+            write_test_audio(path, 2)
+            self.paths.append(path)
+        self.player = Player(backends=[miniaudio.Backend.NULL])
+        self.episodes = [Episode(TEST_EPISODE_NAME, TEST_EPISODE_FEED_URL + str(i), "", TEST_EPISODE_PUBDATE, "") for i in range(2)]
+
+
+    def tearDown(self):
+        self.player.close()
+        self.directory.cleanup()
+
+
+    def test_play_tracks_position_and_duration(self):
+        self.player.play(self.episodes[0], self.paths[0])
+        time.sleep(0.3)
+        self.player.pause()
+
+        position = self.player.position_seconds
+        self.assertGreater(position, 0)
+        self.assertAlmostEqual(self.player.duration_seconds, 2, places=2)
+
+        time.sleep(0.2)
+        self.assertEqual(self.player.position_seconds, position)
+
+
+    def test_pause_does_not_wait_for_a_seek(self):
+        self.player.play(self.episodes[0], self.paths[0])
+
+        opening = threading.Event()
+        open_decoder = self.player._open
+
+        def slow_open(*args):
+            # as a slow Range request for a streamed episode would be
+            opening.set()
+            time.sleep(1)
+            return open_decoder(*args)
+
+        self.player._open = slow_open
+        seeking = threading.Thread(target=self.player.seek, args=(1,))
+        seeking.start()
+        opening.wait(5)
+
+        started = time.monotonic()
+        self.player.pause()
+        elapsed = time.monotonic() - started
+        seeking.join()
+
+        self.assertLess(elapsed, 0.5)
+        self.assertFalse(self.player.is_playing)
+        self.assertFalse(self.player._device.running)
+        self.assertAlmostEqual(self.player.position_seconds, 1, places=2)
+
+
+    def test_pause_during_a_slow_play_is_kept(self):
+        self.player.play(self.episodes[0], self.paths[0])
+
+        opening = threading.Event()
+        open_decoder = self.player._open
+
+        def slow_open(*args):
+            # as a slow request for a streamed episode would be
+            opening.set()
+            time.sleep(0.5)
+            return open_decoder(*args)
+
+        self.player._open = slow_open
+        playing = threading.Thread(target=self.player.play, args=(self.episodes[1], self.paths[1]))
+        playing.start()
+        opening.wait(5)
+
+        started = time.monotonic()
+        self.player.pause()
+        elapsed = time.monotonic() - started
+        playing.join()
+
+        self.assertLess(elapsed, 0.25)
+        self.assertIs(self.player.episode, self.episodes[1])
+        self.assertFalse(self.player.is_playing)
+        self.assertFalse(self.player._device.running)
+
+        # and a later play resumes it
+        self.player.play(self.episodes[1], self.paths[1])
+        self.assertTrue(self.player.is_playing)
+
+
+    def test_switching_episodes_reuses_device_and_releases_decoder(self):
+        self.player.play(self.episodes[0], self.paths[0])
+        device = self.player._device
+        decoder = self.player._decoder
+
+        self.player.play(self.episodes[1], self.paths[1])
+
+        self.assertIs(self.player._device, device)
+        self.assertIs(self.player.episode, self.episodes[1])
+        self.assertIsNone(decoder.gi_frame)
+
+
+    def test_seek_in_local_file(self):
+        self.player.play(self.episodes[0], self.paths[0])
+        self.player.pause()
+        self.player.seek(1.5)
+
+        self.assertAlmostEqual(self.player.position_seconds, 1.5, places=2)
+
+        # what's left to decode is what follows the position sought to
+        remaining = 0
+        for samples in iter(lambda: self.player._decoder.send(4096), None):
+            remaining += len(samples) // Player.OUTPUT_CHANNELS
+        self.assertAlmostEqual(remaining / Player.OUTPUT_SAMPLE_RATE, 0.5, places=1)
+
+
+    def test_play_from_position(self):
+        self.player.play(self.episodes[0], self.paths[0], 1.25)
+        self.player.pause()
+
+        self.assertGreaterEqual(self.player.position_seconds, 1.25)
+        self.assertLess(self.player.position_seconds, 1.75)
+
+
+    def test_seek_in_internet_source_without_ranges(self):
+        with open(self.paths[0], "rb") as audio:
+            body = audio.read()
+        server = LocalHttpServer(lambda request: (200, {"Content-Type": "audio/wav"}, body))
+        try:
+            episode = Episode(TEST_EPISODE_NAME, server.url + "/episode.wav", "", TEST_EPISODE_PUBDATE, "2")
+            self.player.play(episode)
+            self.player.pause()
+            self.player.seek(1.5)
+            self.player.skip(-0.5)
+        finally:
+            server.close()
+
+        self.assertAlmostEqual(self.player.position_seconds, 1.0, places=2)
+        self.assertEqual(self.player.duration_seconds, 2)
+
+
+    def test_speed_is_limited_and_kept_across_episodes(self):
+        self.player.speed = 5
+        self.assertEqual(self.player.speed, Player.MAX_SPEED)
+
+        self.player.speed = 1.5
+        self.player.play(self.episodes[0], self.paths[0])
+        self.player.play(self.episodes[1], self.paths[1])
+        self.assertEqual(self.player._output.speed, 1.5)
+
+
+class TestMediaKeysTests(unittest.TestCase):
+
+    class RecordingApp:
+        """stands in for the app, recording the messages posted to it"""
+
+        def __init__(self) -> None:
+            self.messages = []
+
+        def post_message(self, message) -> bool:
+            self.messages.append(message)
+            return True
+
+
+    def setUp(self):
+        self.app = self.RecordingApp()
+        self.media_keys = MediaKeys(self.app)
+        # NOTE: the listener isn't started (there may be no display to hook); keys are fed to it directly
+        self.media_keys._keys = {"play": "play_pause", "next": "next", "previous": "previous"}
+
+
+    def test_media_keys_are_posted_to_the_app(self):
+        # as the listener would, from its own thread
+        listener = threading.Thread(target=lambda: [self.media_keys._released(key) for key in ("play", "a", "next", "previous")])
+        listener.start()
+        listener.join()
+
+        self.assertEqual([m.key for m in self.app.messages], ["play_pause", "next", "previous"])
+
+
+    def test_repeated_keys_are_debounced(self):
+        self.media_keys._released("play")
+        self.media_keys._released("play")
+        self.media_keys._released("next")
+
+        self.assertEqual([m.key for m in self.app.messages], ["play_pause", "next"])
+
+        time.sleep(MediaKeys.DEBOUNCE_SECONDS)
+        self.media_keys._released("play")
+        self.assertEqual(len(self.app.messages), 3)
+
+
+    def test_stop_without_start(self):
+        self.media_keys.stop()
+        self.assertFalse(self.media_keys.listening)
+
+
+class TestPodcastListTests(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+
+    async def test_subscribing_updates_only_the_podcast_row(self):
+        from textual.widgets import DataTable
+        from tuipod.ui.podcast_app import PodcastApp
+
+        with open("subscriptions.opml", "wt", encoding="utf-8") as opml:
+            opml.write('<opml><body><outline text="feeds"><outline text="A Podcast" xmlUrl="https://localhost/a.xml" /><outline text="Another" xmlUrl="https://localhost/b.xml" /></outline></body></opml>')
+
+        app = PodcastApp()
+        async with app.run_test() as pilot:
+            table = app.query_one("#PodcastList", DataTable)
+            for _ in range(100):
+                if table.row_count == 2:
+                    break
+                await pilot.pause(0.01)
+
+            async def no_search(search_text: str):
+                raise AssertionError("searched again")
+                yield
+
+            app.searcher.stream_search = no_search
+
+            # as listed by a search
+            found = Podcast(TEST_PODCAST_NAME, TEST_PODCAST_FEED_URL, "")
+            app._search_result_urls.add(found.url)
+            app.podcast_registry[found.id] = found
+            table.add_row("", found.title, key=found.id)
+
+            app.current_podcast = found
+            app.action_subscribe_to_podcast()
+            self.assertEqual(table.get_cell(found.id, "status"), "SUB")
+
+            app.action_unsubscribe_from_podcast()
+            self.assertEqual(table.get_cell(found.id, "status"), "")
+            self.assertEqual(table.row_count, 3)
+
+            # only listed as a subscription, so dropped once unsubscribed
+            app.current_podcast = app.subscriptions.podcasts[0]
+            app.action_unsubscribe_from_podcast()
+            self.assertEqual(table.row_count, 2)
+            self.assertEqual(len(app.subscriptions), 1)
+
+            app.action_subscribe_to_podcast()
+            self.assertEqual(table.get_cell(app.current_podcast.id, "status"), "SUB")
+            self.assertEqual(len(app.subscriptions), 2)
+
+    async def test_unsubscribing_does_not_wait_for_the_episode_index(self):
+        from textual.widgets import DataTable
+        from tuipod.ui.podcast_app import PodcastApp
+
+        with open("subscriptions.opml", "wt", encoding="utf-8") as opml:
+            opml.write('<opml><body><outline text="feeds"><outline text="A Podcast" xmlUrl="https://localhost/a.xml" /></outline></body></opml>')
+
+        app = PodcastApp()
+        async with app.run_test() as pilot:
+            table = app.query_one("#PodcastList", DataTable)
+            for _ in range(100):
+                if table.row_count == 1:
+                    break
+                await pilot.pause(0.01)
+
+            # as while a refresh is indexing
+            app.episode_index._lock.acquire()
+            try:
+                app.current_podcast = app.subscriptions.podcasts[0]
+                started = time.monotonic()
+                app.action_unsubscribe_from_podcast()
+                self.assertLess(time.monotonic() - started, 0.1)
+                self.assertEqual(len(app.subscriptions), 0)
+                self.assertEqual(table.row_count, 0)
+            finally:
+                app.episode_index._lock.release()
+            await app.workers.wait_for_complete()
+
+
+class TestCliTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+        self.audio = bytes(range(256)) * 64
+
+        def handler(request):
+            if request.path.startswith("/missing"):
+                return 404, {}, b""
+            if request.path.endswith(".mp3"):
+                return 200, {}, self.audio
+            return 200, {}, make_test_feed(3).replace(TEST_PODCAST_FEED_URL.encode("utf-8"), (self.server.url + "/podcast").encode("utf-8"))
+
+        self.server = LocalHttpServer(handler)
+
+        subscriptions = SubscriptionList()
+        subscriptions.add_podcast(Podcast(TEST_PODCAST_NAME, self.server.url + "/feed.xml", ""))
+        subscriptions.add_podcast(Podcast("Gone", self.server.url + "/missing.xml", ""))
+        subscriptions.export(subscriptions.path)
+
+
+    def tearDown(self):
+        self.server.close()
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+
+    def run_cli(self, *args) -> (int, dict):
+        """run a command, returning its exit status and (parsed) JSON report"""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = cli.main(list(args))
+        return status, json.loads(output.getvalue())
+
+
+    def test_sync_refreshes_and_indexes_feeds(self):
+        status, stats = self.run_cli("sync")
+
+        self.assertEqual(status, 1)
+        self.assertEqual((stats["command"], stats["feeds"], stats["refreshed"], stats["failed"]), ("sync", 2, 1, 1))
+        self.assertEqual((stats["episodes"], stats["indexed"]), (3, 3))
+        self.assertTrue(stats["errors"][0]["url"].endswith("/missing.xml"))
+        self.assertEqual(len(EpisodeIndex().search("episode")), 3)
+
+
+    def test_download_fetches_the_latest_episodes_once(self):
+        status, stats = self.run_cli("download", "--latest", "2")
+
+        self.assertEqual(status, 1)
+        self.assertEqual(stats["sync"]["refreshed"], 1)
+        self.assertEqual((stats["downloads"], stats["failed"], stats["bytes"]), (2, 0, 2 * len(self.audio)))
+
+        _, stats = self.run_cli("download", "--latest", "2")
+        self.assertEqual((stats["downloads"], stats["already_downloaded"]), (0, 2))
+
+
+    def test_export_writes_opml_to_standard_output(self):
+        environment = dict(os.environ, PYTHONPATH=self.cwd)
+        result = subprocess.run([sys.executable, "-m", "tuipod", "export"], capture_output=True, text=True, env=environment)
+
+        self.assertEqual(result.returncode, 0)
+        self.assertIn("/missing.xml", result.stdout)
+        self.assertEqual(json.loads(result.stderr)["feeds"], 2)
+
+
+class TestStartupTests(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+
+    def test_heavy_libraries_are_not_imported_on_startup(self):
+        deferred = ["miniaudio", "numpy", "pynput", "bs4", "textual.widgets._markdown", "tuipod.models.player"]
+        script = "import sys, tuipod.ui.podcast_app; print(' '.join(m for m in {0!r} if m in sys.modules))".format(deferred)
+
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, cwd=self.cwd, check=True)
+
+        self.assertEqual(result.stdout.strip(), "")
+
+
+    async def test_subscriptions_are_listed_after_first_paint(self):
+        from textual.widgets import DataTable
+        from tuipod.ui.podcast_app import PodcastApp
+
+        with open("subscriptions.opml", "wt", encoding="utf-8") as opml:
+            opml.write('<opml><body><outline text="feeds"><outline text="A Podcast" xmlUrl="https://localhost/a.xml" /><outline text="Another" xmlUrl="https://localhost/b.xml" /></outline></body></opml>')
+
+        app = PodcastApp()
+        async with app.run_test() as pilot:
+            table = app.query_one("#PodcastList", DataTable)
+            for _ in range(100):
+                if table.row_count == 2:
+                    break
+                await pilot.pause(0.01)
+
+            self.assertEqual(table.row_count, 2)
+            # nothing has been played, so the audio libraries haven't been needed
+            self.assertIsNone(app._player)
+
+
 if __name__ == "__main__":
     unittest.main()
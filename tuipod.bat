@@ -1,2 +1,2 @@
 @ECHO OFF
-python -m tuipod
\ No newline at end of file
+python -m tuipod %*
\ No newline at end of file
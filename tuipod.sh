@@ -1,2 +1,2 @@
 #!/usr/bin/env sh
-python -m tuipod
\ No newline at end of file
+python -m tuipod "$@"
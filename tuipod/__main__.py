@@ -4,10 +4,16 @@
 # 2024-11-12: Matthew Hickson
 #
 
-from tuipod.ui.podcast_app import PodcastApp
+import sys
 
 if __name__ == "__main__":
 
+    if len(sys.argv) > 1:
+        # NOTE: a command runs headless (see cli.py), without loading the TUI at all
+        from tuipod.cli import main
+        sys.exit(main(sys.argv[1:]))
+
+    from tuipod.ui.podcast_app import PodcastApp
+
     app = PodcastApp()
     app.run()
-
@@ -0,0 +1,141 @@
+#
+# cli.py
+#
+# Headless (batch) commands, for running without the TUI - e.g. from cron, so the app opens to warm caches:
+#
+#   python -m tuipod sync       refresh every subscribed feed (into the feed cache and the episode index)
+#   python -m tuipod download   sync, downloading the latest episodes of each podcast as its feed comes in
+#   python -m tuipod export     write the subscriptions as OPML
+#
+# Each command reports what it did (counts, timing and throughput) as JSON on standard output, and exits with a
+# non-zero status if anything failed.
+#
+
+import argparse
+import json
+import sys
+import time
+
+from tuipod.models.download_manager import Download, DownloadManager
+from tuipod.models.episode_index import EpisodeIndex
+from tuipod.models.feed_cache import FeedCache
+from tuipod.models.feed_refresher import FeedRefresher, FeedRefreshResult
+from tuipod.models.subscription_list import SubscriptionList
+
+DEFAULT_LATEST_EPISODES = 1
+
+
+def sync(subscriptions: SubscriptionList, on_refreshed=None) -> dict:
+    """
+    refresh every subscribed feed concurrently, indexing the episodes of each, returning the statistics
+
+    NOTE: on_refreshed (if supplied) is called (from the refreshing thread) with each successful FeedRefreshResult.
+    """
+    refresher = FeedRefresher(FeedCache())
+    index = EpisodeIndex()
+    indexed = 0
+
+    def progress(completed: int, total: int, result: FeedRefreshResult) -> None:
+        nonlocal indexed
+        if result.succeeded:
+            indexed += index.index_podcast(result.podcast)
+            if not on_refreshed is None:
+                on_refreshed(result)
+
+    started = time.monotonic()
+    try:
+        results = refresher.refresh(subscriptions.podcasts, progress)
+    finally:
+        index.close()
+    seconds = time.monotonic() - started
+
+    failed = [r for r in results if not r.succeeded]
+    return {
+        "feeds": len(results),
+        "refreshed": len(results) - len(failed),
+        "failed": len(failed),
+        "episodes": sum(len(r.podcast.episode_store) for r in results if r.succeeded),
+        "indexed": indexed,
+        "attempts": sum(r.attempts for r in results),
+        "seconds": round(seconds, 3),
+        "feeds_per_second": round(len(results) / seconds, 2) if seconds > 0 else 0,
+        "slowest_feed_seconds": round(max((r.elapsed for r in results), default=0), 3),
+        "errors": [{"url": r.podcast.url, "error": str(r.error)} for r in failed]
+    }
+
+
+def download(subscriptions: SubscriptionList, latest: int = DEFAULT_LATEST_EPISODES) -> dict:
+    """sync, downloading the latest episodes of each podcast (that aren't already) as its feed is refreshed, returning the statistics"""
+    manager = DownloadManager()
+    downloads = []
+
+    def refreshed(result: FeedRefreshResult) -> None:
+        for episode in result.podcast.episodes[:latest]:
+            downloads.append(manager.enqueue(episode.url, episode.title))
+
+    started = time.monotonic()
+    stats = {"sync": sync(subscriptions, refreshed)}
+    for d in downloads:
+        d.wait()
+    seconds = time.monotonic() - started
+
+    fetched = [d for d in downloads if d.state == Download.COMPLETE and not d.started_at is None]
+    failed = [d for d in downloads if d.state == Download.FAILED]
+    transferred = sum(d.bytes_done - d.resumed_from for d in fetched)
+    stats.update({
+        "downloads": len(fetched),
+        "already_downloaded": len([d for d in downloads if d.state == Download.COMPLETE and d.started_at is None]),
+        "failed": len(failed),
+        "bytes": transferred,
+        "seconds": round(seconds, 3),
+        "bytes_per_second": round(transferred / seconds) if seconds > 0 else 0,
+        "errors": [{"url": d.url, "error": str(d.error)} for d in failed]
+    })
+    return stats
+
+
+def export(subscriptions: SubscriptionList, output: str) -> dict:
+    """write the subscriptions as OPML, to a file (or standard output, for '-'), returning the statistics"""
+    started = time.monotonic()
+    if output == "-":
+        sys.stdout.write(subscriptions.opml())
+        sys.stdout.flush()
+    else:
+        subscriptions.export(output)
+    return {"feeds": len(subscriptions), "output": output, "seconds": round(time.monotonic() - started, 3)}
+
+
+def main(argv: [str] = None) -> int:
+    """run a headless command, reporting its statistics as JSON, returning the exit status"""
+    parser = argparse.ArgumentParser(prog="python -m tuipod", description="tuipod batch commands (run without a command for the TUI)")
+    parser.add_argument("--subscriptions", default=SubscriptionList.SUBSCRIPTION_FILE, help="the subscription (OPML) file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("sync", help="refresh every subscribed feed")
+
+    download_parser = commands.add_parser("download", help="sync, and download the latest episodes of each podcast")
+    download_parser.add_argument("--latest", type=int, default=DEFAULT_LATEST_EPISODES, help="how many of each podcast's latest episodes to keep downloaded")
+
+    export_parser = commands.add_parser("export", help="write the subscriptions as OPML")
+    export_parser.add_argument("--output", default="-", help="the OPML file to write ('-' for standard output)")
+
+    args = parser.parse_args(argv)
+
+    subscriptions = SubscriptionList(args.subscriptions)
+    subscriptions.retrieve()
+
+    if args.command == "sync":
+        stats = sync(subscriptions)
+    elif args.command == "download":
+        stats = download(subscriptions, max(0, args.latest))
+    else:
+        stats = export(subscriptions, args.output)
+
+    stats = {"command": args.command, **stats}
+
+    # NOTE: OPML written to standard output keeps it to itself; the statistics go to standard error instead
+    report = sys.stderr if args.command == "export" and args.output == "-" else sys.stdout
+    report.write(json.dumps(stats, indent=2) + "\n")
+
+    failed = stats.get("failed", 0) > 0 or stats.get("sync", {}).get("failed", 0) > 0
+    return 1 if failed else 0
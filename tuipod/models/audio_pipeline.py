@@ -0,0 +1,265 @@
+import numpy as np
+
+def to_float(samples: np.ndarray) -> np.ndarray:
+    """int16 samples as float32, in [-1, 1)"""
+    return samples.astype(np.float32) / 32768
+
+def to_int16(samples: np.ndarray) -> np.ndarray:
+    """float32 samples as int16 (clipped)"""
+    return np.clip(samples * 32768, -32768, 32767).astype(np.int16)
+
+class DecodedFrames:
+    """
+    The start of the playback pipeline: a miniaudio decoder's output, read in blocks of (frames, channels) int16
+    samples of exactly the size asked for (fewer only at the end), counting the frames read.
+
+    Every stage of the pipeline has the same interface (read(frames), and ended), reading from the stage before it.
+    """
+
+    # the most frames a miniaudio stream generator produces per request
+    MAX_DECODE_FRAMES = 16384
+
+    def __init__(self, decoder, channels: int) -> None:
+        """initialize the stage over a (primed) miniaudio stream generator"""
+        self.decoder = decoder
+        self.channels = channels
+        self.frames_read = 0
+        self.ended = False
+        self._pending = np.zeros((0, channels), dtype=np.int16)
+
+    def read(self, frames: int) -> np.ndarray:
+        """the next block of frames"""
+        pieces = [self._pending]
+        available = len(self._pending)
+
+        while available < frames and not self.ended:
+            try:
+                samples = self.decoder.send(min(frames - available, self.MAX_DECODE_FRAMES))
+            except StopIteration:
+                self.ended = True
+                break
+            block = np.frombuffer(samples, dtype=np.int16).reshape(-1, self.channels)
+            pieces.append(block)
+            available += len(block)
+
+        combined = pieces[0] if len(pieces) == 1 else np.concatenate(pieces)
+        self._pending = combined[frames:]
+        block = combined[:frames]
+        self.frames_read += len(block)
+        return block
+
+
+class SilenceTrimmer:
+    """
+    A playback pipeline stage shortening silences (pauses between sentences, dead air), when enabled.
+
+    The audio is measured in short blocks (RMS, with NumPy); of each run of quiet blocks, only the first
+    KEEP_SECONDS are played, and the rest is dropped. The frames dropped are counted, for the time saved.
+
+    NOTE: the work per read is bounded - at most MAX_READ_FACTOR times the frames asked for are read and measured;
+    past that, the silence is played rather than held up looking for its end (which could cause an underrun).
+    """
+
+    BLOCK_SECONDS = 0.01
+    # quieter than this (RMS, as a share of full scale: about -40dB) counts as silence
+    THRESHOLD = 0.01
+    KEEP_SECONDS = 0.25
+    MAX_READ_FACTOR = 8
+
+    def __init__(self, source, channels: int, sample_rate: int, enabled: bool = False) -> None:
+        """initialize the stage, reading from the stage before it"""
+        self.source = source
+        self.channels = channels
+        self.enabled = enabled
+        self.frames_trimmed = 0
+        self._block_frames = int(sample_rate * self.BLOCK_SECONDS)
+        self._keep_frames = int(sample_rate * self.KEEP_SECONDS)
+        # the threshold, as the mean square of int16 samples
+        self._threshold = (self.THRESHOLD * 32768) ** 2
+        # how long the silence running at the end of the last block read has been so far
+        self._silent_frames = 0
+        self._pending = np.zeros((0, channels), dtype=np.int16)
+
+    @property
+    def ended(self) -> bool:
+        """whether everything has been read"""
+        return self.source.ended and len(self._pending) == 0
+
+    def read(self, frames: int) -> np.ndarray:
+        """the next block of frames, with long silences shortened"""
+        if not self.enabled and len(self._pending) == 0:
+            self._silent_frames = 0
+            return self.source.read(frames)
+
+        pieces = [self._pending]
+        available = len(self._pending)
+        budget = frames * self.MAX_READ_FACTOR
+
+        while available < frames and not self.source.ended:
+            block = self.source.read(frames - available)
+            budget -= len(block)
+            if self.enabled and budget >= 0:
+                block = self._trim(block)
+            pieces.append(block)
+            available += len(block)
+
+        combined = pieces[0] if len(pieces) == 1 else np.concatenate(pieces)
+        self._pending = combined[frames:]
+        return combined[:frames]
+
+    def _trim(self, samples: np.ndarray) -> np.ndarray:
+        """the samples, without what's beyond KEEP_SECONDS into a silence"""
+        if len(samples) == 0:
+            return samples
+
+        starts = np.arange(0, len(samples), self._block_frames)
+        sizes = np.diff(np.append(starts, len(samples)))
+        power = np.square(samples, dtype=np.float32).mean(axis=1)
+        silent = np.add.reduceat(power, starts) / sizes < self._threshold
+
+        # how far into a silence each block ends (carrying on a silence from the last read, until a sound)
+        silence = np.cumsum(sizes * silent)
+        restart = np.maximum.accumulate(np.where(silent, 0, silence))
+        heard = np.maximum.accumulate(~silent)
+        run = silence - restart + np.where(heard, 0, self._silent_frames)
+
+        self._silent_frames = int(run[-1]) if silent[-1] else 0
+
+        keep = ~silent | (run - sizes < self._keep_frames)
+        if keep.all():
+            return samples
+
+        kept = samples[np.repeat(keep, sizes)]
+        self.frames_trimmed += len(samples) - len(kept)
+        return kept
+
+
+class TimeStretcher:
+    """
+    A playback pipeline stage changing the speed of speech without changing its pitch, by WSOLA (waveform
+    similarity overlap-add).
+
+    Windowed segments of the input are overlap-added at a fixed output hop, and taken from the input at that hop
+    times the speed; each segment's exact start is nudged (within TOLERANCE frames) to where the input best matches
+    the natural continuation of the previous segment, so overlapping segments stay in phase. The similarity search
+    is a cross-correlation of a (decimated) mono mix, so each hop costs a handful of vectorized NumPy calls.
+
+    At normal speed the stage is bypassed: blocks are passed through as read.
+    """
+
+    # ~35ms segments, overlapping by half (a Hann window at half overlap sums to one)
+    FRAME_SIZE = 1536
+    HOP_SIZE = FRAME_SIZE // 2
+    TOLERANCE = 256
+    # the similarity search looks at every DECIMATION-th frame (a quarter of the work, for half the precision)
+    DECIMATION = 2
+    READ_SIZE = 4096
+
+    def __init__(self, source, channels: int, speed: float = 1.0) -> None:
+        """initialize the stage, reading from the stage before it"""
+        self.source = source
+        self.channels = channels
+        self.speed = speed
+        self._window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(self.FRAME_SIZE) / self.FRAME_SIZE)).astype(np.float32)[:, None]
+        # frames to pass through (as is) before reading on, left over from stretching
+        self._held = np.zeros((0, channels), dtype=np.int16)
+        self._reset()
+
+    @property
+    def ended(self) -> bool:
+        """whether everything has been read"""
+        return self.source.ended and len(self._held) == 0 and len(self._output) == 0 and self._input_exhausted()
+
+    def read(self, frames: int) -> np.ndarray:
+        """the next block of frames, played at the current speed"""
+        if self.speed == 1.0:
+            if self._stretching:
+                # back to normal speed: finish with the stretched audio already made, then carry on as is
+                self._flush()
+            return self._read_input(frames)
+
+        self._stretching = True
+        while len(self._output) < frames and not self._input_exhausted():
+            self._step()
+
+        block = self._output[:frames]
+        self._output = self._output[frames:]
+        return to_int16(block)
+
+    def _reset(self) -> None:
+        """start stretching afresh"""
+        self._input = np.zeros((0, self.channels), dtype=np.float32)
+        # how much of the input is audio read (rather than silence padding it out, at the end)
+        self._input_length = 0
+        self._output = np.zeros((0, self.channels), dtype=np.float32)
+        self._overlap = np.zeros((self.FRAME_SIZE, self.channels), dtype=np.float32)
+        self._analysis = 0.0
+        self._previous = None
+        self._stretching = False
+
+    def _flush(self) -> None:
+        """hold on to the stretched audio made so far (ending with the last segment's tail), then the input after it"""
+        tail = self._overlap[:self.FRAME_SIZE - self.HOP_SIZE] if not self._previous is None else self._overlap[:0]
+        resume = 0 if self._previous is None else min(self._input_length, self._previous + self.FRAME_SIZE)
+        self._held = np.concatenate([to_int16(self._output), to_int16(tail), to_int16(self._input[resume:self._input_length]), self._held])
+        self._reset()
+
+    def _read_input(self, frames: int) -> np.ndarray:
+        """frames as they are: any held back, then from the stage before"""
+        if len(self._held) == 0:
+            return self.source.read(frames)
+
+        block = self._held[:frames]
+        self._held = self._held[frames:]
+        if len(block) < frames:
+            block = np.concatenate([block, self.source.read(frames - len(block))])
+        return block
+
+    def _input_exhausted(self) -> bool:
+        """whether the input has run out (there's nothing left to make another segment from)"""
+        return self.source.ended and len(self._held) == 0 and int(round(self._analysis)) >= self._input_length
+
+    def _fill_input(self, needed: int) -> None:
+        """read until there are at least 'needed' input frames (padding with silence at the end)"""
+        while len(self._input) < needed and not (self.source.ended and len(self._held) == 0):
+            block = self._read_input(max(self.READ_SIZE, needed - len(self._input)))
+            self._input = np.concatenate([self._input, to_float(block)])
+            self._input_length = len(self._input)
+
+        if len(self._input) < needed:
+            self._input = np.concatenate([self._input, np.zeros((needed - len(self._input), self.channels), dtype=np.float32)])
+
+    def _step(self) -> None:
+        """overlap-add another segment, making HOP_SIZE more frames of output"""
+        nominal = int(round(self._analysis))
+
+        if self._previous is None:
+            start = nominal
+            self._fill_input(start + self.FRAME_SIZE)
+        else:
+            # where the previous segment would have carried on, and where (give or take) this one should start
+            natural = self._previous + self.HOP_SIZE
+            low = max(0, nominal - self.TOLERANCE)
+            high = nominal + self.TOLERANCE
+            self._fill_input(max(high, natural) + self.FRAME_SIZE)
+
+            step = self.DECIMATION
+            template = self._input[natural:natural + self.FRAME_SIZE:step].mean(axis=1)
+            region = self._input[low:high + self.FRAME_SIZE:step].mean(axis=1)
+            similarity = np.correlate(region, template, mode="valid")
+            start = low + int(np.argmax(similarity)) * step
+
+        self._overlap += self._input[start:start + self.FRAME_SIZE] * self._window
+        self._output = np.concatenate([self._output, self._overlap[:self.HOP_SIZE]])
+        self._overlap = np.concatenate([self._overlap[self.HOP_SIZE:], np.zeros((self.HOP_SIZE, self.channels), dtype=np.float32)])
+
+        self._previous = start
+        self._analysis += self.HOP_SIZE * self.speed
+
+        # drop the input no later segment can start in
+        keep_from = max(0, min(self._previous + self.HOP_SIZE, int(self._analysis) - self.TOLERANCE))
+        if keep_from > 0:
+            self._input = self._input[keep_from:]
+            self._input_length = max(0, self._input_length - keep_from)
+            self._previous -= keep_from
+            self._analysis -= keep_from
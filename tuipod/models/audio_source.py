@@ -0,0 +1,271 @@
+import http.client
+import os
+import re
+import threading
+import urllib.parse
+import urllib.request
+
+import miniaudio
+
+from tuipod.models.network import DEFAULT_TIMEOUT_SECONDS, USER_AGENT
+
+_CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-\d+/(\d+)")
+
+class RingBuffer:
+    """
+    A fixed-capacity ring buffer of bytes.
+
+    NOTE: not thread safe by itself; HttpAudioSource guards it with its condition.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """initialize an empty buffer"""
+        self._buffer = bytearray(capacity)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        """the most bytes the buffer holds"""
+        return len(self._buffer)
+
+    @property
+    def free(self) -> int:
+        """how many more bytes fit"""
+        return len(self._buffer) - self._size
+
+    def write(self, data: bytes) -> int:
+        """append as much of the data as fits, returning how many bytes were written"""
+        count = min(len(data), self.free)
+        end = (self._start + self._size) % len(self._buffer)
+        first = min(count, len(self._buffer) - end)
+        self._buffer[end:end + first] = data[:first]
+        self._buffer[:count - first] = data[first:count]
+        self._size += count
+        return count
+
+    def read(self, num_bytes: int) -> bytes:
+        """take up to num_bytes from the front of the buffer"""
+        count = min(num_bytes, self._size)
+        first = min(count, len(self._buffer) - self._start)
+        data = bytes(self._buffer[self._start:self._start + first]) + bytes(self._buffer[:count - first])
+        self._start = (self._start + count) % len(self._buffer)
+        self._size -= count
+        return data
+
+
+class HttpAudioSource(miniaudio.StreamableSource):
+    """
+    An episode's audio, streamed over HTTP for decoding, optionally starting part way in (with a Range request).
+
+    A background thread reads ahead into a ring buffer, so a network hiccup is absorbed by the buffer rather than
+    heard as a dropout. Filling pauses at the high watermark, and resumes once playback has drained the buffer to
+    the low watermark. A dropped connection is re-requested (with a Range request) from where it left off.
+
+    Unlike miniaudio's IceCastClient (made for endless radio streams), reading ends at the end of the file.
+
+    NOTE: deliberately not opened through network.open_url - a stream lasts as long as the episode plays, and
+    mustn't hold on to one of the (few) request slots for that long.
+    """
+
+    FORMATS = {
+        "audio/mpeg": miniaudio.FileFormat.MP3,
+        "audio/mp3": miniaudio.FileFormat.MP3,
+        "audio/flac": miniaudio.FileFormat.FLAC,
+        "audio/x-flac": miniaudio.FileFormat.FLAC,
+        "audio/ogg": miniaudio.FileFormat.VORBIS,
+        "audio/vorbis": miniaudio.FileFormat.VORBIS,
+        "audio/wav": miniaudio.FileFormat.WAV,
+        "audio/x-wav": miniaudio.FileFormat.WAV,
+        ".mp3": miniaudio.FileFormat.MP3,
+        ".flac": miniaudio.FileFormat.FLAC,
+        ".ogg": miniaudio.FileFormat.VORBIS,
+        ".wav": miniaudio.FileFormat.WAV
+    }
+
+    READ_AHEAD_BYTES = 4 * 1024 * 1024
+    CHUNK_SIZE = 64 * 1024
+    HIGH_WATERMARK = 0.75
+    LOW_WATERMARK = 0.25
+    # after running dry, reading waits for this much (or the end) before carrying on
+    REBUFFER_BYTES = 64 * 1024
+    MAX_RECONNECTS = 5
+    RECONNECT_BACKOFF_SECONDS = 0.5
+
+    def __init__(self, url: str, offset: int = 0, timeout: float = DEFAULT_TIMEOUT_SECONDS, read_ahead_bytes: int = READ_AHEAD_BYTES) -> None:
+        """open the stream, from a byte offset into the file (when the server supports ranges; otherwise from the start)"""
+        self.url = url
+        self.timeout = timeout
+
+        self._response = self._request(offset)
+
+        self.offset = 0
+        self.content_length = None
+        content_range = _CONTENT_RANGE.match(self._response.headers.get("Content-Range", ""))
+        if self._response.status == 206 and not content_range is None:
+            self.offset = int(content_range.group(1))
+            self.content_length = int(content_range.group(2))
+        elif not self._response.headers.get("Content-Length") is None:
+            self.content_length = int(self._response.headers["Content-Length"])
+
+        self.audio_format = self._format(url, self._response.headers.get_content_type())
+
+        self.bytes_read = 0
+        self.bytes_received = 0
+        self.underruns = 0
+        self.reconnects = 0
+        self.error = None
+
+        self._buffer = RingBuffer(read_ahead_bytes)
+        self._chunk_size = min(self.CHUNK_SIZE, read_ahead_bytes // 4)
+        self.high_watermark = min(int(read_ahead_bytes * self.HIGH_WATERMARK), read_ahead_bytes - self._chunk_size)
+        self.low_watermark = int(read_ahead_bytes * self.LOW_WATERMARK)
+        self._rebuffer_bytes = min(self.REBUFFER_BYTES, self.low_watermark)
+        self._ended = False
+        self._closed = False
+        self._condition = threading.Condition()
+
+        self._filler = threading.Thread(target=self._fill, name="read-ahead", daemon=True)
+        self._filler.start()
+
+    @property
+    def position(self) -> int:
+        """the byte offset into the file that has been read (by the decoder) up to"""
+        return self.offset + self.bytes_read
+
+    @property
+    def fill(self) -> int:
+        """how many bytes are buffered, ready to be read"""
+        return len(self._buffer)
+
+    @property
+    def fill_ratio(self) -> float:
+        """how full the read-ahead buffer is (1.0 once the rest of the file is buffered)"""
+        if self._ended:
+            return 1.0
+        return len(self._buffer) / self._buffer.capacity
+
+    def read(self, num_bytes: int) -> bytes:
+        """read num_bytes of audio (fewer only at the end of the file), waiting for the buffer if need be"""
+        with self._condition:
+            wanted = min(num_bytes, self._buffer.capacity)
+            if len(self._buffer) < wanted and not self._ended:
+                # ran dry: wait for a little more than asked, so playback doesn't stutter along at the fill rate
+                self.underruns += 1
+                wanted = max(wanted, self._rebuffer_bytes)
+                while len(self._buffer) < wanted and not self._ended and not self._closed:
+                    self._condition.wait()
+
+            data = self._buffer.read(num_bytes)
+            self.bytes_read += len(data)
+            self._condition.notify_all()
+            return data
+
+    def close(self) -> None:
+        """stop reading ahead, and close the stream"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._response.close()
+
+    def _fill(self) -> None:
+        """read ahead into the buffer (on the read-ahead thread) until the end of the file, or until closed"""
+        try:
+            self._fill_until_done()
+        finally:
+            self._response.close()
+
+    def _fill_until_done(self) -> None:
+        """the read-ahead loop"""
+        attempts = 0
+
+        while True:
+            with self._condition:
+                if len(self._buffer) >= self.high_watermark:
+                    while len(self._buffer) > self.low_watermark and not self._closed:
+                        self._condition.wait()
+                if self._closed:
+                    return
+
+            error = None
+            try:
+                chunk = self._response.read(self._chunk_size)
+            except Exception as err:
+                # NOTE: not just network errors - close() may close the response out from under the read
+                chunk = b""
+                error = err
+
+            with self._condition:
+                if self._closed:
+                    return
+
+                if len(chunk) > 0:
+                    self._buffer.write(chunk)
+                    self.bytes_received += len(chunk)
+                    attempts = 0
+                    self._condition.notify_all()
+                    continue
+
+                if error is None and (self.content_length is None or self.offset + self.bytes_received >= self.content_length):
+                    self._end()
+                    return
+
+                # the connection dropped before the end of the file
+                attempts += 1
+                if attempts > self.MAX_RECONNECTS:
+                    self._end(error or ConnectionError("connection lost"))
+                    return
+                self._condition.wait((attempts - 1) * self.RECONNECT_BACKOFF_SECONDS)
+                if self._closed:
+                    return
+
+            try:
+                self._reconnect()
+            except (OSError, http.client.HTTPException):
+                pass
+
+    def _reconnect(self) -> None:
+        """re-request the rest of the file, from where the last connection left off"""
+        position = self.offset + self.bytes_received
+        response = self._request(position)
+
+        content_range = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+        start = int(content_range.group(1)) if response.status == 206 and not content_range is None else 0
+
+        # NOTE: a server that ignores the range starts over, so what was already received is skipped
+        skip = position - start
+        while skip > 0:
+            skipped = len(response.read(min(skip, self._chunk_size)))
+            if skipped == 0:
+                break
+            skip -= skipped
+
+        self._response.close()
+        self._response = response
+        self.reconnects += 1
+
+    def _request(self, offset: int) -> http.client.HTTPResponse:
+        """request the file, from a byte offset"""
+        headers = {"User-Agent": USER_AGENT}
+        if offset > 0:
+            headers["Range"] = "bytes={0}-".format(offset)
+
+        return urllib.request.urlopen(urllib.request.Request(self.url, headers=headers), timeout=self.timeout)
+
+    def _end(self, error: Exception = None) -> None:
+        """mark the end of the stream (reached, or given up on); reading drains the buffer, then ends"""
+        self._ended = True
+        self.error = error
+        self._condition.notify_all()
+
+    @classmethod
+    def _format(cls, url: str, content_type: str) -> miniaudio.FileFormat:
+        """the audio format, by content type, or failing that, the file extension"""
+        audio_format = cls.FORMATS.get(content_type)
+        if audio_format is None:
+            extension = os.path.splitext(urllib.parse.urlsplit(url).path)[1].lower()
+            audio_format = cls.FORMATS.get(extension, miniaudio.FileFormat.UNKNOWN)
+        return audio_format
@@ -0,0 +1,243 @@
+import hashlib
+import os
+import queue
+import threading
+import time
+import urllib.parse
+
+from tuipod.models.network import open_stream
+
+class Download:
+    """
+    A single episode download, with its progress and throughput.
+    """
+
+    QUEUED = "queued"
+    DOWNLOADING = "downloading"
+    COMPLETE = "complete"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, url: str, path: str, title: str = "") -> None:
+        """initialize a (queued) download of url to path"""
+        self.url = url
+        self.path = path
+        self.title = title
+        self.state = Download.QUEUED
+        self.error = None
+        self.bytes_total = None
+        self.bytes_done = 0
+        self.resumed_from = 0
+        self.started_at = None
+        self.finished_at = None
+        self.cancelled = False
+        self._done = threading.Event()
+
+    @property
+    def partial_path(self) -> str:
+        """where the download is written until it is complete"""
+        return self.path + ".part"
+
+    @property
+    def elapsed(self) -> float:
+        """seconds spent downloading"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """average bytes per second transferred (excluding any resumed portion)"""
+        elapsed = self.elapsed
+        if elapsed <= 0:
+            return 0.0
+        return (self.bytes_done - self.resumed_from) / elapsed
+
+    @property
+    def progress(self) -> float:
+        """fraction complete (or None, if the size is unknown)"""
+        if not self.bytes_total:
+            return None
+        return self.bytes_done / self.bytes_total
+
+    def wait(self, timeout: float = None) -> bool:
+        """wait for the download to finish (in whatever state); False on timeout"""
+        return self._done.wait(timeout)
+
+
+class DownloadManager:
+    """
+    Downloads episodes to disk in the background, a few at a time.
+
+    Files are streamed to disk in chunks (never held in memory) under a '.part' name, and renamed once
+    complete. An interrupted download resumes from the end of its partial file using an HTTP Range request,
+    whether the interruption was a dropped connection (retried right away) or the end of the session.
+
+    NOTE: downloads are limited by MAX_PARALLEL_DOWNLOADS, not the network layer's request slots; those are only held
+    until each response arrives, so a long download never holds up feed fetches to the same host.
+    """
+
+    DOWNLOAD_DIRECTORY = "downloads"
+    MAX_PARALLEL_DOWNLOADS = 2
+    MAX_ATTEMPTS = 3
+    CHUNK_SIZE = 256 * 1024
+    TIMEOUT_SECONDS = 60
+
+    def __init__(self, directory: str = DOWNLOAD_DIRECTORY, max_parallel: int = MAX_PARALLEL_DOWNLOADS, on_update=None) -> None:
+        """
+        initialize the download manager
+
+        NOTE: on_update (if supplied) is called from a download thread as on_update(download) whenever a download
+        starts or finishes.
+        """
+        self.directory = directory
+        self.max_parallel = max(1, max_parallel)
+        self.on_update = on_update
+        self._queue = queue.Queue()
+        self._downloads = {}
+        self._lock = threading.Lock()
+        self._workers = []
+
+    @property
+    def downloads(self) -> [Download]:
+        """every download requested this session"""
+        with self._lock:
+            return list(self._downloads.values())
+
+    def path_for(self, url: str) -> str:
+        """the (stable) local file name for an episode URL"""
+        extension = os.path.splitext(urllib.parse.urlsplit(url).path)[1].lower()
+        if not extension[1:].isalnum() or len(extension) > 5:
+            extension = ""
+        return os.path.join(self.directory, hashlib.sha1(url.encode("utf-8")).hexdigest() + extension)
+
+    def local_path(self, url: str) -> str:
+        """the local file for an episode URL, if it has been downloaded (otherwise None)"""
+        path = self.path_for(url)
+        if os.path.exists(path):
+            return path
+        return None
+
+    def get(self, url: str) -> Download:
+        """the download for a URL requested this session (or None)"""
+        with self._lock:
+            return self._downloads.get(url)
+
+    def enqueue(self, url: str, title: str = "") -> Download:
+        """queue an episode for download (a download already queued, running or complete is returned as is)"""
+        with self._lock:
+            download = self._downloads.get(url)
+            if not download is None and download.state in (Download.QUEUED, Download.DOWNLOADING, Download.COMPLETE):
+                return download
+
+            download = Download(url, self.path_for(url), title)
+            self._downloads[url] = download
+
+            if os.path.exists(download.path):
+                download.state = Download.COMPLETE
+                download.bytes_done = download.bytes_total = os.path.getsize(download.path)
+                download._done.set()
+                return download
+
+            self._queue.put(download)
+            self._start_workers()
+
+        return download
+
+    def cancel(self, url: str) -> None:
+        """stop a queued or running download (its partial file is kept, to resume later)"""
+        download = self.get(url)
+        if not download is None:
+            download.cancelled = True
+
+    def _start_workers(self) -> None:
+        """start the download threads on first use"""
+        while len(self._workers) < self.max_parallel:
+            worker = threading.Thread(target=self._work, name="episode-download", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _work(self) -> None:
+        """download queued episodes, one at a time, forever"""
+        while True:
+            download = self._queue.get()
+            try:
+                self._download(download)
+            finally:
+                self._queue.task_done()
+
+    def _download(self, download: Download) -> None:
+        """run a download to completion (or failure), retrying dropped connections from where they left off"""
+        if download.cancelled:
+            self._finish(download, Download.CANCELLED)
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        download.state = Download.DOWNLOADING
+        download.started_at = time.monotonic()
+        self._notify(download)
+
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            try:
+                self._transfer(download)
+            except Exception as err:
+                download.error = err
+                if download.cancelled or attempt >= self.MAX_ATTEMPTS:
+                    break
+                continue
+
+            if download.cancelled:
+                break
+
+            os.replace(download.partial_path, download.path)
+            download.error = None
+            self._finish(download, Download.COMPLETE)
+            return
+
+        self._finish(download, Download.CANCELLED if download.cancelled else Download.FAILED)
+
+    def _transfer(self, download: Download) -> None:
+        """stream the (rest of the) file into the partial file"""
+        offset = 0
+        if os.path.exists(download.partial_path):
+            offset = os.path.getsize(download.partial_path)
+
+        headers = None
+        if offset > 0:
+            headers = {"Range": "bytes={0}-".format(offset)}
+
+        with open_stream(download.url, headers, self.TIMEOUT_SECONDS) as response:
+            # a server that ignores the Range header sends the whole file again
+            if offset > 0 and response.status != 206:
+                offset = 0
+
+            length = response.headers.get("Content-Length")
+            if not length is None and length.isdigit():
+                download.bytes_total = offset + int(length)
+
+            if download.bytes_done == 0:
+                download.resumed_from = offset
+            download.bytes_done = offset
+
+            with open(download.partial_path, "ab" if offset > 0 else "wb") as file:
+                while not download.cancelled:
+                    chunk = response.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    file.write(chunk)
+                    download.bytes_done += len(chunk)
+
+        if not download.cancelled and not download.bytes_total is None and download.bytes_done < download.bytes_total:
+            raise ConnectionError("connection closed after {0} of {1} bytes".format(download.bytes_done, download.bytes_total))
+
+    def _finish(self, download: Download, state: str) -> None:
+        """record the final state of a download"""
+        download.state = state
+        download.finished_at = time.monotonic()
+        download._done.set()
+        self._notify(download)
+
+    def _notify(self, download: Download) -> None:
+        """let the owner know about a change of download state"""
+        if not self.on_update is None:
+            self.on_update(download)
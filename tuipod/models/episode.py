@@ -1,66 +1,122 @@
-import uuid
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import functools
+import hashlib
+import html
+import re
 
-import miniaudio
+# markup that a simple tag strip would get wrong (hidden content, comments, CDATA)
+_COMPLEX_MARKUP = re.compile(r"<(?:script|style|!--|!\[CDATA)", re.IGNORECASE)
+_TAG = re.compile(r"</?[A-Za-z][^>]*>")
 
-# way better on the dependency front than miniaudio... needs to download file before playing though (and blocks by default)
-# also, doesn't improve the situation re: pause/play or position tracking...
-#import playsound3
+DESCRIPTION_CACHE_SIZE = 256
 
-class Episode:
+def episode_id(feed_url: str, key: str) -> str:
+    """a short, stable id for an episode, derived from its podcast's feed URL and its key within the feed (see Episode.key)"""
+    return hashlib.sha1("{0}\n{1}".format(feed_url or "", key).encode("utf-8")).hexdigest()[:16]
+
+def parse_date(date) -> int:
+    """a publication date (RFC 822, as in RSS; ISO 8601, as in Atom; or already a timestamp) as a Unix timestamp (0 when missing or unparseable)"""
+    if isinstance(date, (int, float)):
+        return int(date)
+    if not date:
+        return 0
+
+    date = date.strip()
+    if date.isdigit():
+        return int(date)
+
+    try:
+        parsed = parsedate_to_datetime(date)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(date.replace("Z", "+00:00"))
+        except ValueError:
+            return 0
+
+    # NOTE: a date without a time zone is taken to be UTC (rather than whatever the local time zone is)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+def parse_duration(duration) -> int:
+    """a duration (seconds, or an "[hh:]mm:ss" string, as in itunes:duration) in whole seconds (0 when missing or unparseable)"""
+    if isinstance(duration, (int, float)):
+        return max(0, int(duration))
+    if not duration:
+        return 0
+
+    try:
+        seconds = 0
+        for part in duration.strip().split(":"):
+            seconds = seconds * 60 + float(part)
+        return max(0, int(seconds))
+    except (ValueError, OverflowError):
+        return 0
+
+@functools.lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+def html_to_text(raw: str) -> str:
+    """
+    reduce an HTML description to plain text
+
+    Plain text is returned as is, and simple markup is stripped with a regular expression; BeautifulSoup is
+    only brought in (and imported) for the descriptions that need a real parser.
     """
-    A minimal representation of a podcast episode.
+    if not raw:
+        return ""
 
-    It also handles playback of the episode (at the moment).
+    if not "<" in raw:
+        return html.unescape(raw) if "&" in raw else raw
 
-    FIX: extract play functionality from model.
+    if _COMPLEX_MARKUP.search(raw) is None:
+        return html.unescape(_TAG.sub("", raw))
+
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(raw, "html.parser") # I'd change "soup", but I like it...
+    return soup.get_text()
+
+class Episode:
     """
+    A compact representation of a podcast episode (slotted, since a large subscription list holds a lot of them).
 
-    def __init__(self, title: str, url: str, description: str, pubdate: str, duration: int) -> None:
-        """initialize episode with title, url, description, pubdate and duration"""
-        self.id = uuid.uuid4().hex
-        self.title = title
-        self.url = url
-        self.description = description
-        self.pubdate = pubdate
-        self.duration = duration
-        self.current_position = 0
-        self.source = None
-        self.stream = None
-        self.device = None
-        self.is_playing = False
+    The id is derived from the podcast's feed URL and the episode's key (its guid, or the enclosure URL when there
+    isn't one), so the same episode gets the same id however it is obtained (feed, cache, or local index), and
+    keeps it when a feed rewrites its enclosure URLs. Playback state lives with the player, not the episode.
 
-    def __lt__(self, other):
-        """'less than' support to allow episode sorting"""
-        if self.pubdate != other.pubdate:
-            return self.pubdate < other.pubdate
-        else:
-            return self.title < other.title
+    The publication date and duration are numbers (a Unix timestamp, and seconds; 0 when unknown), parsed once
+    when the episode is made, so sorting and comparing episodes is cheap.
+    """
 
-    def is_playing(self) -> bool:
-        """track whether episode is playing or not"""
-        return self.is_playing()
+    __slots__ = ("id", "title", "url", "raw_description", "pubdate", "duration", "guid")
 
-    def play_episode(self):
+    def __init__(self, title: str, url: str, description: str, pubdate, duration, guid: str = None, feed_url: str = None) -> None:
         """
-        play the episode audio directly from its internet source
+        initialize episode with title, url, (raw) description, pubdate and duration (as numbers, or as given in a feed), and (optionally) the feed's guid
 
-        TODO: extract this, and add ability to track playback (and ideally switch from internet play to cached play from disk, once file is downloaded)
+        NOTE: the podcast's feed_url is only needed for the id; an episode added to a podcast is given its id there.
         """
-        if not self.device is None:
-            self.device.start(self.stream)
-        else:
-            self.source = miniaudio.IceCastClient(self.url)
-            self.stream = miniaudio.stream_any(self.source, self.source.audio_format)
-            self.device = miniaudio.PlaybackDevice()
-            self.device.start(self.stream)
+        # NOTE: a guid is often just the enclosure URL again, in which case the one string is shared
+        if guid == url:
+            guid = url
+
+        self.title = title
+        self.url = url
+        self.raw_description = description
+        self.pubdate = parse_date(pubdate)
+        self.duration = parse_duration(duration)
+        self.guid = guid
+        self.id = episode_id(feed_url, self.key)
 
-        self.is_playing = True
+    def __lt__(self, other):
+        """'less than' support to allow episode sorting"""
+        return (self.pubdate, self.title) < (other.pubdate, other.title)
 
-    def stop_episode(self):
-        """
-        stop episode from playing
+    @property
+    def description(self) -> str:
+        """the description as plain text (cleaned on use; recently cleaned descriptions are remembered)"""
+        return html_to_text(self.raw_description)
 
-        NOTE: more like pausing, since we don't close/destroy the associated playback device.
-        """
-        self.device.stop()
-        self.is_playing = False
+    @property
+    def key(self) -> str:
+        """the identity of the episode within its feed: the guid, or the enclosure URL when there isn't one"""
+        return self.guid or self.url
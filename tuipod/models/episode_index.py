@@ -0,0 +1,148 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+
+from tuipod.models.episode import Episode
+from tuipod.models.podcast import Podcast
+
+class EpisodeIndex:
+    """
+    A local full-text index (SQLite FTS5) over the titles and descriptions of subscribed podcasts' episodes.
+
+    The index is updated incrementally: re-indexing a podcast only writes the episodes that are new or have
+    changed (detected by a digest of their details), and drops the ones that are gone.
+    """
+
+    INDEX_FILE = os.path.join("cache", "episodes.db")
+    MAX_RESULTS = 100
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS episodes (
+        id INTEGER PRIMARY KEY,
+        podcast_url TEXT NOT NULL,
+        key TEXT NOT NULL,
+        digest TEXT NOT NULL,
+        title TEXT,
+        url TEXT,
+        description TEXT,
+        pubdate INTEGER,
+        duration INTEGER,
+        guid TEXT,
+        UNIQUE (podcast_url, key)
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS episode_text USING fts5(title, description, content='episodes', content_rowid='id');
+    CREATE TRIGGER IF NOT EXISTS episodes_insert AFTER INSERT ON episodes BEGIN
+        INSERT INTO episode_text (rowid, title, description) VALUES (new.id, new.title, new.description);
+    END;
+    CREATE TRIGGER IF NOT EXISTS episodes_delete AFTER DELETE ON episodes BEGIN
+        INSERT INTO episode_text (episode_text, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END;
+    """
+
+    _WORD = re.compile(r"\w+", re.UNICODE)
+
+    def __init__(self, path: str = INDEX_FILE) -> None:
+        """initialize the index (the database is opened on first use)"""
+        self.path = path
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """open (and if needed, create) the index database"""
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory != "":
+                os.makedirs(directory, exist_ok=True)
+
+            # NOTE: shared between the UI and worker threads, serialized by self._lock
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.executescript(self.SCHEMA)
+
+        return self._connection
+
+    def index_podcast(self, podcast: Podcast) -> int:
+        """bring the index up to date with a podcast's episodes, returning the number of episodes (re)written"""
+        current = {}
+        for e in podcast.episodes:
+            current[e.key] = (self._digest(e), e)
+
+        with self._lock:
+            connection = self._connect()
+            indexed = dict(connection.execute("SELECT key, digest FROM episodes WHERE podcast_url = ?", (podcast.url,)))
+
+            stale = [(podcast.url, k) for k, digest in indexed.items() if not k in current or current[k][0] != digest]
+            fresh = [(podcast.url, k, digest, e.title, e.url, e.description, e.pubdate, e.duration, e.guid)
+                     for k, (digest, e) in current.items() if indexed.get(k) != digest]
+
+            with connection:
+                connection.executemany("DELETE FROM episodes WHERE podcast_url = ? AND key = ?", stale)
+                connection.executemany(
+                    "INSERT INTO episodes (podcast_url, key, digest, title, url, description, pubdate, duration, guid) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    fresh
+                )
+
+        return len(fresh)
+
+    def remove_podcast(self, url: str) -> None:
+        """drop a podcast's episodes from the index (e.g. on unsubscribe)"""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM episodes WHERE podcast_url = ?", (url,))
+
+    def search(self, text: str, limit: int = MAX_RESULTS) -> [Episode]:
+        """
+        find episodes whose title or description match every word of the text (title matches first)
+
+        NOTE: no relevance (bm25) ranking - scoring every match of a common word over a large index costs far
+        more than the interactive budget; unranked matches let the LIMIT stop the scan early.
+        """
+        query = self._query(text)
+        if query == "":
+            return []
+
+        with self._lock:
+            connection = self._connect()
+            rows = connection.execute(
+                "SELECT e.id, e.title, e.url, e.description, e.pubdate, e.duration, e.guid, e.podcast_url FROM episode_text"
+                " JOIN episodes e ON e.id = episode_text.rowid"
+                " WHERE episode_text MATCH ? LIMIT ?",
+                ("title : ({0})".format(query), limit)
+            ).fetchall()
+
+            if len(rows) < limit:
+                found = {r[0] for r in rows}
+                more = connection.execute(
+                    "SELECT e.id, e.title, e.url, e.description, e.pubdate, e.duration, e.guid, e.podcast_url FROM episode_text"
+                    " JOIN episodes e ON e.id = episode_text.rowid"
+                    " WHERE episode_text MATCH ? LIMIT ?",
+                    (query, limit + len(rows))
+                ).fetchall()
+                rows.extend(r for r in more if not r[0] in found)
+
+        return [Episode(title, url, description, pubdate, duration, guid, podcast_url) for _, title, url, description, pubdate, duration, guid, podcast_url in rows[:limit]]
+
+    def close(self) -> None:
+        """close the index database"""
+        with self._lock:
+            if not self._connection is None:
+                self._connection.close()
+                self._connection = None
+
+    @classmethod
+    def _query(cls, text: str) -> str:
+        """turn free text into an FTS5 query: every word must match, the last one as a prefix (as-you-type)"""
+        words = cls._WORD.findall(text)
+        if len(words) == 0:
+            return ""
+        terms = ['"{0}"'.format(w) for w in words]
+        terms[-1] += "*"
+        return " ".join(terms)
+
+    @staticmethod
+    def _digest(episode: Episode) -> str:
+        """a fingerprint of the indexed details of an episode"""
+        details = "\0".join(str(v) for v in (episode.title, episode.url, episode.raw_description, episode.pubdate, episode.duration, episode.guid))
+        return hashlib.sha1(details.encode("utf-8")).hexdigest()
@@ -0,0 +1,111 @@
+from tuipod.models.episode import Episode, episode_id
+
+class EpisodeStore:
+    """
+    The episodes of a podcast, indexed by id, by key (GUID, or enclosure URL when there isn't one) and by URL.
+
+    Re-fetched episodes are merged into the existing set, rather than added again: a known episode keeps its
+    identity (and id), and is only modified when one of its details has actually changed.
+
+    Each episode's id is derived from the podcast's feed URL and the episode's key, so it is the same from run to run.
+    """
+
+    MERGED_FIELDS = ("title", "url", "raw_description", "pubdate", "duration", "guid")
+
+    def __init__(self, feed_url: str = None) -> None:
+        """initialize an empty store (for the episodes of the podcast with the given feed URL)"""
+        self.feed_url = feed_url
+        self._by_key = {}
+        self._by_id = {}
+        self._by_url = {}
+        self._ordered = []
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def __iter__(self):
+        return iter(self.as_list())
+
+    def as_list(self) -> [Episode]:
+        """the episodes, newest first (by publication date)"""
+        if self._ordered is None:
+            self._ordered = sorted(self._by_key.values(), key=lambda e: e.pubdate, reverse=True)
+        return self._ordered
+
+    def get(self, episode_id: str) -> Episode:
+        """look up an episode by id (or None)"""
+        return self._by_id.get(episode_id)
+
+    def get_by_url(self, url: str) -> Episode:
+        """look up an episode by URL (or None)"""
+        return self._by_url.get(url)
+
+    def add(self, episode: Episode) -> Episode:
+        """add (or merge) a single episode, returning the stored episode"""
+        return self.merge([episode])[0]
+
+    def remove_by_url(self, url: str) -> None:
+        """remove an episode by URL (if present)"""
+        episode = self._by_url.pop(url, None)
+        if not episode is None:
+            del self._by_key[episode.key]
+            del self._by_id[episode.id]
+            self._ordered = None
+
+    def clear(self) -> None:
+        """remove every episode"""
+        self._by_key.clear()
+        self._by_id.clear()
+        self._by_url.clear()
+        self._ordered = []
+
+    def merge(self, episodes: [Episode]) -> [Episode]:
+        """
+        merge episodes into the store, returning the stored episode for each one (in the same order)
+
+        A known episode (matched by key, then by URL) is updated in place, and only if something changed.
+        """
+        merged = []
+
+        for episode in episodes:
+            existing = self._by_key.get(episode.key)
+            if existing is None:
+                existing = self._by_url.get(episode.url)
+
+            if existing is None:
+                self._insert(episode)
+                merged.append(episode)
+            else:
+                self._update(existing, episode)
+                merged.append(existing)
+
+        return merged
+
+    def _insert(self, episode: Episode) -> None:
+        """index a new episode"""
+        episode.id = episode_id(self.feed_url, episode.key)
+        self._by_key[episode.key] = episode
+        self._by_id[episode.id] = episode
+        self._by_url[episode.url] = episode
+        self._ordered = None
+
+    def _update(self, existing: Episode, episode: Episode) -> None:
+        """bring a stored episode up to date with a re-fetched copy of it, re-indexing only what changed"""
+        changes = {f: getattr(episode, f) for f in self.MERGED_FIELDS if getattr(existing, f) != getattr(episode, f)}
+        if len(changes) == 0:
+            return
+
+        del self._by_key[existing.key]
+        del self._by_url[existing.url]
+        del self._by_id[existing.id]
+
+        for field, value in changes.items():
+            setattr(existing, field, value)
+
+        # NOTE: unchanged unless the key itself changed (e.g. an episode without a guid moved to a new URL)
+        existing.id = episode_id(self.feed_url, existing.key)
+
+        self._by_key[existing.key] = existing
+        self._by_url[existing.url] = existing
+        self._by_id[existing.id] = existing
+        self._ordered = None
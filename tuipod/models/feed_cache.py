@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from tuipod.models.episode import Episode
+from tuipod.models.feed_parser import FeedParser
+
+class FeedCacheEntry:
+    """
+    A cached podcast feed: the parsed episodes, plus the validators needed for a conditional GET.
+    """
+
+    def __init__(self, url: str, etag: str, last_modified: str, fetched_at: float, episodes: [Episode]) -> None:
+        """initialize a cache entry"""
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.episodes = episodes
+
+    def conditional_headers(self) -> dict:
+        """request headers allowing the server to answer '304 Not Modified'"""
+        headers = {}
+        if not self.etag is None:
+            headers["If-None-Match"] = self.etag
+        if not self.last_modified is None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class FeedCacheWriter:
+    """
+    Streams a feed body into the cache as it is downloaded; nothing replaces the cached copy until commit().
+    """
+
+    def __init__(self, cache, url: str) -> None:
+        """open a temporary body file alongside the cache entries"""
+        self.cache = cache
+        self.url = url
+        self.file = tempfile.NamedTemporaryFile(dir=cache.directory, prefix=".feed-", delete=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """discard the partial body if commit() was never reached"""
+        if not self.file.closed:
+            self.file.close()
+        if os.path.exists(self.file.name):
+            os.remove(self.file.name)
+
+    def write(self, chunk: bytes) -> None:
+        """append a raw chunk of the feed body"""
+        self.file.write(chunk)
+
+    def commit(self, headers, episodes: [Episode]) -> None:
+        """store the complete body, the response validators, and the parsed episodes"""
+        self.file.close()
+        entry = FeedCacheEntry(self.url, headers.get("ETag"), headers.get("Last-Modified"), time.time(), episodes)
+        self.cache.store(entry, self.file.name)
+
+
+class FeedCache:
+    """
+    A persistent, size-bounded (LRU) on-disk cache of podcast feeds, keyed by feed URL.
+
+    Each feed is kept as two files named after a hash of its URL: the raw body (.xml) and a JSON record
+    of the validators (ETag / Last-Modified), fetch time and parsed episodes. Entries younger than the TTL
+    are used without touching the network; older ones are revalidated with a conditional GET.
+    """
+
+    CACHE_DIRECTORY = os.path.join("cache", "feeds")
+    MAX_SIZE_BYTES = 256 * 1024 * 1024
+    TTL_SECONDS = 15 * 60
+
+    # bump when the episode record changes; older entries are re-parsed from their raw body
+    FORMAT_VERSION = 4
+
+    def __init__(self, directory: str = CACHE_DIRECTORY, max_size_bytes: int = MAX_SIZE_BYTES, ttl_seconds: float = TTL_SECONDS) -> None:
+        """initialize the cache (creating its directory if needed)"""
+        self.directory = directory
+        self.max_size_bytes = max_size_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _paths(self, url: str) -> (str, str):
+        """the body and record paths for a feed URL"""
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + ".xml"), os.path.join(self.directory, key + ".json")
+
+    def get(self, url: str) -> FeedCacheEntry:
+        """look up a cached feed (or None), marking it as recently used"""
+        body_path, record_path = self._paths(url)
+
+        try:
+            with open(record_path, "rt", encoding="utf-8") as record_file:
+                record = json.load(record_file)
+            os.utime(record_path)
+        except (OSError, ValueError):
+            return None
+
+        if record.get("version") != self.FORMAT_VERSION:
+            episodes = self._reparse(body_path)
+            if episodes is None:
+                return None
+        else:
+            episodes = [self._episode_from_record(r) for r in record["episodes"]]
+
+        entry = FeedCacheEntry(url, record.get("etag"), record.get("last_modified"), record.get("fetched_at", 0), episodes)
+        if record.get("version") != self.FORMAT_VERSION:
+            self._write_record(entry)
+
+        return entry
+
+    def is_fresh(self, entry: FeedCacheEntry) -> bool:
+        """whether an entry is young enough to use without revalidating"""
+        return time.time() - entry.fetched_at < self.ttl_seconds
+
+    def writer(self, url: str) -> FeedCacheWriter:
+        """start streaming a freshly downloaded feed body into the cache"""
+        return FeedCacheWriter(self, url)
+
+    def touch(self, entry: FeedCacheEntry) -> None:
+        """record a successful revalidation ('304 Not Modified') of a cached entry"""
+        entry.fetched_at = time.time()
+        self._write_record(entry)
+
+    def store(self, entry: FeedCacheEntry, body_file: str) -> None:
+        """add (or replace) an entry, taking ownership of the body file, then evict down to size"""
+        body_path, _ = self._paths(entry.url)
+        os.replace(body_file, body_path)
+        self._write_record(entry)
+        self.evict()
+
+    def evict(self) -> None:
+        """remove least recently used entries until the cache fits its size limit"""
+        with self._lock:
+            entries = []
+            total = 0
+
+            for name in os.listdir(self.directory):
+                if not name.endswith(".json"):
+                    continue
+
+                record_path = os.path.join(self.directory, name)
+                body_path = record_path[:-len(".json")] + ".xml"
+                try:
+                    used = os.path.getmtime(record_path)
+                    size = os.path.getsize(record_path) + (os.path.getsize(body_path) if os.path.exists(body_path) else 0)
+                except OSError:
+                    continue
+
+                entries.append((used, size, record_path, body_path))
+                total += size
+
+            entries.sort()
+            for _, size, record_path, body_path in entries:
+                if total <= self.max_size_bytes:
+                    break
+                for path in (record_path, body_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+                total -= size
+
+    def _write_record(self, entry: FeedCacheEntry) -> None:
+        """atomically write an entry's JSON record"""
+        _, record_path = self._paths(entry.url)
+        record = {
+            "version": self.FORMAT_VERSION,
+            "url": entry.url,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "fetched_at": entry.fetched_at,
+            "episodes": [self._episode_to_record(e) for e in entry.episodes]
+        }
+
+        with tempfile.NamedTemporaryFile("wt", encoding="utf-8", dir=self.directory, prefix=".record-", delete=False) as record_file:
+            json.dump(record, record_file)
+        os.replace(record_file.name, record_path)
+
+    @staticmethod
+    def _reparse(body_path: str) -> [Episode]:
+        """rebuild the episodes of an outdated record from its raw body (or None, if that isn't possible)"""
+        try:
+            with open(body_path, "rb") as body:
+                return [e for batch in FeedParser().parse(body) for e in batch]
+        except Exception:
+            return None
+
+    @staticmethod
+    def _episode_to_record(episode: Episode) -> []:
+        """flatten an episode for the JSON record"""
+        return [episode.title, episode.url, episode.raw_description, episode.pubdate, episode.duration, episode.guid]
+
+    @staticmethod
+    def _episode_from_record(record: []) -> Episode:
+        """rebuild an episode from its JSON record"""
+        title, url, description, pubdate, duration, guid = record
+        return Episode(title, url, description, pubdate, duration, guid)
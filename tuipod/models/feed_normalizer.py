@@ -0,0 +1,127 @@
+import xml.etree.ElementTree as ET
+
+from tuipod.models.episode import Episode
+
+ATOM = "http://www.w3.org/2005/Atom"
+CONTENT = "http://purl.org/rss/1.0/modules/content/"
+DUBLIN_CORE = "http://purl.org/dc/elements/1.1/"
+ITUNES = "http://www.itunes.com/dtds/podcast-1.0.dtd"
+MEDIA = "http://search.yahoo.com/mrss/"
+RSS_1 = "http://purl.org/rss/1.0/"
+
+def _tag(namespace: str, name: str) -> str:
+    """an element tag, as ElementTree names it (a namespaced tag is '{namespace}name')"""
+    return name if namespace is None else "{{{0}}}{1}".format(namespace, name)
+
+class FeedNormalizer:
+    """
+    Turns the episodes of a feed - RSS 2.0 items (with iTunes, content, Media RSS and Dublin Core extensions),
+    RSS 1.0 items, or Atom entries - into Episodes.
+
+    Tags are matched by namespace URI (as ElementTree expands them), not by prefix, so a feed's choice of prefixes
+    doesn't matter. An episode's elements are read in a single pass, each looked up in a table of the tags of
+    interest; where a detail can come from more than one element, the most specific one present is used.
+    """
+
+    ENTRY_TAGS = frozenset([_tag(None, "item"), _tag(RSS_1, "item"), _tag(ATOM, "entry")])
+
+    # the elements of interest in an item or entry, by tag: the detail each supplies
+    FIELDS = {
+        _tag(None, "title"): "title",
+        _tag(RSS_1, "title"): "title",
+        _tag(ATOM, "title"): "title",
+        _tag(ITUNES, "title"): "itunes_title",
+
+        _tag(None, "enclosure"): "enclosure",
+        _tag(ATOM, "link"): "link",
+        _tag(MEDIA, "content"): "media_content",
+
+        _tag(None, "description"): "description",
+        _tag(RSS_1, "description"): "description",
+        _tag(CONTENT, "encoded"): "content",
+        _tag(ATOM, "content"): "content",
+        _tag(ATOM, "summary"): "summary",
+        _tag(ITUNES, "summary"): "summary",
+
+        _tag(None, "pubDate"): "pubdate",
+        _tag(ATOM, "published"): "published",
+        _tag(ATOM, "updated"): "updated",
+        _tag(DUBLIN_CORE, "date"): "published",
+
+        _tag(None, "guid"): "guid",
+        _tag(ATOM, "id"): "guid",
+
+        _tag(ITUNES, "duration"): "duration"
+    }
+
+    # NOTE: some feeds declare the iTunes namespace with different capitalization
+    FIELDS.update({_tag("http://www.itunes.com/DTDs/Podcast-1.0.dtd", t.split("}")[1]): f for t, f in FIELDS.items() if t.startswith("{" + ITUNES)})
+
+    # where a detail can come from more than one element, the elements to look at, in order of preference
+    TITLE_FIELDS = ("title", "itunes_title")
+    DESCRIPTION_FIELDS = ("description", "content", "summary")
+    DATE_FIELDS = ("pubdate", "published", "updated")
+
+    def is_entry(self, tag: str) -> bool:
+        """whether an element tag is that of an episode (an RSS item or an Atom entry)"""
+        return tag in self.ENTRY_TAGS
+
+    def episode(self, entry: ET.Element) -> Episode:
+        """
+        build an episode from a feed item or entry (or None, if it isn't playable)
+
+        Works around missing data in a tested, but haphazard, manner.
+        """
+        found = {}
+        for element in entry:
+            field = self.FIELDS.get(element.tag)
+            if field is None or field in found:
+                continue
+            if field == "link" and element.get("rel") != "enclosure":
+                continue
+            found[field] = element
+
+        url = self._url(found)
+        if url is None:
+            return None
+
+        title = self._first_text(found, self.TITLE_FIELDS)
+
+        # NOTE: kept raw; it's only cleaned up if somebody actually reads it
+        description = self._first_text(found, self.DESCRIPTION_FIELDS)
+
+        pubdate = self._first_text(found, self.DATE_FIELDS)
+
+        guid = self._text(found.get("guid")).strip() or None
+
+        duration = self._text(found.get("duration"))
+
+        return Episode(title, url, description, pubdate, duration, guid)
+
+    @staticmethod
+    def _url(found: dict) -> str:
+        """the audio URL: an RSS enclosure, an Atom enclosure link, or failing those, Media RSS content (or None)"""
+        for field, attribute in (("enclosure", "url"), ("link", "href"), ("media_content", "url")):
+            element = found.get(field)
+            if not element is None:
+                url = (element.get(attribute) or "").strip()
+                if url != "":
+                    return url
+        return None
+
+    def _first_text(self, found: dict, fields: tuple) -> str:
+        """the text of the first of the fields present (with any text at all)"""
+        for field in fields:
+            text = self._text(found.get(field))
+            if text != "":
+                return text
+        return ""
+
+    @staticmethod
+    def _text(element: ET.Element) -> str:
+        """the text of an element, including that of any child elements (e.g. Atom XHTML content)"""
+        if element is None:
+            return ""
+        if len(element) == 0:
+            return element.text or ""
+        return "".join(element.itertext())
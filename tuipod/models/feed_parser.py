@@ -0,0 +1,72 @@
+import xml.etree.ElementTree as ET
+
+from tuipod.models.feed_normalizer import FeedNormalizer
+
+class FeedParser:
+    """
+    An incremental (streaming) podcast feed parser.
+
+    Feeds the document to an XMLPullParser a chunk at a time, turning each <item> into an Episode as soon
+    as its closing tag arrives. Processed items are detached from the tree, so a large back-catalog feed is
+    never held in memory as a whole document or a whole tree.
+
+    RSS and Atom feeds are both understood; see FeedNormalizer for how items and entries become episodes.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    BATCH_SIZE = 50
+
+    def __init__(self, batch_size: int = BATCH_SIZE) -> None:
+        """initialize the parser with the number of episodes to collect before handing back a batch"""
+        self.batch_size = max(1, batch_size)
+        self.normalizer = FeedNormalizer()
+
+    def parse(self, stream, sink=None):
+        """
+        parse a feed from a readable (binary) stream, yielding lists of episodes as they are completed
+
+        NOTE: sink (if supplied) receives every raw chunk read, allowing the caller to keep a copy of the body.
+        """
+        parser = ET.XMLPullParser(events=("start", "end"))
+        open_elements = []
+        batch = []
+
+        while True:
+            chunk = stream.read(self.CHUNK_SIZE)
+            if not chunk:
+                break
+
+            if not sink is None:
+                sink(chunk)
+
+            parser.feed(chunk)
+            for episode in self._read_episodes(parser, open_elements):
+                batch.append(episode)
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+
+        parser.close()
+        batch.extend(self._read_episodes(parser, open_elements))
+
+        if len(batch) > 0:
+            yield batch
+
+    def _read_episodes(self, parser: ET.XMLPullParser, open_elements: []):
+        """drain pending parser events, producing an episode for each completed item (or entry)"""
+        for event, element in parser.read_events():
+            if event == "start":
+                open_elements.append(element)
+                continue
+
+            open_elements.pop()
+            if self.normalizer.is_entry(element.tag):
+                episode = self.normalizer.episode(element)
+
+                # detach the processed item so the partial tree doesn't grow with the feed
+                if len(open_elements) > 0:
+                    open_elements[-1].remove(element)
+                element.clear()
+
+                if not episode is None:
+                    yield episode
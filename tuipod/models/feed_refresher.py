@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import random
+import time
+from urllib.error import HTTPError, URLError
+
+from tuipod.models.feed_cache import FeedCache
+from tuipod.models.network import MAX_CONCURRENT_REQUESTS
+from tuipod.models.podcast import Podcast
+
+class FeedRefreshResult:
+    """
+    The outcome of refreshing a single podcast feed.
+    """
+
+    def __init__(self, podcast: Podcast, error: Exception, attempts: int, elapsed: float, cancelled: bool = False) -> None:
+        """initialize the result with the podcast, any (final) error, the number of attempts, the time taken, and whether the refresh was abandoned"""
+        self.podcast = podcast
+        self.error = error
+        self.attempts = attempts
+        self.elapsed = elapsed
+        self.cancelled = cancelled
+
+    @property
+    def succeeded(self) -> bool:
+        """whether the feed was refreshed"""
+        return self.error is None and not self.cancelled
+
+
+class FeedRefresher:
+    """
+    Refreshes (fetches and parses) many podcast feeds concurrently.
+
+    Feeds are spread over a bounded pool of worker threads; the network layer additionally limits how many
+    requests run against any one host. Each feed gets a timeout, and transient failures (connection problems,
+    timeouts, 429 and 5xx responses) are retried with exponential backoff.
+    """
+
+    MAX_WORKERS = MAX_CONCURRENT_REQUESTS
+    MAX_ATTEMPTS = 3
+    BACKOFF_SECONDS = 1.0
+    TIMEOUT_SECONDS = 20
+
+    def __init__(self, feed_cache: FeedCache = None, max_workers: int = MAX_WORKERS, max_attempts: int = MAX_ATTEMPTS,
+                 backoff_seconds: float = BACKOFF_SECONDS, timeout: float = TIMEOUT_SECONDS) -> None:
+        """initialize the refresher (an optional feed cache avoids re-downloading unchanged feeds)"""
+        self.feed_cache = feed_cache
+        self.max_workers = max(1, max_workers)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+
+    def refresh(self, podcasts: [Podcast], progress=None, is_cancelled=None) -> [FeedRefreshResult]:
+        """
+        refresh every podcast, returning the results in order of completion
+
+        NOTE: progress (if supplied) is called from this thread as progress(completed, total, result);
+        is_cancelled (if supplied) is polled to abandon the feeds that haven't started yet.
+        """
+        results = []
+        total = len(podcasts)
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="feed-refresh")
+        try:
+            futures = [pool.submit(self._refresh_podcast, p, is_cancelled) for p in podcasts]
+
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+
+                if not progress is None:
+                    progress(len(results), total, result)
+
+                if not is_cancelled is None and is_cancelled():
+                    break
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        return results
+
+    def _refresh_podcast(self, podcast: Podcast, is_cancelled) -> FeedRefreshResult:
+        """refresh a single feed, retrying transient failures"""
+        started = time.monotonic()
+        error = None
+        attempt = 0
+        cancelled = False
+
+        while attempt < self.max_attempts:
+            if not is_cancelled is None and is_cancelled():
+                # NOTE: not a success - the podcast's episodes (still empty, perhaps) weren't refreshed
+                cancelled = True
+                break
+
+            attempt += 1
+            try:
+                # NOTE: a refresh asks the server even about feeds cached moments ago (a conditional GET, so an
+                # unchanged feed costs a '304 Not Modified')
+                for _ in podcast.stream_episode_list(feed_cache=self.feed_cache, timeout=self.timeout, revalidate=True):
+                    pass
+                error = None
+                break
+            except Exception as err:
+                error = err
+                if not self._is_transient(err) or attempt >= self.max_attempts:
+                    break
+                time.sleep(self._backoff(attempt))
+
+        return FeedRefreshResult(podcast, error, attempt, time.monotonic() - started, cancelled)
+
+    def _backoff(self, attempt: int) -> float:
+        """the (jittered, exponential) delay before the next attempt"""
+        delay = self.backoff_seconds * (2 ** (attempt - 1))
+        return delay + random.uniform(0, delay / 2)
+
+    @staticmethod
+    def _is_transient(err: Exception) -> bool:
+        """whether a failure is worth retrying"""
+        if isinstance(err, HTTPError):
+            return err.code == 429 or err.code >= 500
+        return isinstance(err, (URLError, TimeoutError, ConnectionError))
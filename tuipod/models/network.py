@@ -0,0 +1,187 @@
+from contextlib import contextmanager
+import socket
+import threading
+import urllib.parse
+import urllib.request
+
+# NOTE: some hosts refuse urllib's default User-Agent
+USER_AGENT = "Mozilla/9.9 (github.com/mwhickson/tuipod) Chrome/999.9.9.9 Gecko/99990101 Firefox/999 Safari/999.9"
+
+MAX_CONCURRENT_REQUESTS = 8
+MAX_REQUESTS_PER_HOST = 2
+DEFAULT_TIMEOUT_SECONDS = 30
+CANCEL_POLL_SECONDS = 0.05
+
+_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+def _slots_for_host(host: str) -> threading.BoundedSemaphore:
+    """the request slots shared by every request to the same host"""
+    with _host_slots_lock:
+        slots = _host_slots.get(host)
+        if slots is None:
+            slots = threading.BoundedSemaphore(MAX_REQUESTS_PER_HOST)
+            _host_slots[host] = slots
+        return slots
+
+class RequestCancelled(Exception):
+    """a request abandoned by its caller (see open_url)"""
+
+
+@contextmanager
+def open_url(url: str, headers: dict = None, timeout: float = DEFAULT_TIMEOUT_SECONDS, is_cancelled=None):
+    """
+    open a URL for reading, holding a request slot (overall, and for the URL's host) until the response is closed
+
+    is_cancelled, if given, is polled while the request waits for a slot and while it is in flight: once it returns
+    True the connection is cut off (freeing the slots for other requests) and RequestCancelled is raised.
+
+    Blocking: call this from a worker thread, never from the UI event loop.
+    """
+    request = _request(url, headers)
+
+    # NOTE: host first, so requests queued behind a busy host don't sit on the overall slots
+    with _slot(_slots_for_host(urllib.parse.urlsplit(url).netloc.lower()), is_cancelled):
+        with _slot(_request_slots, is_cancelled):
+            if is_cancelled is None:
+                with urllib.request.urlopen(request, timeout=timeout) as response:
+                    yield response
+                return
+
+            with _Cancellation(is_cancelled) as cancellation:
+                try:
+                    with cancellation.opener().open(request, timeout=timeout) as response:
+                        yield response
+                except Exception as err:
+                    if cancellation.cancelled:
+                        raise RequestCancelled(url) from err
+                    raise
+
+@contextmanager
+def open_stream(url: str, headers: dict = None, timeout: float = DEFAULT_TIMEOUT_SECONDS):
+    """
+    open a URL for a long transfer (e.g. an episode download), holding the request slots only until the response arrives
+
+    The body can then take minutes to read without holding up feed fetches and searches (to the same host, or at
+    all); the caller limits how many such transfers run at once.
+
+    Blocking: call this from a worker thread, never from the UI event loop.
+    """
+    request = _request(url, headers)
+
+    with _slots_for_host(urllib.parse.urlsplit(url).netloc.lower()):
+        with _request_slots:
+            response = urllib.request.urlopen(request, timeout=timeout)
+
+    with response:
+        yield response
+
+def _request(url: str, headers: dict) -> urllib.request.Request:
+    """a request for a URL, with our User-Agent (and any other headers)"""
+    request_headers = {"User-Agent": USER_AGENT}
+    if not headers is None:
+        request_headers.update(headers)
+
+    return urllib.request.Request(url, headers=request_headers)
+
+
+@contextmanager
+def _slot(slots: threading.BoundedSemaphore, is_cancelled):
+    """hold one of the slots, waiting for one to come free (unless the request is cancelled meanwhile)"""
+    if is_cancelled is None:
+        slots.acquire()
+    else:
+        while not slots.acquire(timeout=CANCEL_POLL_SECONDS):
+            if is_cancelled():
+                raise RequestCancelled()
+
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+class _Cancellation:
+    """
+    Watches (on its own thread) whether a request in flight has been cancelled, and if so shuts its connection down.
+
+    A shut down socket wakes up whichever thread is blocked on it (waiting for the response, or reading its body).
+    """
+
+    def __init__(self, is_cancelled) -> None:
+        """initialize the cancellation"""
+        self.is_cancelled = is_cancelled
+        self.cancelled = False
+        self._sock = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def __enter__(self):
+        threading.Thread(target=self._watch, name="request-cancellation", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._done.set()
+
+    def opener(self) -> urllib.request.OpenerDirector:
+        """an opener whose connections this cancellation can shut down"""
+        return urllib.request.build_opener(_CancellableHTTPHandler(self), _CancellableHTTPSHandler(self))
+
+    def connection_class(self, http_class):
+        """wrap an HTTP(S) connection class, so each connection's socket is noted once it connects"""
+        def connection(host: str, **kwargs):
+            conn = http_class(host, **kwargs)
+            connect = conn.connect
+
+            def connect_and_note() -> None:
+                connect()
+                self._note(conn.sock)
+
+            conn.connect = connect_and_note
+            return conn
+
+        return connection
+
+    def _watch(self) -> None:
+        """poll is_cancelled until the request is done (or cancelled)"""
+        while not self._done.wait(CANCEL_POLL_SECONDS):
+            if self.is_cancelled():
+                with self._lock:
+                    self.cancelled = True
+                    self._shutdown()
+                return
+
+    def _note(self, sock: socket.socket) -> None:
+        """note the request's socket (shutting it down straight away if the request was cancelled while connecting)"""
+        with self._lock:
+            self._sock = sock
+            if self.cancelled:
+                self._shutdown()
+
+    def _shutdown(self) -> None:
+        """shut down the request's socket (if connected)"""
+        if not self._sock is None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # already closed
+
+
+class _CancellableHandler:
+    """an HTTP(S) handler whose connections are watched by a cancellation"""
+
+    def __init__(self, cancellation: _Cancellation) -> None:
+        super().__init__()
+        self.cancellation = cancellation
+
+    def do_open(self, http_class, req, **http_conn_args):
+        return super().do_open(self.cancellation.connection_class(http_class), req, **http_conn_args)
+
+
+class _CancellableHTTPHandler(_CancellableHandler, urllib.request.HTTPHandler):
+    pass
+
+
+class _CancellableHTTPSHandler(_CancellableHandler, urllib.request.HTTPSHandler):
+    pass
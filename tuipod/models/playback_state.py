@@ -0,0 +1,125 @@
+import sqlite3
+import threading
+import time
+
+class PlaybackState:
+    """where an episode was left off, whether it has been played through, and when it was last played"""
+
+    __slots__ = ("episode_id", "position_seconds", "completed", "last_played")
+
+    def __init__(self, episode_id: str, position_seconds: float = 0, completed: bool = False, last_played: float = None) -> None:
+        """initialize the playback state of an episode"""
+        self.episode_id = episode_id
+        self.position_seconds = position_seconds
+        self.completed = completed
+        self.last_played = last_played
+
+
+class PlaybackStateStore:
+    """
+    The playback state of every episode played, kept in a small SQLite database (by episode id).
+
+    The states are read into memory on first use (so lookups, e.g. to resume, are instant), and changes are
+    written in batches: position updates are held until FLUSH_INTERVAL_SECONDS have passed (or flush() is called,
+    e.g. on pause or exit), rather than written on every tick.
+    """
+
+    STATE_FILE = "playback.db"
+    FLUSH_INTERVAL_SECONDS = 15
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS playback (
+        episode_id TEXT PRIMARY KEY,
+        position REAL NOT NULL DEFAULT 0,
+        completed INTEGER NOT NULL DEFAULT 0,
+        last_played REAL
+    );
+    """
+
+    def __init__(self, path: str = STATE_FILE, flush_interval_seconds: float = FLUSH_INTERVAL_SECONDS) -> None:
+        """initialize the store (the database is opened, and read, on first use)"""
+        self.path = path
+        self.flush_interval_seconds = flush_interval_seconds
+        self._connection = None
+        self._states = None
+        self._dirty = set()
+        self._flushed_at = time.monotonic()
+        self._lock = threading.RLock()
+
+    def load(self) -> None:
+        """read the stored states (if not already read); safe to call ahead of time, e.g. from a worker"""
+        with self._lock:
+            if self._states is None:
+                # NOTE: shared between the UI and worker threads, serialized by self._lock
+                self._connection = sqlite3.connect(self.path, check_same_thread=False)
+                self._connection.executescript(self.SCHEMA)
+
+                states = {}
+                for episode_id, position, completed, last_played in self._connection.execute("SELECT episode_id, position, completed, last_played FROM playback"):
+                    states[episode_id] = PlaybackState(episode_id, position, bool(completed), last_played)
+                self._states = states
+
+    def get(self, episode_id: str) -> PlaybackState:
+        """the playback state of an episode (or None, if it has never been played)"""
+        self.load()
+        return self._states.get(episode_id)
+
+    def record_position(self, episode_id: str, position_seconds: float) -> None:
+        """note how far into an episode playback is (written with the next batch)"""
+        with self._lock:
+            state = self._state(episode_id)
+            state.position_seconds = position_seconds
+            state.last_played = time.time()
+            self._changed(episode_id)
+
+    def mark_completed(self, episode_id: str, completed: bool = True) -> None:
+        """note that an episode has (or hasn't) been played through, starting it over next time (written right away)"""
+        with self._lock:
+            state = self._state(episode_id)
+            state.completed = completed
+            if completed:
+                state.position_seconds = 0
+            state.last_played = time.time()
+            self._dirty.add(episode_id)
+            self.flush()
+
+    def flush(self) -> None:
+        """write any pending changes"""
+        with self._lock:
+            if len(self._dirty) == 0:
+                return
+
+            rows = [(s.episode_id, s.position_seconds, int(s.completed), s.last_played) for s in (self._states[i] for i in self._dirty)]
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT INTO playback (episode_id, position, completed, last_played) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (episode_id) DO UPDATE SET position = excluded.position, completed = excluded.completed, last_played = excluded.last_played",
+                    rows
+                )
+
+            self._dirty.clear()
+            self._flushed_at = time.monotonic()
+
+    def close(self) -> None:
+        """write any pending changes, and close the database"""
+        with self._lock:
+            if not self._connection is None:
+                self.flush()
+                self._connection.close()
+                self._connection = None
+                self._states = None
+
+    def _state(self, episode_id: str) -> PlaybackState:
+        """the playback state of an episode, created if need be"""
+        self.load()
+        state = self._states.get(episode_id)
+        if state is None:
+            state = PlaybackState(episode_id)
+            self._states[episode_id] = state
+        return state
+
+    def _changed(self, episode_id: str) -> None:
+        """hold a change for the next batch, writing the batch if it's due"""
+        self._dirty.add(episode_id)
+        if time.monotonic() - self._flushed_at >= self.flush_interval_seconds:
+            self.flush()
@@ -1,13 +1,312 @@
+import threading
+
+import miniaudio
+
+# way better on the dependency front than miniaudio... needs to download file before playing though (and blocks by default)
+# also, doesn't improve the situation re: pause/play or position tracking...
+#import playsound3
+
+from tuipod.models.audio_pipeline import DecodedFrames, SilenceTrimmer, TimeStretcher
+from tuipod.models.audio_source import HttpAudioSource
 from tuipod.models.episode import Episode
 
 class Player:
     """
-    A minimal, abstract player stub for the podcast player.
+    The playback engine: a single, long-lived output device fed by whichever episode is playing.
+
+    The device pulls audio through one generator (the pump) for as long as the player lives; playing another
+    episode swaps the decoder behind the pump (releasing the previous decoder and network stream), rather than
+    opening another device. Frames pulled through the pump are counted, for an accurate playback position.
 
-    TODO: flesh this out...
+    Decoded audio reaches the device through a pipeline of stages, each reading blocks of frames from the one
+    before: the decoder's output, then (optional) silence trimming, then time stretching (for playing faster or
+    slower, at the same pitch). The position counts the frames read from the decoder, so it stays in episode time
+    at any speed, however much silence is trimmed.
+
+    Seeking also swaps the decoder: a downloaded file is decoded from the frame sought to, and an internet
+    source is re-requested from an estimated byte offset (with an HTTP Range request), rather than from the start.
+
+    NOTE: every decoder produces the device's output format, so a swap needs no device reconfiguration.
     """
 
-    def __init__(self, episode: Episode, position_seconds: int) -> None:
-        """initialize a podcast player with the episode to play, and the current position/offset within the episode in seconds"""
-        self.episode = episode
-        self.position_seconds = position_seconds
+    OUTPUT_FORMAT = miniaudio.SampleFormat.SIGNED16
+    OUTPUT_CHANNELS = 2
+    OUTPUT_SAMPLE_RATE = 44100
+    FRAME_BYTES = 2 * OUTPUT_CHANNELS
+
+    # the most frames a miniaudio stream generator produces per request
+    MAX_DECODE_FRAMES = 16384
+
+    MIN_SPEED = 0.5
+    MAX_SPEED = 3.0
+
+    def __init__(self, backends: [miniaudio.Backend] = None) -> None:
+        """initialize a podcast player, with nothing playing (the output device is opened on first use, optionally limited to certain audio backends)"""
+        self.backends = backends
+        self.episode = None
+        self.is_playing = False
+        self.finished = False
+        self._device = None
+        self._pump = None
+        self._decoder = None
+        self._frames = None
+        self._trimmer = None
+        self._output = None
+        self._source = None
+        self._speed = 1.0
+        self._trim_silence = False
+        # silence trimmed from the current episode before the last swap (e.g. a seek)
+        self._frames_trimmed = 0
+        self._local_path = None
+        self._swapping = False
+        self._start_frame = 0
+        self._frames_played = 0
+        self._duration_seconds = 0
+        # NOTE: _lock guards the decoder (shared with the audio thread); never hold it while starting or stopping the device
+        self._lock = threading.Lock()
+        # NOTE: _control_lock serializes play/seek/stop, and is held across network round-trips; _device_lock only
+        # guards starting and stopping the device, so pause() (called from the UI thread) never waits on the network
+        self._control_lock = threading.RLock()
+        self._device_lock = threading.Lock()
+        # how many times pause() has been called (so a play() that was paused before it got going doesn't start)
+        self._pauses = 0
+
+    @property
+    def position_seconds(self) -> float:
+        """how far into the current episode playback is"""
+        return self._frames_played / self.OUTPUT_SAMPLE_RATE
+
+    @property
+    def buffer_fill(self) -> float:
+        """how full the read-ahead buffer of a streamed episode is (None when not streaming)"""
+        source = self._source
+        return None if source is None else source.fill_ratio
+
+    @property
+    def duration_seconds(self) -> float:
+        """the length of the current episode (0 when unknown)"""
+        return self._duration_seconds
+
+    @property
+    def speed(self) -> float:
+        """the playback speed (1.0 being normal speed), kept from episode to episode"""
+        return self._speed
+
+    @speed.setter
+    def speed(self, value: float) -> None:
+        self._speed = float(round(min(max(value, self.MIN_SPEED), self.MAX_SPEED), 2))
+        # NOTE: not under the lock (the audio thread may hold it, waiting on the network); the stage picks the
+        # new speed up with its next read
+        output = self._output
+        if not output is None:
+            output.speed = self._speed
+
+    @property
+    def trim_silence(self) -> bool:
+        """whether long silences are shortened, kept from episode to episode"""
+        return self._trim_silence
+
+    @trim_silence.setter
+    def trim_silence(self, value: bool) -> None:
+        self._trim_silence = value
+        trimmer = self._trimmer
+        if not trimmer is None:
+            trimmer.enabled = value
+
+    @property
+    def seconds_saved(self) -> float:
+        """how much silence has been trimmed from the current episode"""
+        trimmer = self._trimmer
+        frames = self._frames_trimmed + (0 if trimmer is None else trimmer.frames_trimmed)
+        return frames / self.OUTPUT_SAMPLE_RATE
+
+    def play(self, episode: Episode, local_path: str = None, start_seconds: float = 0) -> None:
+        """
+        play an episode (resuming it, if it's the paused episode), from a downloaded copy when there is one
+        (local_path), otherwise directly from its internet source - optionally, from a position (in seconds)
+
+        NOTE: blocking (opening an internet source is a network round-trip); call this from a worker thread. A pause
+        meanwhile wins: the episode is opened, but left paused.
+        """
+        pauses = self._pauses
+
+        with self._control_lock:
+            if not (episode is self.episode and not self._decoder is None and not self.finished):
+                decoder, source, duration = self._open(episode, local_path, start_seconds)
+                self._swap(episode, decoder, source, duration, start_seconds)
+                self._local_path = local_path
+
+            with self._device_lock:
+                if self._pauses == pauses:
+                    self._start_device()
+                    self.is_playing = True
+
+    def seek(self, seconds: float) -> None:
+        """
+        move playback of the current episode to a position (in seconds), keeping it playing or paused as it was
+
+        NOTE: blocking (an internet source is re-requested); call this from a worker thread.
+        """
+        with self._control_lock:
+            if self.episode is None:
+                return
+
+            seconds = max(0, seconds)
+            if self._duration_seconds > 0:
+                seconds = min(seconds, self._duration_seconds)
+
+            decoder, source, duration = self._open(self.episode, self._local_path, seconds)
+            self._swap(self.episode, decoder, source, duration, seconds)
+
+    def skip(self, seconds: float) -> None:
+        """move playback of the current episode forward (or, for negative seconds, back)"""
+        with self._control_lock:
+            self.seek(self.position_seconds + seconds)
+
+    def pause(self) -> None:
+        """pause the playing episode (keeping its decoder, to resume later); doesn't wait for a play or seek in progress"""
+        with self._device_lock:
+            self._pauses += 1
+            if not self._device is None:
+                self._device.stop()
+            self.is_playing = False
+
+    def stop(self) -> None:
+        """stop playing, releasing the current decoder and audio source (but keeping the output device)"""
+        with self._control_lock:
+            self.pause()
+            self._swap(None, None, None, 0)
+
+    def close(self) -> None:
+        """stop playing, and close the output device"""
+        with self._control_lock:
+            self.stop()
+            with self._device_lock:
+                if not self._device is None:
+                    self._device.close()
+                    self._device = None
+                    self._pump = None
+
+    def _open(self, episode: Episode, local_path: str, start_seconds: float = 0):
+        """open a decoder (and, for an internet source, the network stream) for an episode, from a position (in seconds)"""
+        start_frame = int(start_seconds * self.OUTPUT_SAMPLE_RATE)
+
+        if not local_path is None:
+            duration = miniaudio.get_file_info(local_path).duration
+            decoder = miniaudio.stream_file(local_path, self.OUTPUT_FORMAT, self.OUTPUT_CHANNELS, self.OUTPUT_SAMPLE_RATE, seek_frame=start_frame)
+            return decoder, None, duration
+
+        duration = episode.duration
+
+        offset = 0
+        byte_rate = self._byte_rate(episode)
+        if start_frame > 0 and byte_rate > 0:
+            offset = int(start_seconds * byte_rate)
+
+        source = HttpAudioSource(episode.url, offset)
+        try:
+            if start_frame > 0 and byte_rate == 0 and duration > 0 and not source.content_length is None:
+                # NOTE: only now is the size known, so ask again from the estimated offset
+                source.close()
+                source = HttpAudioSource(episode.url, int(start_seconds * source.content_length / duration))
+
+            decoder = miniaudio.stream_any(source, source.audio_format, self.OUTPUT_FORMAT, self.OUTPUT_CHANNELS, self.OUTPUT_SAMPLE_RATE)
+
+            if start_frame > 0 and source.offset == 0:
+                # the server ignored the range, so decode (and drop) up to the position sought
+                self._discard(decoder, start_frame)
+        except Exception:
+            source.close()
+            raise
+
+        return decoder, source, duration
+
+    def _byte_rate(self, episode: Episode) -> float:
+        """the (average) bytes per second of the playing internet source, when it can be told (otherwise 0)"""
+        source = self._source
+        if not episode is self.episode or source is None:
+            return 0
+
+        if not source.content_length is None and self._duration_seconds > 0:
+            return source.content_length / self._duration_seconds
+
+        seconds_played = (self._frames_played - self._start_frame) / self.OUTPUT_SAMPLE_RATE
+        if seconds_played > 0 and source.bytes_read > 0:
+            return source.bytes_read / seconds_played
+
+        return 0
+
+    def _discard(self, decoder, frames: int) -> None:
+        """decode and drop a number of frames (or as many as there are)"""
+        try:
+            while frames > 0:
+                samples = decoder.send(min(frames, self.MAX_DECODE_FRAMES))
+                frames -= memoryview(samples).nbytes // self.FRAME_BYTES
+        except StopIteration:
+            pass
+
+    def _swap(self, episode: Episode, decoder, source, duration: float, start_seconds: float = 0) -> None:
+        """put a new decoder behind the pump (starting from a position, in seconds), then release the one it replaces"""
+        # NOTE: the old source is closed first, so a decoder waiting on it for data (in the audio thread, holding
+        # the lock) gives up rather than holding up the swap; the pump doesn't take that as the episode finishing
+        self._swapping = True
+        old_source = self._source
+        if not old_source is None:
+            old_source.close()
+
+        with self._lock:
+            old_decoder = self._decoder
+            if episode is self.episode and not self._trimmer is None:
+                self._frames_trimmed += self._trimmer.frames_trimmed
+            else:
+                self._frames_trimmed = 0
+
+            self.episode = episode
+            self._decoder = decoder
+            if decoder is None:
+                self._frames = self._trimmer = self._output = None
+            else:
+                self._frames = DecodedFrames(decoder, self.OUTPUT_CHANNELS)
+                self._trimmer = SilenceTrimmer(self._frames, self.OUTPUT_CHANNELS, self.OUTPUT_SAMPLE_RATE, self._trim_silence)
+                self._output = TimeStretcher(self._trimmer, self.OUTPUT_CHANNELS, self._speed)
+            self._source = source
+            self._duration_seconds = duration
+            self._start_frame = int(start_seconds * self.OUTPUT_SAMPLE_RATE)
+            self._frames_played = self._start_frame
+            self.finished = False
+            self._swapping = False
+
+        if not old_decoder is None:
+            old_decoder.close()
+
+    def _start_device(self) -> None:
+        """start (opening, on first use) the output device"""
+        if self._device is None:
+            self._device = miniaudio.PlaybackDevice(self.OUTPUT_FORMAT, self.OUTPUT_CHANNELS, self.OUTPUT_SAMPLE_RATE, backends=self.backends)
+            self._pump = self._pump_frames()
+            next(self._pump)
+
+        if not self._device.running:
+            self._device.start(self._pump)
+
+    def _pump_frames(self):
+        """
+        the device's audio generator: sent the number of frames wanted, yields exactly that many frames from the
+        end of the pipeline (padded with silence at the end of an episode, or all silence when there's nothing to play)
+        """
+        frames_wanted = yield b""
+        while True:
+            samples = b""
+
+            with self._lock:
+                if not self._output is None and not self.finished:
+                    samples = self._output.read(frames_wanted).tobytes()
+                    self._frames_played = self._start_frame + self._frames.frames_read
+                    if self._output.ended and not self._swapping:
+                        self.finished = True
+                        self.is_playing = False
+
+            if len(samples) < frames_wanted * self.FRAME_BYTES:
+                samples += bytes(frames_wanted * self.FRAME_BYTES - len(samples))
+
+            frames_wanted = yield samples
@@ -1,9 +1,11 @@
-from bs4 import BeautifulSoup
-import urllib.request
-import uuid
-import xml.etree.ElementTree as ET
+import hashlib
+from urllib.error import HTTPError
 
 from tuipod.models.episode import Episode
+from tuipod.models.episode_store import EpisodeStore
+from tuipod.models.feed_cache import FeedCache, FeedCacheEntry
+from tuipod.models.feed_parser import FeedParser
+from tuipod.models.network import DEFAULT_TIMEOUT_SECONDS, open_url
 
 class Podcast:
     """
@@ -14,65 +16,99 @@ class Podcast:
     FIX: extract episode retrieval into a more appropriate spot.
     """
 
+    __slots__ = ("id", "title", "url", "description", "episode_store", "subscribed")
+
     def __init__(self, title: str, url: str, description: str) -> None:
         """initialize a podcast with title, url, and description"""
-        self.id = uuid.uuid4().hex
+        # NOTE: derived from the feed URL, so the same podcast gets the same id wherever it is listed from
+        self.id = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
         self.title = title
         self.url = url
         self.description = description
-        self.episodes = []
+        self.episode_store = EpisodeStore(url)
         self.subscribed = False
 
     def __lt__(self, other):
         """'less than' support to allow podcast sorting"""
         return self.title < other.title
 
+    @property
+    def episodes(self) -> [Episode]:
+        """the podcast's episodes, newest first"""
+        return self.episode_store.as_list()
+
     def add_episode(self, episode: Episode) -> None:
-        """add an episode to the podcast"""
-        self.episodes.append(episode)
+        """add an episode to the podcast (merging it with the same episode, if already present)"""
+        self.episode_store.add(episode)
 
     def remove_episode(self, url: str) -> None:
         """remove an episode from the podcast based on the episode URL"""
-        for e in self.episodes:
-            if e.url == url:
-                self.episodes.remove(e)
-                break
+        self.episode_store.remove_by_url(url)
+
+    def get_episode(self, episode_id: str) -> Episode:
+        """look up an episode by id (or None)"""
+        return self.episode_store.get(episode_id)
+
+    def get_episode_by_url(self, url: str) -> Episode:
+        """look up an episode by URL (or None)"""
+        return self.episode_store.get_by_url(url)
 
     def get_episode_list(self) -> []:
         """
         Get an episode list from the podcast feed.
 
-        Works around missing data in a tested, but haphazard, manner.
-
         TODO: put this someplace more appropriate.
         """
-        with urllib.request.urlopen(self.url) as response:
-            result = response.read()
-
-        episodes = ET.fromstring(result)
-        for e in episodes.iter("item"):
-            title = e.find("title").text
-
-            enclosure = e.find("enclosure")
-            if not enclosure is None:
-                url = enclosure.attrib["url"]
-
-                raw_description = e.find("description").text
-                if not raw_description is None:
-                    soup = BeautifulSoup(raw_description, "html.parser") # I'd change "soup", but I like it...
-                    clean_description = soup.get_text()
-                    description = clean_description
-                else:
-                    description = ""
+        for _ in self.stream_episode_list():
+            pass
 
-                pubdate = e.find("pubDate").text
+        return self.episodes
 
-                duration = 0
-                possible_duration = e.find("itunes:duration")
-                if not possible_duration is None:
-                    duration = possible_duration.text
+    def stream_episode_list(self, batch_size: int = FeedParser.BATCH_SIZE, feed_cache: FeedCache = None, timeout: float = DEFAULT_TIMEOUT_SECONDS, revalidate: bool = False):
+        """
+        Stream the episode list from the podcast feed, yielding batches of episodes as they are parsed.
 
-                if not url is None:
-                    self.episodes.append(Episode(title, url, description, pubdate, duration))
+        The feed is read and parsed incrementally, so the first episodes are available long before a large
+        feed has finished downloading. Parsed episodes are merged into the podcast's episode store, and the
+        stored episodes are what is yielded (so an episode seen before keeps its identity).
 
-        return self.episodes
+        With a feed cache, a fresh cached copy is used as is, and a stale one is revalidated with a conditional
+        GET (served from the cache on '304 Not Modified'). With revalidate (e.g. an explicit refresh), even a fresh
+        copy is revalidated.
+
+        NOTE: blocking; consume this from a worker thread.
+        """
+        entry = None
+        headers = None
+        if not feed_cache is None:
+            entry = feed_cache.get(self.url)
+            if not entry is None:
+                if not revalidate and feed_cache.is_fresh(entry):
+                    yield from self._cached_batches(entry, batch_size)
+                    return
+                headers = entry.conditional_headers()
+
+        try:
+            with open_url(self.url, headers, timeout) as response:
+                if feed_cache is None:
+                    for batch in FeedParser(batch_size).parse(response):
+                        yield self.episode_store.merge(batch)
+                else:
+                    with feed_cache.writer(self.url) as writer:
+                        parsed = []
+                        for batch in FeedParser(batch_size).parse(response, sink=writer.write):
+                            batch = self.episode_store.merge(batch)
+                            parsed.extend(batch)
+                            yield batch
+                        writer.commit(response.headers, parsed)
+        except HTTPError as err:
+            if err.code != 304 or entry is None:
+                raise
+
+            feed_cache.touch(entry)
+            yield from self._cached_batches(entry, batch_size)
+
+    def _cached_batches(self, entry: FeedCacheEntry, batch_size: int):
+        """yield the episodes of a cached feed in batches"""
+        for i in range(0, len(entry.episodes), batch_size):
+            yield self.episode_store.merge(entry.episodes[i:i + batch_size])
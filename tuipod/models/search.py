@@ -1,58 +1,236 @@
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
 import json
-import urllib.parse
-import urllib.request
+import os
+import tempfile
+import threading
+import time
 
 from tuipod.models.podcast import Podcast
+from tuipod.models.search_providers import GpodderSearchProvider, ITunesSearchProvider, SearchProvider
 
 class Search:
     """
-    A barebones search hooked up to the iTunes podcast search service.
+    A barebones search, fanning out to several podcast directories (iTunes and gpodder.net by default) at once.
 
-    TODO: abstract and add additional search providers (e.g. gpodder.net, Spotify, YouTube, etc.)
+    Results are merged (and deduplicated by feed URL) as each provider responds; a provider that doesn't respond
+    within the timeout is abandoned rather than holding up the rest.
+
+    Recent searches are kept in a small LRU cache (with a TTL), optionally persisted to disk, so repeating a
+    search doesn't go back to the providers.
+
+    TODO: add additional search providers (e.g. Spotify, YouTube, etc.)
     """
 
-    ENDPOINT = "https://itunes.apple.com/search"
+    PROVIDER_TIMEOUT_SECONDS = 10
+
+    CACHE_FILE = os.path.join("cache", "searches.json")
+    MAX_CACHED_SEARCHES = 32
+    CACHE_TTL_SECONDS = 60 * 60
 
-    def __init__(self, search_text: str) -> None:
-        """initialize search with text to find"""
+    def __init__(self, search_text: str, providers: [SearchProvider] = None, timeout: float = PROVIDER_TIMEOUT_SECONDS, cache_file: str = None, max_cached: int = MAX_CACHED_SEARCHES, ttl_seconds: float = CACHE_TTL_SECONDS) -> None:
+        """initialize search with text to find (and, optionally, the providers to ask and a file to persist the cache to)"""
         self.search_text = search_text
         self.cached_results = []
+        self.providers = [ITunesSearchProvider(), GpodderSearchProvider()] if providers is None else providers
+        self.timeout = timeout
+        self.cache_file = cache_file
+        self.max_cached = max(1, max_cached)
+        self.ttl_seconds = ttl_seconds
+        self._cache = None
+        self._lock = threading.Lock()
 
     def get_cached_search_results(self) -> []:
-        """pull search results from cache"""
+        """pull the results of the most recent search from cache"""
         return self.cached_results
 
-    def get_search_results(self) -> []:
-        """reach out to provider (iTunes) and retrieve search results"""
-        results = []
+    def get_search_results(self, search_text: str = None, on_results=None, is_cancelled=None) -> []:
+        """
+        reach out to the providers (concurrently) and retrieve merged search results (blocking)
+
+        on_results, if given, is called (from a worker thread) with the newly found podcasts as each provider responds.
+        is_cancelled, if given, is polled to abandon the search (e.g. once superseded): providers' requests are cut off
+        (freeing their connections for the next search), and the results of an abandoned search are neither reported
+        nor cached.
+        """
+        if search_text is None:
+            search_text = self.search_text
+
+        if is_cancelled is None:
+            is_cancelled = lambda: False
+
+        merged = {}
+        errors = []
+        complete = True
+
+        executor = ThreadPoolExecutor(max_workers=max(1, len(self.providers)), thread_name_prefix="search")
+        try:
+            futures = [executor.submit(self._search_provider, p, search_text, is_cancelled) for p in self.providers]
+            try:
+                for future in as_completed(futures, timeout=self.timeout):
+                    if is_cancelled():
+                        return []
+
+                    try:
+                        podcasts = future.result()
+                    except Exception as err:
+                        errors.append(err)
+                        continue
 
-        data = {"media": "podcast", "entity": "podcast", "term": self.search_text}
+                    found = []
+                    for podcast in podcasts:
+                        key = self._feed_key(podcast.url)
+                        if not key in merged:
+                            merged[key] = podcast
+                            found.append(podcast)
 
-        params = urllib.parse.urlencode(data)
+                    if len(found) > 0 and not on_results is None:
+                        found.sort()
+                        on_results(found)
+            except FuturesTimeoutError:
+                complete = False
+        finally:
+            # NOTE: a provider still waiting on a response is abandoned, not waited for
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        url = self.ENDPOINT + "?" + params
+        if is_cancelled():
+            return []
 
-        with urllib.request.urlopen(url) as response:
-            result = response.read()
-            result_object = json.loads(result)
-            if "results" in result_object:
-                for detail in result_object["results"]:
-                    if "feedUrl" in detail:
-                        podcast_title = detail["collectionName"]
-                        podcast_url = detail["feedUrl"]
-                        podcast_description = detail["artistName"]
+        if len(merged) == 0 and len(errors) > 0:
+            raise errors[0]
 
-                        results.append(Podcast(podcast_title, podcast_url, podcast_description))
+        results = sorted(merged.values())
+        self.cached_results = results
 
-                results.sort()
-                self.cached_results = results
+        # NOTE: only complete results are cached, so a provider that failed or timed out gets another chance
+        if complete and len(errors) == 0:
+            self._remember(search_text, results)
 
         return results
 
     async def search(self, search_text: str) -> []:
-        """based on the search_text supplied, either get fresh results, or pull from cache (if same search is conducted)"""
-        if self.search_text == search_text:
-            return self.get_cached_search_results()
-        else:
-            self.search_text = search_text
-            return self.get_search_results()
+        """based on the search_text supplied, either pull results from cache (for a recent search), or get fresh results"""
+        results = []
+        async for podcasts in self.stream_search(search_text):
+            results.extend(podcasts)
+        results.sort()
+        return results
+
+    async def stream_search(self, search_text: str):
+        """like search(), but yielding podcasts as each provider responds (rather than once all have)"""
+        self.search_text = search_text
+
+        results = self._recall(search_text)
+        if not results is None:
+            self.cached_results = results
+            yield results
+            return
+
+        loop = asyncio.get_running_loop()
+        arrivals = asyncio.Queue()
+
+        def deliver(podcasts) -> None:
+            try:
+                loop.call_soon_threadsafe(arrivals.put_nowait, podcasts)
+            except RuntimeError:
+                pass  # the loop has gone (the search was abandoned)
+
+        # NOTE: set when the search is abandoned (e.g. its worker is cancelled by a newer search), which only stops
+        # this coroutine - the providers' requests run in threads, so they are told to cut their connections off
+        cancelled = threading.Event()
+
+        def fetch() -> []:
+            try:
+                return self.get_search_results(search_text, deliver, cancelled.is_set)
+            finally:
+                deliver(None)
+
+        fetching = asyncio.ensure_future(asyncio.to_thread(fetch))
+
+        try:
+            podcasts = await arrivals.get()
+            while not podcasts is None:
+                yield podcasts
+                podcasts = await arrivals.get()
+
+            # NOTE: raises if every provider failed
+            await fetching
+        finally:
+            cancelled.set()
+
+    def _search_provider(self, provider: SearchProvider, search_text: str, is_cancelled) -> []:
+        """search a single provider (on an executor thread), giving up as soon as the search is abandoned"""
+        if is_cancelled():
+            return []
+        return provider.search(search_text, self.timeout, is_cancelled)
+
+    def _recall(self, search_text: str) -> []:
+        """the cached results of a search (or None, if it hasn't been done recently)"""
+        key = self._key(search_text)
+
+        with self._lock:
+            cache = self._load()
+            entry = cache.get(key)
+            if entry is None:
+                return None
+
+            searched_at, results = entry
+            if time.time() - searched_at >= self.ttl_seconds:
+                del cache[key]
+                return None
+
+            cache.move_to_end(key)
+            return results
+
+    def _remember(self, search_text: str, results: []) -> None:
+        """cache the results of a search, evicting the least recently used searches over the limit"""
+        with self._lock:
+            cache = self._load()
+            cache[self._key(search_text)] = (time.time(), results)
+            cache.move_to_end(self._key(search_text))
+            while len(cache) > self.max_cached:
+                cache.popitem(last=False)
+
+            self._persist()
+
+    def _load(self) -> OrderedDict:
+        """the search cache, read from disk on first use (when persisted)"""
+        if self._cache is None:
+            self._cache = OrderedDict()
+
+            if not self.cache_file is None and os.path.exists(self.cache_file):
+                try:
+                    with open(self.cache_file, "rt", encoding="utf-8") as cache_file:
+                        for key, searched_at, results in json.load(cache_file):
+                            self._cache[key] = (searched_at, [Podcast(*r) for r in results])
+                except (OSError, ValueError, TypeError):
+                    self._cache.clear()
+
+        return self._cache
+
+    def _persist(self) -> None:
+        """write the search cache to disk (if persisted), atomically"""
+        if self.cache_file is None:
+            return
+
+        records = [[key, searched_at, [[p.title, p.url, p.description] for p in results]] for key, (searched_at, results) in self._cache.items()]
+
+        directory = os.path.dirname(self.cache_file) or "."
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wt", encoding="utf-8", dir=directory, prefix=".searches-", delete=False) as cache_file:
+            json.dump(records, cache_file)
+        os.replace(cache_file.name, self.cache_file)
+
+    @staticmethod
+    def _feed_key(url: str) -> str:
+        """feed URLs differing only in scheme, host case, or a trailing slash are the same feed"""
+        parts = url.strip().split("://", 1)
+        address = parts[-1].rstrip("/")
+        host, _, path = address.partition("/")
+        return host.lower() + "/" + path
+
+    @staticmethod
+    def _key(search_text: str) -> str:
+        """searches differing only in case or surrounding space are the same search"""
+        return " ".join(search_text.lower().split())
@@ -0,0 +1,79 @@
+import json
+import urllib.parse
+
+from tuipod.models.network import DEFAULT_TIMEOUT_SECONDS, open_url
+from tuipod.models.podcast import Podcast
+
+class SearchProvider:
+    """
+    A podcast directory that can be searched (over HTTP, returning JSON).
+
+    Subclasses supply the search URL for some text, and turn the decoded response into podcasts.
+    """
+
+    NAME = ""
+    ENDPOINT = ""
+
+    def __init__(self, endpoint: str = None) -> None:
+        """initialize the provider (optionally, with an alternative endpoint, e.g. a mirror or a test stand-in)"""
+        self.endpoint = self.ENDPOINT if endpoint is None else endpoint
+
+    def __str__(self) -> str:
+        """the name of the provider"""
+        return self.NAME
+
+    def search(self, search_text: str, timeout: float = DEFAULT_TIMEOUT_SECONDS, is_cancelled=None) -> [Podcast]:
+        """search the directory (blocking; raising RequestCancelled if is_cancelled, when given, returns True meanwhile)"""
+        with open_url(self.search_url(search_text), timeout=timeout, is_cancelled=is_cancelled) as response:
+            return self.parse_results(json.loads(response.read()))
+
+    def search_url(self, search_text: str) -> str:
+        """the URL of a search for the text"""
+        raise NotImplementedError
+
+    def parse_results(self, result_object) -> [Podcast]:
+        """the podcasts in a (decoded) search response"""
+        raise NotImplementedError
+
+
+class ITunesSearchProvider(SearchProvider):
+    """the iTunes podcast directory"""
+
+    NAME = "iTunes"
+    ENDPOINT = "https://itunes.apple.com/search"
+
+    def search_url(self, search_text: str) -> str:
+        """the URL of a search for the text"""
+        return self.endpoint + "?" + urllib.parse.urlencode({"media": "podcast", "entity": "podcast", "term": search_text})
+
+    def parse_results(self, result_object) -> [Podcast]:
+        """the podcasts in a (decoded) search response"""
+        results = []
+
+        if "results" in result_object:
+            for detail in result_object["results"]:
+                if "feedUrl" in detail:
+                    results.append(Podcast(detail["collectionName"], detail["feedUrl"], detail.get("artistName", "")))
+
+        return results
+
+
+class GpodderSearchProvider(SearchProvider):
+    """the gpodder.net podcast directory"""
+
+    NAME = "gpodder.net"
+    ENDPOINT = "https://gpodder.net/search.json"
+
+    def search_url(self, search_text: str) -> str:
+        """the URL of a search for the text"""
+        return self.endpoint + "?" + urllib.parse.urlencode({"q": search_text})
+
+    def parse_results(self, result_object) -> [Podcast]:
+        """the podcasts in a (decoded) search response"""
+        results = []
+
+        for detail in result_object:
+            if detail.get("url", "") != "":
+                results.append(Podcast(detail.get("title") or "", detail["url"], detail.get("author") or detail.get("description") or ""))
+
+        return results
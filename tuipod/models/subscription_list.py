@@ -1,69 +1,138 @@
-from os.path import exists
+import os
+import stat
+import threading
+import uuid
 import xml.etree.ElementTree as ET
-import xml.sax.saxutils as saxu
+from xml.sax.saxutils import quoteattr
 
 from tuipod.models.podcast import Podcast
 
 class SubscriptionList:
     """
-    A simple subscription list saved/loaded from a fixed OPML file (subscriptions.opml).
+    The subscribed podcasts (by feed URL, in the order subscribed), saved to and loaded from an OPML file.
+
+    Changes are written in batches: persist() schedules a write WRITE_DELAY_SECONDS later (on a timer thread), so a
+    burst of changes (e.g. an import) is written once; flush() writes any pending change right away (e.g. on exit).
+    Each write goes to a temporary file that then replaces the subscription file, so a crash mid-write leaves the
+    previous list intact.
     """
 
     SUBSCRIPTION_FILE = "subscriptions.opml"
+    WRITE_DELAY_SECONDS = 1.0
 
-    def __init__(self) -> None:
+    def __init__(self, path: str = SUBSCRIPTION_FILE, write_delay_seconds: float = WRITE_DELAY_SECONDS) -> None:
         """initialize the subscription list"""
-        self.podcasts = []
+        self.path = path
+        self.write_delay_seconds = write_delay_seconds
+        self._by_url = {}
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._by_url)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._by_url
+
+    @property
+    def podcasts(self) -> [Podcast]:
+        """the subscribed podcasts, in the order subscribed"""
+        with self._lock:
+            return list(self._by_url.values())
 
-    def add_podcast(self, p: Podcast) -> None:
-        """add a podcast subscription"""
-        p.subscribed = True
-        self.podcasts.append(p)
+    def get(self, url: str) -> Podcast:
+        """look up a subscribed podcast by feed URL (or None)"""
+        return self._by_url.get(url)
+
+    def add_podcast(self, p: Podcast) -> Podcast:
+        """add a podcast subscription (unless already subscribed), returning the subscribed podcast"""
+        with self._lock:
+            existing = self._by_url.get(p.url)
+            if not existing is None:
+                return existing
+            p.subscribed = True
+            self._by_url[p.url] = p
+            return p
 
     def remove_podcast(self, url: str) -> None:
         """remove a subscribed podcast by URL"""
-        for p in self.podcasts:
-            if p.url == url:
+        with self._lock:
+            p = self._by_url.pop(url, None)
+            if not p is None:
                 p.subscribed = False
-                self.podcasts.remove(p)
-                break
 
     def retrieve(self) -> []:
         """load subscriptions from disk (if the subscription file exists)"""
-        self.podcasts = []
-
-        if exists(self.SUBSCRIPTION_FILE):
-            with open(self.SUBSCRIPTION_FILE, "rt", encoding="utf-8") as subscription_file:
-                contents = subscription_file.readlines()
-                subscription_file.close()
+        podcasts = {}
 
-            doc = ET.fromstringlist(contents)
-
-            for item in doc.iter("outline"):
-                title = item.get("text")
-                url = item.get("xmlUrl")
-                if not title is None and not url is None:
+        if os.path.exists(self.path):
+            # NOTE: streamed, so a large export (thousands of feeds, in nested category outlines) is never held whole
+            for _, element in ET.iterparse(self.path, events=("end",)):
+                if element.tag != "outline":
+                    continue
+                url = (element.get("xmlUrl") or "").strip()
+                if url != "" and not url in podcasts:
+                    title = element.get("text") or element.get("title") or url
                     p = Podcast(title, url, "")
                     p.subscribed = True
-                    self.add_podcast(p)
+                    podcasts[url] = p
+                element.clear()
+
+        with self._lock:
+            self._by_url = podcasts
 
     def persist(self) -> None:
-        """save the current subscription list to disk"""
-        with open(self.SUBSCRIPTION_FILE, "wt", encoding="utf-8") as subscription_file:
-            lines = []
-            lines.append('<?xml version="1.0" encoding="utf-8" standalone="no"?>\n')
-            lines.append('<opml version="1.0">\n')
-            lines.append('<body>\n')
-            lines.append('<outline text="feeds">\n')
-
-            for p in self.podcasts:
-                escaped_title = saxu.escape(p.title)
-                lines.append('<outline text="{0}" xmlUrl="{1}" type="rss" />\n'.format(escaped_title, p.url))
-
-            lines.append('</outline>\n')
-            lines.append('</body>\n')
-            lines.append('</opml>\n')
-
-            subscription_file.writelines(lines)
+        """save the current subscription list to disk, shortly (along with any other changes made meanwhile)"""
+        with self._lock:
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.write_delay_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """write any pending changes right away"""
+        with self._lock:
+            if not self._timer is None:
+                self._timer.cancel()
+                self._timer = None
+            if self._dirty:
+                self.export(self.path)
+                self._dirty = False
+
+    def opml(self) -> str:
+        """the subscription list, as an OPML document"""
+        with self._lock:
+            podcasts = list(self._by_url.values())
+
+        lines = [
+            '<?xml version="1.0" encoding="utf-8" standalone="no"?>\n',
+            '<opml version="1.0">\n',
+            '<body>\n',
+            '<outline text="feeds">\n'
+        ]
+        for p in podcasts:
+            lines.append('<outline text={0} xmlUrl={1} type="rss" />\n'.format(quoteattr(p.title), quoteattr(p.url)))
+        lines.append('</outline>\n')
+        lines.append('</body>\n')
+        lines.append('</opml>\n')
+        return "".join(lines)
+
+    def export(self, path: str) -> None:
+        """write the subscription list to an OPML file, atomically (keeping the permissions of the file it replaces)"""
+        directory = os.path.dirname(path) or "."
+        temporary_path = os.path.join(directory, ".subscriptions-{0}.tmp".format(uuid.uuid4().hex))
+
+        # NOTE: created as any new file is (0666, less the umask), where a tempfile one would be private (0600)
+        with open(os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), "wt", encoding="utf-8") as subscription_file:
+            subscription_file.write(self.opml())
             subscription_file.flush()
-            subscription_file.close()
+            os.fsync(subscription_file.fileno())
+
+        try:
+            os.chmod(temporary_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass  # a new file
+
+        os.replace(temporary_path, path)
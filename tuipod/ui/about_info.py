@@ -73,9 +73,15 @@ Available at [github.com/mwhickson/tuipod](https://github.com/mwhickson/tuipod)
 - `CTRL` + `P` - show the textual command palette
 - `D` - toggle dark mode
 - `I` - show episode information
+- `R` - refresh all subscriptions
 - `S` - subscribe to highlighted podcast
 - `U` - unsubscribe from highlighted podcast
+- `W` - download highlighted episode
 - `SPACE` - play/pause an episode after selection
+- `,` / `.` - skip back 15 seconds / forward 30 seconds
+- `[` / `]` - play slower / faster (`\\` for normal speed)
+- `T` - toggle trimming silences
+- `0` ... `9` - seek to 0% ... 90% of the way through the episode
 - `TAB` / `SHIFT` + `TAB` - move cursor from section to section
 
 NOTE: Some keystrokes depend on application state (e.g. not actively searching, episode playing, etc.)
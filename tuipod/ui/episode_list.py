@@ -1,10 +1,22 @@
+from collections import deque
+import time
+
 from textual.app import ComposeResult
 from textual.widget import Widget
 from textual.widgets import DataTable
+from textual.widgets.data_table import CellDoesNotExist
+
+from tuipod.models.episode import Episode
+from tuipod.ui.podcast_player import PodcastPlayer
 
 class EpisodeList(Widget):
     """
     A simple episode list widget using a datatable for columnar display.
+
+    Rows are populated incrementally: episodes are queued, and added a screenful or so per frame, so a feed
+    with thousands of episodes never stalls the UI.
+
+    The status column shows whatever the (optional) status function reports for an episode (e.g. played).
     """
 
     DEFAULT_CSS = """
@@ -13,6 +25,15 @@ class EpisodeList(Widget):
     }
     """
 
+    MIN_ROWS_PER_FRAME = 50
+
+    def __init__(self, *args, status=None, **kwargs) -> None:
+        """initialize the widget (optionally, with a function giving the status text of an episode)"""
+        super().__init__(*args, **kwargs)
+        self.status = status
+        self._pending = deque()
+        self._populating = False
+
     def compose(self) -> ComposeResult:
         """build the widget"""
         yield DataTable(id="EpisodeList", cursor_type="row", zebra_stripes=True)
@@ -20,6 +41,61 @@ class EpisodeList(Widget):
     def on_mount(self):
         """set up the columns on mount"""
         table: DataTable = self.query_one("#EpisodeList")
+        table.add_column("Status", key="status")
         table.add_column("Episode Title")
         table.add_column("Duration")
         table.add_column("Published")
+
+    @property
+    def is_populating(self) -> bool:
+        """whether queued episodes are still waiting to be added"""
+        return len(self._pending) > 0
+
+    def clear_episodes(self) -> None:
+        """remove every row (including the ones still queued)"""
+        self._pending.clear()
+        self.query_one("#EpisodeList").clear()
+
+    def add_episodes(self, episodes: [Episode]) -> None:
+        """queue episodes to be added to the list (the first rows are added right away)"""
+        self._pending.extend(episodes)
+        if not self._populating:
+            self._populating = True
+            self._populate()
+
+    def _populate(self) -> None:
+        """add the next batch of queued rows, then come back after the next refresh for more"""
+        table: DataTable = self.query_one("#EpisodeList")
+
+        count = min(len(self._pending), max(self.MIN_ROWS_PER_FRAME, table.size.height * 2))
+        for _ in range(count):
+            e = self._pending.popleft()
+            table.add_row(self._status_of(e), e.title, self.format_duration(e.duration), self.format_date(e.pubdate), key=e.id)
+
+        if len(self._pending) > 0:
+            self.call_after_refresh(self._populate)
+        else:
+            self._populating = False
+
+    def update_status(self, episode: Episode) -> None:
+        """refresh the status shown for an episode (if it's listed)"""
+        try:
+            self.query_one("#EpisodeList", DataTable).update_cell(episode.id, "status", self._status_of(episode))
+        except CellDoesNotExist:
+            pass
+
+    def _status_of(self, episode: Episode) -> str:
+        """the status text of an episode"""
+        return "" if self.status is None else self.status(episode)
+
+    @staticmethod
+    def format_duration(seconds: int) -> str:
+        """a duration as [h:]mm:ss (nothing, when unknown)"""
+        return "" if seconds <= 0 else PodcastPlayer.format_time(seconds)
+
+    @staticmethod
+    def format_date(timestamp: int) -> str:
+        """a publication date, in local time (nothing, when unknown)"""
+        if timestamp == 0:
+            return ""
+        return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
@@ -0,0 +1,85 @@
+import threading
+import time
+
+from textual.app import App
+from textual.message import Message
+
+class MediaKeys:
+    """
+    Media key (play/pause, next, previous) support, by a global keyboard listener (pynput).
+
+    Keys are heard on the listener's own thread, and debounced there (a key repeated within DEBOUNCE_SECONDS is
+    ignored); each is then posted to the app as a Pressed message (post_message is thread safe), so it's handled on
+    the UI thread, in turn with any other input.
+
+    NOTE: pynput is only imported (and its global hook installed) when the listener is started - on first playback,
+    rather than with the app; without pynput, or a display for it to hook, there's simply no media key support.
+    """
+
+    DEBOUNCE_SECONDS = 0.25
+
+    class Pressed(Message):
+        """a media key was pressed ("play_pause", "next" or "previous")"""
+
+        def __init__(self, key: str) -> None:
+            """initialize the message"""
+            super().__init__()
+            self.key = key
+
+    def __init__(self, app: App, debounce_seconds: float = DEBOUNCE_SECONDS) -> None:
+        """initialize media key support for an app (not yet listening)"""
+        self.app = app
+        self.debounce_seconds = debounce_seconds
+        self._listener = None
+        self._keys = {}
+        self._last_pressed = {}
+        self._lock = threading.Lock()
+
+    @property
+    def listening(self) -> bool:
+        """whether the listener is running"""
+        return not self._listener is None
+
+    def start(self) -> bool:
+        """start listening (if not already), returning whether media keys are available"""
+        with self._lock:
+            if self._listener is None:
+                try:
+                    from pynput import keyboard
+
+                    self._keys = {
+                        keyboard.Key.media_play_pause: "play_pause",
+                        keyboard.Key.media_next: "next",
+                        keyboard.Key.media_previous: "previous"
+                    }
+                    listener = keyboard.Listener(on_release=self._released)
+                    listener.daemon = True
+                    listener.start()
+                except Exception:
+                    # NOTE: not just ImportError - pynput's backends fail in various ways without a display to hook
+                    return False
+                self._listener = listener
+
+        return True
+
+    def stop(self) -> None:
+        """stop listening (releasing the global hook)"""
+        with self._lock:
+            listener = self._listener
+            self._listener = None
+
+        if not listener is None:
+            listener.stop()
+
+    def _released(self, key) -> None:
+        """a key was released (on the listener's thread): pass media keys on to the app, unless repeated too soon"""
+        name = self._keys.get(key)
+        if name is None:
+            return
+
+        now = time.monotonic()
+        if now - self._last_pressed.get(name, -self.debounce_seconds) < self.debounce_seconds:
+            return
+        self._last_pressed[name] = now
+
+        self.app.post_message(MediaKeys.Pressed(name))
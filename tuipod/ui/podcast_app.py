@@ -1,24 +1,35 @@
-import json
+from contextlib import closing
+import threading
+from typing import TYPE_CHECKING
 
 from urllib.request import build_opener, install_opener
 
-from pynput import keyboard
-
-from textual import on
+from textual import on, work
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.widgets import Button, DataTable, Header, Input, Static
-
+from textual.worker import Worker, get_current_worker
+
+from tuipod.models.download_manager import Download, DownloadManager
+from tuipod.models.episode import Episode
+from tuipod.models.episode_index import EpisodeIndex
+from tuipod.models.feed_cache import FeedCache
+from tuipod.models.feed_refresher import FeedRefresher, FeedRefreshResult
+from tuipod.models.network import USER_AGENT
+from tuipod.models.playback_state import PlaybackStateStore
+from tuipod.models.podcast import Podcast
 from tuipod.models.search import Search
 from tuipod.models.subscription_list import SubscriptionList
-from tuipod.ui.about_info import AboutInfoScreen
-from tuipod.ui.episode_info import EpisodeInfoScreen
 from tuipod.ui.episode_list import EpisodeList
-from tuipod.ui.error_info import ErrorInfoScreen
 from tuipod.ui.podcast_list import PodcastList
 from tuipod.ui.podcast_player import PodcastPlayer
+from tuipod.ui.media_keys import MediaKeys
 from tuipod.ui.search_input import SearchInput
 
+if TYPE_CHECKING:
+    # NOTE: only for annotations; the player (and the audio libraries behind it) is imported on first use
+    from tuipod.models.player import Player
+
 # DEBUG:
 # import logging
 # logging.basicConfig(filename="debug.log", filemode="w", level="NOTSET")
@@ -26,6 +37,10 @@ from tuipod.ui.search_input import SearchInput
 APPLICATION_NAME = "tuipod"
 APPLICATION_VERSION = "2024-11-24.6147baed9d02462989c1d8cc65b87af5-beta"
 
+SKIP_BACK_SECONDS = 15
+SKIP_FORWARD_SECONDS = 30
+SPEED_STEP = 0.25
+
 class PodcastApp(App):
     """
     A podcast player application (tuipod) utilizing textual.
@@ -36,9 +51,19 @@ class PodcastApp(App):
         Binding("space", "toggle_play", "Play/Pause"),
         Binding("d", "toggle_dark", "Toggle dark mode"),
         Binding("i", "display_info", "Display information"),
+        Binding("r", "refresh_subscriptions", "Refresh subscriptions"),
         Binding("s", "subscribe_to_podcast", "Subscribe to Podcast"),
-        Binding("u", "unsubscribe_from_podcast", "Unsubscribe from Podcast")
+        Binding("u", "unsubscribe_from_podcast", "Unsubscribe from Podcast"),
+        Binding("w", "download_episode", "Download episode"),
+        Binding("comma", "skip({0})".format(-SKIP_BACK_SECONDS), "Skip back"),
+        Binding("full_stop", "skip({0})".format(SKIP_FORWARD_SECONDS), "Skip forward"),
+        Binding("left_square_bracket", "change_speed({0})".format(-SPEED_STEP), "Slower"),
+        Binding("right_square_bracket", "change_speed({0})".format(SPEED_STEP), "Faster"),
+        Binding("backslash", "set_speed(1)", "Normal speed", show=False),
+        Binding("t", "toggle_trim_silence", "Trim silences"),
+        *[Binding(str(n), "seek_percent({0})".format(n * 10), "Seek to {0}%".format(n * 10), show=False) for n in range(10)]
     ]
+    POSITION_REFRESH_SECONDS = 0.5
     TITLE = APPLICATION_NAME
     SUB_TITLE = "version {0}".format(APPLICATION_VERSION)
 
@@ -46,12 +71,28 @@ class PodcastApp(App):
         """
         initialize the application
 
-        NOTE: sets a User-Agent override for urllib.openurl(), and multimedia key support.
+        NOTE: sets a User-Agent override for urllib.openurl() (used by miniaudio's stream client), and prepares multimedia key support (listening starts on first playback).
+
+        NOTE: kept quick, for a quick first screen: the audio libraries (miniaudio, numpy), the keyboard hook (pynput),
+        the HTML parser (bs4) and the modal screens (markdown) are imported on first use, and subscriptions are read
+        in the background once the app is up.
         """
         super().__init__()
-        self.searcher = Search("")
+        self.searcher = Search("", cache_file=Search.CACHE_FILE)
         self.subscriptions = SubscriptionList()
-        self.podcasts = []
+        self.feed_cache = FeedCache()
+        self.feed_refresher = FeedRefresher(self.feed_cache)
+        self.downloads = DownloadManager(on_update=self._on_download_update)
+        self.episode_index = EpisodeIndex()
+        self._player = None
+        self._player_lock = threading.Lock()
+        self.playback_states = PlaybackStateStore()
+        self.playback_status = None
+        # the podcasts and episodes currently listed, by id (which is also their table row key)
+        self.podcast_registry = {}
+        # the feed URLs of the podcasts listed as search results (rather than only as subscriptions)
+        self._search_result_urls = set()
+        self.episode_registry = {}
         self.current_podcast = None
         self.current_episode = None
 
@@ -59,11 +100,19 @@ class PodcastApp(App):
         # NOTE: _opener is not available for import, but it's not necessary (presumably within an app context)
         opener = build_opener()
         install_opener(opener)
-        opener.addheaders = [("User-Agent", "Mozilla/9.9 (github.com/mwhickson/tuipod) Chrome/999.9.9.9 Gecko/99990101 Firefox/999 Safari/999.9")]
+        opener.addheaders = [("User-Agent", USER_AGENT)]
 
-        # hookup for multimedia button (play/pause for now)
-        self.keylistener = keyboard.Listener(on_release=self.on_listen_keys)
-        self.keylistener.start()
+        # hookup for multimedia buttons (play/pause, next, previous)
+        self.media_keys = MediaKeys(self)
+
+    @property
+    def player(self) -> "Player":
+        """the playback engine (created, importing the audio libraries, on first use)"""
+        with self._player_lock:
+            if self._player is None:
+                from tuipod.models.player import Player
+                self._player = Player()
+            return self._player
 
     def compose(self) -> ComposeResult:
         """build the app"""
@@ -71,66 +120,145 @@ class PodcastApp(App):
 
         yield SearchInput()
         yield PodcastList()
-        yield EpisodeList()
+        yield EpisodeList(status=self._episode_status)
         yield PodcastPlayer()
 
     async def on_mount(self) -> None:
         """set up application, including listing current subscriptions"""
+        self.set_interval(self.POSITION_REFRESH_SECONDS, self._refresh_position)
+        self._load_playback_states()
+        self._load_subscriptions()
+
+    @work(thread=True, group="subscriptions")
+    def _load_subscriptions(self) -> None:
+        """read the subscription list in the background (rather than holding up the first screen), then list it"""
         self.subscriptions.retrieve()
-        if len(self.subscriptions.podcasts) > 0:
-            await self._refresh_podcast_list("")
+        self.call_from_thread(self._show_subscriptions)
+
+    def _show_subscriptions(self) -> None:
+        """list the subscriptions (unless a search has already been listed)"""
+        if self.searcher.search_text.strip() == "" and len(self.subscriptions.podcasts) > 0:
+            self._list_subscriptions(self.query_one(PodcastList).query_one(DataTable))
 
-    async def _refresh_podcast_list(self, search_term: str) -> None:
-        """refresh the podcast list, subscriptions first then search results"""
+    @work(thread=True, group="playback_state")
+    def _load_playback_states(self) -> None:
+        """read the stored playback states in the background (rather than holding up the first screen)"""
+        self.playback_states.load()
+
+    async def _refresh_podcast_list(self, search_term: str, focus: bool = True) -> None:
+        """refresh the podcast list, subscriptions first then search results (listed as each search provider responds)"""
         podcast_list = self.query_one(PodcastList)
-        episode_list = self.query_one(EpisodeList)
 
         table = podcast_list.query_one(DataTable)
         table.loading = True
 
-        episodes_table = episode_list.query_one(DataTable)
-
-        table.clear()
-        episodes_table.clear()
-
-        if len(self.subscriptions.podcasts) > 0:
-            self.podcasts = self.subscriptions.podcasts
-            for p in self.subscriptions.podcasts:
-                row_key = json.dumps((p.id, p.url))
-                table.add_row("SUB", p.title, key=row_key)
-
-        if search_term.strip() != "":
-            try:
-
-                self.podcasts = await self.searcher.search(search_term)
-
-                if len(self.podcasts) > 0:
-                    for podcast in self.podcasts:
-                        row_key = json.dumps((podcast.id, podcast.url))
-                        if not row_key in table.rows.keys():
-                            podcast.subscribed = False
-                            table.add_row("", podcast.title, key=row_key)
-
-                    table.focus()
+        try:
+            listed_urls = None
+            found = 0
+            error = None
+            if search_term.strip() != "":
+                try:
+                    async for podcasts in self.searcher.stream_search(search_term):
+                        # NOTE: the table is only rebuilt once results arrive, so a superseded (cancelled) search leaves it untouched
+                        if listed_urls is None:
+                            listed_urls = self._list_subscriptions(table)
+                            table.loading = False
+
+                        for podcast in podcasts:
+                            self._search_result_urls.add(podcast.url)
+                            if not podcast.url in listed_urls:
+                                podcast.subscribed = False
+                                self.podcast_registry[podcast.id] = podcast
+                                listed_urls.add(podcast.url)
+                                table.add_row("", podcast.title, key=podcast.id)
+
+                        found += len(podcasts)
+                except Exception as err:
+                    error = err
+
+            if listed_urls is None:
+                listed_urls = self._list_subscriptions(table)
+
+            if not error is None:
+                table.add_row("error occurred")
+                self._show_error(str(error))
+            elif search_term.strip() != "":
+                if found > 0:
+                    if focus:
+                        table.focus()
                 else:
                     table.add_row("no results")
+        finally:
+            table.loading = False
 
-            except Exception as err:
-                table.add_row("error occurred")
-                self.app.push_screen(ErrorInfoScreen(str(err)))
+    def _list_subscriptions(self, table: DataTable) -> set:
+        """reset the podcast (and episode) lists to just the subscriptions, returning the listed feed URLs"""
+        table.clear()
+        self.podcast_registry.clear()
+        self.query_one(EpisodeList).clear_episodes()
+        self.episode_registry.clear()
+        self._search_result_urls.clear()
 
-        table.loading = False
+        listed_urls = set()
+        for p in self.subscriptions.podcasts:
+            self.podcast_registry[p.id] = p
+            listed_urls.add(p.url)
+            table.add_row("SUB", p.title, key=p.id)
+
+        return listed_urls
 
     @on(Input.Submitted)
     async def action_submit(self, event: Input.Submitted) -> None:
         """perform the search for the criteria entered in the search widget"""
         search_input: Input = event.input
         search_term = search_input.value
+
+        if self.query_one(SearchInput).search_episodes:
+            self._search_episodes(search_term)
+            return
+
         self.notify("searching for: {0}".format(search_term), timeout=3)
-        await self._refresh_podcast_list(search_term)
+
+        # a newer search supersedes (cancels) one still in flight
+        self.run_worker(self._refresh_podcast_list(search_term), group="search", exclusive=True)
+
+    @on(SearchInput.Debounced)
+    def action_search_as_you_type(self, event: SearchInput.Debounced) -> None:
+        """search for the criteria being typed, once typing pauses (leaving focus with the search widget)"""
+        if self.query_one(SearchInput).search_episodes:
+            self._search_episodes(event.value)
+            return
+
+        self.run_worker(self._refresh_podcast_list(event.value, focus=False), group="search", exclusive=True)
+
+    @work(thread=True, exclusive=True, group="episodes")
+    def _search_episodes(self, search_term: str) -> None:
+        """search the local episode index, listing the matches in the episode list"""
+        worker = get_current_worker()
+
+        try:
+            episodes = self.episode_index.search(search_term)
+        except Exception as err:
+            self.call_from_thread(self._show_error, str(err))
+            return
+
+        self.call_from_thread(self._show_episode_matches, worker, episodes)
+
+    def _show_episode_matches(self, worker: Worker, episodes: [Episode]) -> None:
+        """replace the episode list with local search matches"""
+        if worker.is_cancelled:
+            return
+
+        self.query_one(EpisodeList).clear_episodes()
+        self.episode_registry.clear()
+        self._add_episode_rows(worker, episodes)
+
+        if len(episodes) == 0:
+            self.notify("no episodes found", timeout=3)
 
     def _set_player_button_status(self, mode: str):
         """set the visual status of the play button in the podcast player widget"""
+        self.playback_status = mode
         player: PodcastPlayer = self.query_one(PodcastPlayer)
         play_button: Button = player.query_one("#playButton")
 
@@ -151,67 +279,169 @@ class PodcastApp(App):
         """keep track of the highlighted podcast row for easy reference"""
         k = event.row_key
         if not k is None:
-            v = k.value
-            if not v is None:
-                row_keys = json.loads(v)
-                podcast_id = row_keys[0]
-                for p in self.podcasts:
-                    if p.id == podcast_id:
-                        self.current_podcast = p
-                        break
+            podcast = self.podcast_registry.get(k.value)
+            if not podcast is None:
+                self.current_podcast = podcast
 
     def _action_episode_row_highlighted(self, event: DataTable.RowSelected) -> None:
         """keep track of the highlighted episode row for easy reference"""
         k = event.row_key
         if not k is None:
-            v = k.value
-            if not v is None:
-                row_keys = json.loads(v)
-                episode_id = row_keys[0]
-                for e in self.current_podcast.episodes:
-                    if e.id == episode_id:
-                        self.current_episode = e
-                        break
+            episode = self.episode_registry.get(k.value)
+            if not episode is None:
+                self.current_episode = episode
 
     def _action_podcast_row_selected(self, event: DataTable.RowSelected) -> None:
-        """select the currently highlighted podcast, and retrieve its episode list"""
+        """select the currently highlighted podcast, and retrieve its episode list (in the background)"""
         self.notify("getting episodes for: {0}".format(self.current_podcast.title), timeout=3)
 
         episode_list = self.query_one(EpisodeList)
-        table = episode_list.query_one(DataTable)
-        table.loading = True
-        table.clear()
+        episode_list.clear_episodes()
+        episode_list.query_one(DataTable).loading = True
+        self.episode_registry.clear()
 
-        try:
-            self.current_podcast.get_episode_list()
+        # exclusive: selecting another podcast cancels a fetch that is still running
+        self._load_episodes(self.current_podcast)
 
-            for e in self.current_podcast.episodes:
-                row_key = json.dumps((e.id, e.url))
-                table.add_row(e.title, e.duration, e.pubdate, key=row_key)
+    @work(thread=True, exclusive=True, group="episodes")
+    def _load_episodes(self, podcast: Podcast) -> None:
+        """fetch and parse the podcast feed off the UI thread, handing episode rows over in batches"""
+        worker = get_current_worker()
 
-            table.focus()
+        try:
+            with closing(podcast.stream_episode_list(feed_cache=self.feed_cache)) as batches:
+                for batch in batches:
+                    if worker.is_cancelled:
+                        return
+                    self.call_from_thread(self._add_episode_rows, worker, batch)
         except Exception as err:
-            self.app.push_screen(ErrorInfoScreen(str(err)))
+            if not worker.is_cancelled:
+                self.call_from_thread(self._show_error, str(err))
+
+        self.call_from_thread(self._finish_episode_rows, worker)
+
+        if podcast.subscribed:
+            self.episode_index.index_podcast(podcast)
+
+    def _add_episode_rows(self, worker: Worker, batch: [Episode]) -> None:
+        """add a batch of episode rows (unless the fetch has been superseded)"""
+        if worker.is_cancelled:
+            return
 
+        episodes = []
+        for e in batch:
+            # NOTE: some feeds repeat an item (same guid) - it's the same (stored) episode
+            if not e.id in self.episode_registry:
+                self.episode_registry[e.id] = e
+                episodes.append(e)
+
+        # rows are added over the following frames; the first batch is enough to show something
+        episode_list = self.query_one(EpisodeList)
+        episode_list.add_episodes(episodes)
+        episode_list.query_one(DataTable).loading = False
+
+    def _finish_episode_rows(self, worker: Worker) -> None:
+        """wrap up an episode fetch (unless it has been superseded)"""
+        if worker.is_cancelled:
+            return
+
+        table = self.query_one(EpisodeList).query_one(DataTable)
         table.loading = False
+        if len(self.episode_registry) > 0:
+            table.focus()
 
     def _action_episode_row_selected(self, event: DataTable.RowSelected) -> None:
         """select the currently highlighted episode, and begin playing the episode"""
-        try:
-            playing_episode = self.current_episode
+        player: PodcastPlayer = self.query_one(PodcastPlayer)
+        player_title: Static = player.query_one("#playerTitleText")
+        player_title.update(self.current_episode.title)
 
-            player: PodcastPlayer = self.query_one(PodcastPlayer)
-            player_title: Static = player.query_one("#playerTitleText")
-            player_title.update(self.current_episode.title)
+        self.notify("playing: {0}".format(self.current_episode.title), timeout=3)
+        self._set_player_button_status("loading")
+        self._play_episode(self.current_episode)
 
-            if playing_episode and playing_episode.is_playing:
-                playing_episode.stop_episode()
+    @work(thread=True, exclusive=True, group="playback")
+    def _play_episode(self, episode: Episode) -> None:
+        """start (or resume) playback off the UI thread, since opening the stream is a network round-trip"""
+        self.media_keys.start()
+        self._save_position()
 
-            self.notify("playing: {0}".format(self.current_episode.title), timeout=3)
-            self.current_episode.play_episode()
-            self._set_player_button_status("playing")
+        # pick up where the episode was left off (unless it was played through)
+        start_seconds = 0
+        state = self.playback_states.get(episode.id)
+        if not state is None and not state.completed:
+            start_seconds = state.position_seconds
+
+        try:
+            self.player.play(episode, self.downloads.local_path(episode.url), start_seconds)
+            self.playback_states.record_position(episode.id, self.player.position_seconds)
+            self.call_from_thread(self._set_player_button_status, "playing")
+            self.call_from_thread(self.query_one(EpisodeList).update_status, episode)
+        except Exception as err:
+            self.call_from_thread(self._set_player_button_status, "paused")
+            self.call_from_thread(self._show_error, str(err))
+
+    @work(thread=True, exclusive=True, group="playback")
+    def _seek(self, seconds: float, relative: bool = False) -> None:
+        """seek (or, relative, skip) within the playing episode off the UI thread, since it may be a network round-trip"""
+        try:
+            if relative:
+                self.player.skip(seconds)
+            else:
+                self.player.seek(seconds)
         except Exception as err:
-            self.app.push_screen(ErrorInfoScreen(str(err)))
+            self.call_from_thread(self._show_error, str(err))
+
+    def _refresh_position(self) -> None:
+        """show the playback position (on a timer, at a low fixed rate; only the position text is redrawn)"""
+        if self._player is None or self.player.episode is None:
+            return
+
+        podcast_player = self.query_one(PodcastPlayer)
+        podcast_player.show_position(self.player.position_seconds, self.player.duration_seconds)
+        podcast_player.show_buffer(self.player.buffer_fill)
+        podcast_player.show_time_saved(self.player.seconds_saved if self.player.trim_silence or self.player.seconds_saved > 0 else None)
+
+        if self.player.is_playing:
+            # NOTE: batched by the store, so this doesn't write on every tick
+            self.playback_states.record_position(self.player.episode.id, self.player.position_seconds)
+
+        if self.player.finished and self.playback_status == "playing":
+            self._set_player_button_status("paused")
+            self.playback_states.mark_completed(self.player.episode.id)
+            self.query_one(EpisodeList).update_status(self.player.episode)
+
+    def _save_position(self) -> None:
+        """write where the current episode is up to (e.g. on pause, switching episodes, or exit)"""
+        if not self._player is None and not self.player.episode is None and not self.player.finished:
+            self.playback_states.record_position(self.player.episode.id, self.player.position_seconds)
+            self.playback_states.flush()
+
+    def _episode_status(self, episode: Episode) -> str:
+        """the status of an episode for the episode list: played through, or where it was left off"""
+        state = self.playback_states.get(episode.id)
+        if state is None:
+            return ""
+        if state.completed:
+            return "PLAYED"
+        if state.position_seconds > 0:
+            return PodcastPlayer.format_time(state.position_seconds)
+        return ""
+
+    @on(Button.Pressed, "#backButton")
+    def _back_button_pressed(self) -> None:
+        """skip back"""
+        self.action_skip(-SKIP_BACK_SECONDS)
+
+    @on(Button.Pressed, "#playButton")
+    def _play_button_pressed(self) -> None:
+        """play/pause"""
+        self.action_toggle_play()
+
+    @on(Button.Pressed, "#forwardButton")
+    def _forward_button_pressed(self) -> None:
+        """skip forward"""
+        self.action_skip(SKIP_FORWARD_SECONDS)
 
     @on(DataTable.RowHighlighted)
     def action_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
@@ -235,47 +465,177 @@ class PodcastApp(App):
 
     def action_toggle_play(self) -> None:
         """toggle between playing or pausing an active episode"""
-        if not self.current_episode is None:
-            if self.current_episode.is_playing:
-                self.current_episode.stop_episode()
-                self._set_player_button_status("paused")
-                self.notify("paused: {0}".format(self.current_episode.title), timeout=3)
-            else:
-                self.current_episode.play_episode()
-                self._set_player_button_status("playing")
-                self.notify("playing: {0}".format(self.current_episode.title), timeout=3)
+        if self.player.is_playing:
+            self.player.pause()
+            self._save_position()
+            self.query_one(EpisodeList).update_status(self.player.episode)
+            self._set_player_button_status("paused")
+            self.notify("paused: {0}".format(self.player.episode.title), timeout=3)
+        elif not self.current_episode is None:
+            self._set_player_button_status("loading")
+            self._play_episode(self.current_episode)
+            self.notify("playing: {0}".format(self.current_episode.title), timeout=3)
+
+    def action_skip(self, seconds: int) -> None:
+        """skip forward (or, for negative seconds, back) within the playing episode"""
+        if not self.player.episode is None:
+            self._seek(seconds, relative=True)
+
+    def action_seek_percent(self, percent: int) -> None:
+        """seek to a percentage of the way through the playing episode (when its duration is known)"""
+        if not self.player.episode is None and self.player.duration_seconds > 0:
+            self._seek(self.player.duration_seconds * percent / 100)
+
+    def action_change_speed(self, step: float) -> None:
+        """play faster (or, for a negative step, slower)"""
+        self.action_set_speed(self.player.speed + step)
+
+    def action_set_speed(self, speed: float) -> None:
+        """set the playback speed (1 being normal speed), keeping the pitch"""
+        self.player.speed = speed
+        self.query_one(PodcastPlayer).show_speed(self.player.speed)
+
+    def action_toggle_trim_silence(self) -> None:
+        """toggle shortening long silences"""
+        self.player.trim_silence = not self.player.trim_silence
+        self.notify("trimming silences: {0}".format("on" if self.player.trim_silence else "off"), timeout=3)
 
     def action_display_about(self) -> None:
         """display the about/help screen"""
+        from tuipod.ui.about_info import AboutInfoScreen
         self.app.push_screen(AboutInfoScreen())
 
     def action_display_info(self) -> None:
         """display the episode information screen for the active podcast"""
         if not self.current_episode is None:
+            from tuipod.ui.episode_info import EpisodeInfoScreen
             self.app.push_screen(EpisodeInfoScreen(self.current_episode.title, self.current_episode.url, self.current_episode.description))
 
     def action_quit_application(self) -> None:
         """quit the application"""
         self.exit()
 
-    async def action_subscribe_to_podcast(self) -> None:
+    def on_unmount(self) -> None:
+        """stop listening for media keys, save any pending subscription changes and where playback was up to, and release the audio output device (and any playing stream) on the way out"""
+        self.media_keys.stop()
+        self.subscriptions.flush()
+        self._save_position()
+        self.playback_states.close()
+        if not self._player is None:
+            self._player.close()
+
+    def _show_error(self, message: str) -> None:
+        """display the error information screen"""
+        from tuipod.ui.error_info import ErrorInfoScreen
+        self.push_screen(ErrorInfoScreen(message))
+
+    def action_subscribe_to_podcast(self) -> None:
         """record the subscription of the active podcast"""
         if not self.current_podcast is None:
-            self.subscriptions.add_podcast(self.current_podcast)
+            podcast = self.subscriptions.add_podcast(self.current_podcast)
             self.subscriptions.persist()
-            await self._refresh_podcast_list(self.searcher.search_text)
-            self.notify("subscribed to: {0}".format(self.current_podcast.title), timeout=3)
+            self._show_subscription(podcast)
+            self.notify("subscribed to: {0}".format(podcast.title), timeout=3)
 
-    async def action_unsubscribe_from_podcast(self) -> None:
+    def action_unsubscribe_from_podcast(self) -> None:
         """remove (and thus unsubscribe) from the active podcast"""
         if not self.current_podcast is None:
-            title = self.current_podcast.title
-            self.subscriptions.remove_podcast(self.current_podcast.url)
+            podcast = self.subscriptions.get(self.current_podcast.url) or self.current_podcast
+            self.subscriptions.remove_podcast(podcast.url)
+            self._unindex_podcast(podcast.url)
             self.subscriptions.persist()
-            await self._refresh_podcast_list(self.searcher.search_text)
-            self.notify("unsubscribed from: {0}".format(title), timeout=3)
+            self._show_subscription(podcast)
+            self.notify("unsubscribed from: {0}".format(podcast.title), timeout=3)
 
-    def on_listen_keys(self, key) -> None:
-        """listen for the media play/pause keypress to complete"""
-        if key == keyboard.Key.media_play_pause:
-            self.action_toggle_play()
\ No newline at end of file
+    @work(thread=True, group="index")
+    def _unindex_podcast(self, url: str) -> None:
+        """drop an unsubscribed podcast's episodes from the local index, off the UI thread (it may wait on a refresh indexing)"""
+        self.episode_index.remove_podcast(url)
+
+    def _show_subscription(self, podcast: Podcast) -> None:
+        """
+        update just the podcast's row to show whether it's subscribed
+
+        A new subscription is added to the list if it isn't there already; a podcast unsubscribed from is dropped
+        from the list unless it was listed as a search result. The episode list, and the other rows, are left alone.
+        """
+        table = self.query_one(PodcastList).query_one(DataTable)
+        listed = podcast.id in table.rows
+
+        if podcast.subscribed:
+            if listed:
+                table.update_cell(podcast.id, "status", "SUB")
+            else:
+                self.podcast_registry[podcast.id] = podcast
+                table.add_row("SUB", podcast.title, key=podcast.id)
+        elif listed:
+            if podcast.url in self._search_result_urls:
+                table.update_cell(podcast.id, "status", "")
+            else:
+                table.remove_row(podcast.id)
+
+    def action_refresh_subscriptions(self) -> None:
+        """refresh the episode lists of every subscribed podcast (in the background)"""
+        podcasts = list(self.subscriptions.podcasts)
+        if len(podcasts) > 0:
+            self.query_one(PodcastList).start_refresh(len(podcasts))
+            self.notify("refreshing {0} subscriptions".format(len(podcasts)), timeout=3)
+            self._refresh_subscriptions(podcasts)
+
+    @work(thread=True, exclusive=True, group="refresh")
+    def _refresh_subscriptions(self, podcasts: [Podcast]) -> None:
+        """fetch and parse all the subscribed feeds concurrently, reporting progress as each one completes"""
+        worker = get_current_worker()
+
+        def progress(completed: int, total: int, result: FeedRefreshResult) -> None:
+            if result.succeeded:
+                self.episode_index.index_podcast(result.podcast)
+            # NOTE: a superseded refresh leaves the progress bar (and the outcome) to the refresh replacing it
+            if not worker.is_cancelled:
+                self.call_from_thread(self._advance_refresh, completed)
+
+        results = self.feed_refresher.refresh(podcasts, progress, lambda: worker.is_cancelled)
+        if not worker.is_cancelled:
+            self.call_from_thread(self._finish_refresh, results)
+
+    def _advance_refresh(self, completed: int) -> None:
+        """show subscription refresh progress"""
+        self.query_one(PodcastList).advance_refresh(completed)
+
+    def _finish_refresh(self, results: [FeedRefreshResult]) -> None:
+        """report the outcome of a subscription refresh"""
+        self.query_one(PodcastList).finish_refresh()
+
+        failed = [r for r in results if not r.succeeded]
+        if len(failed) > 0:
+            self.notify("refreshed {0} subscriptions ({1} failed)".format(len(results), len(failed)), severity="warning", timeout=5)
+        else:
+            self.notify("refreshed {0} subscriptions".format(len(results)), timeout=3)
+
+    def action_download_episode(self) -> None:
+        """download the active episode in the background (later playback uses the local copy)"""
+        if not self.current_episode is None:
+            download = self.downloads.enqueue(self.current_episode.url, self.current_episode.title)
+            if download.state == Download.COMPLETE:
+                self.notify("already downloaded: {0}".format(download.title), timeout=3)
+
+    def _on_download_update(self, download: Download) -> None:
+        """report download progress (called from a download thread)"""
+        if download.state == Download.DOWNLOADING:
+            message = "downloading: {0}".format(download.title)
+        elif download.state == Download.COMPLETE:
+            message = "downloaded: {0} ({1:.1f} MB at {2:.1f} MB/s)".format(download.title, download.bytes_done / 1024 / 1024, download.throughput / 1024 / 1024)
+        else:
+            message = "download {0}: {1} {2}".format(download.state, download.title, download.error or "")
+
+        self.call_from_thread(self.notify, message, timeout=3)
+
+    @on(MediaKeys.Pressed)
+    def _media_key_pressed(self, event: MediaKeys.Pressed) -> None:
+        """act on a media key (posted from the listener's thread, handled here on the UI thread)"""
+        if event.key == "play_pause":
+            self.action_toggle_play()
+        elif event.key == "next":
+            self.action_skip(SKIP_FORWARD_SECONDS)
+        elif event.key == "previous":
+            self.action_skip(-SKIP_BACK_SECONDS)
\ No newline at end of file
@@ -1,25 +1,55 @@
 from textual.app import ComposeResult
 from textual.widget import Widget
-from textual.widgets import DataTable
+from textual.widgets import DataTable, ProgressBar
 
 class PodcastList(Widget):
     """
     A simple podcast list widget using a datatable for columnar display.
+
+    Also shows the progress of a subscription refresh (when one is running).
     """
 
     DEFAULT_CSS = """
     PodcastList {
         height: 1fr;
     }
+
+    PodcastList #refreshProgress {
+        display: none;
+        dock: bottom;
+        height: 1;
+        padding: 0 1;
+    }
+
+    PodcastList #refreshProgress.refreshing {
+        display: block;
+    }
     """
 
     def compose(self) -> ComposeResult:
         """build the widget"""
         yield DataTable(id="PodcastList", cursor_type="row", zebra_stripes=True)
+        yield ProgressBar(id="refreshProgress", show_eta=False)
 
     def on_mount(self):
         """set up the columns on mount"""
         table: DataTable = self.query_one("#PodcastList")
-        table.add_column("Status")
-        table.add_column("Podcast Title")
+        table.add_column("Status", key="status")
+        table.add_column("Podcast Title", key="title")
         #table.add_column("Last Published")
+
+    def start_refresh(self, total: int) -> None:
+        """show the refresh progress bar"""
+        progress: ProgressBar = self.query_one("#refreshProgress")
+        progress.update(total=total, progress=0)
+        progress.add_class("refreshing")
+
+    def advance_refresh(self, completed: int) -> None:
+        """update the refresh progress bar"""
+        progress: ProgressBar = self.query_one("#refreshProgress")
+        progress.update(progress=completed)
+
+    def finish_refresh(self) -> None:
+        """hide the refresh progress bar"""
+        progress: ProgressBar = self.query_one("#refreshProgress")
+        progress.remove_class("refreshing")
@@ -23,7 +23,22 @@ class PodcastPlayer(Widget):
     PodcastPlayer #playerPositionText {
         text-align: right;
         padding: 0 1;
-        width: 8;
+        width: auto;
+    }
+
+    PodcastPlayer #playerSpeedText {
+        padding: 0 1;
+        width: auto;
+    }
+
+    PodcastPlayer #playerSavedText {
+        padding: 0 1;
+        width: auto;
+    }
+
+    PodcastPlayer #playerBufferText {
+        padding: 0 1;
+        width: auto;
     }
 
     PodcastPlayer #playerTitleText {
@@ -33,6 +48,13 @@ class PodcastPlayer(Widget):
     }
     """
 
+    def __init__(self) -> None:
+        """initialize the widget"""
+        super().__init__()
+        self._position_text = "0:00"
+        self._buffer_text = ""
+        self._saved_text = ""
+
     def compose(self) -> ComposeResult:
         """
         build the widget
@@ -40,9 +62,50 @@ class PodcastPlayer(Widget):
         TODO: so very much...
         """
 
-        #yield Button(id="backButton", label="back")
+        yield Button(id="backButton", label="back")
         yield Button(id="playButton", label="play")
-        #yield Button(id="forwardButton", label="forward")
-        # yield Static("0:00", id="playerPositionText")
+        yield Button(id="forwardButton", label="forward")
+        yield Static("0:00", id="playerPositionText")
+        yield Static("", id="playerSpeedText")
+        yield Static("", id="playerSavedText")
+        yield Static("", id="playerBufferText")
         yield Static("", id="playerTitleText")
         # yield Button(id="infoButton", label="info")
+
+    def show_position(self, position_seconds: float, duration_seconds: float) -> None:
+        """show the playback position (and the duration, when known), only updating the display when the text changes"""
+        text = self.format_time(position_seconds)
+        if duration_seconds > 0:
+            text += " / " + self.format_time(duration_seconds)
+
+        if text != self._position_text:
+            self._position_text = text
+            self.query_one("#playerPositionText", Static).update(text)
+
+    def show_speed(self, speed: float) -> None:
+        """show the playback speed (nothing, at normal speed)"""
+        text = "" if speed == 1.0 else "{0:g}x".format(speed)
+        self.query_one("#playerSpeedText", Static).update(text)
+
+    def show_time_saved(self, seconds: float) -> None:
+        """show how much silence has been trimmed from the episode (nothing, when None)"""
+        text = "" if seconds is None else "saved {0}".format(self.format_time(seconds))
+        if text != self._saved_text:
+            self._saved_text = text
+            self.query_one("#playerSavedText", Static).update(text)
+
+    def show_buffer(self, fill: float) -> None:
+        """show how full the read-ahead buffer of a streamed episode is (nothing, when not streaming)"""
+        text = "" if fill is None else "buffer {0:.0%}".format(fill)
+        if text != self._buffer_text:
+            self._buffer_text = text
+            self.query_one("#playerBufferText", Static).update(text)
+
+    @staticmethod
+    def format_time(seconds: float) -> str:
+        """seconds as [h:]mm:ss"""
+        minutes, seconds = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        if hours > 0:
+            return "{0}:{1:02d}:{2:02d}".format(hours, minutes, seconds)
+        return "{0}:{1:02d}".format(minutes, seconds)
@@ -1,12 +1,29 @@
+from textual import on
 from textual.app import ComposeResult
+from textual.message import Message
 from textual.widget import Widget
-from textual.widgets import Input, Label
+from textual.widgets import Checkbox, Input, Label
 
 class SearchInput(Widget):
     """
     A simple, but effective search widget for discovering podcasts by search text."
+
+    With "episodes" checked, it searches the episodes of current subscriptions instead (locally, no network).
+
+    As-you-type, a Debounced message is posted once typing pauses (rather than for every keystroke).
     """
 
+    DEBOUNCE_SECONDS = 0.5
+    MIN_SEARCH_LENGTH = 3
+
+    class Debounced(Message):
+        """the search text, once typing has paused"""
+
+        def __init__(self, value: str) -> None:
+            """initialize the message with the search text"""
+            super().__init__()
+            self.value = value
+
     DEFAULT_CSS = """
     SearchInput {
         height: auto;
@@ -26,9 +43,57 @@ class SearchInput(Widget):
         height: 1;
         width: 1fr;
     }
+
+    SearchInput #searchEpisodes {
+        border: none !important;
+        height: 1;
+        padding: 0 1;
+    }
     """
 
+    def __init__(self, as_you_type: bool = True) -> None:
+        """initialize the widget (optionally, without as-you-type searches)"""
+        super().__init__()
+        self.as_you_type = as_you_type
+        self._debounce_timer = None
+        self._searched_value = ""
+
     def compose(self) -> ComposeResult:
         """build the widget"""
         yield Label("Search", id="searchLabel")
         yield Input(id="searchInput")
+        yield Checkbox("episodes", id="searchEpisodes")
+
+    @property
+    def search_episodes(self) -> bool:
+        """whether searches are for (subscribed) episodes rather than podcasts"""
+        return self.query_one("#searchEpisodes", Checkbox).value
+
+    @on(Input.Changed, "#searchInput")
+    def _search_input_changed(self, event: Input.Changed) -> None:
+        """(re)start the debounce timer, so only a pause in typing triggers a search"""
+        self._cancel_debounce()
+
+        if self.as_you_type and len(event.value.strip()) >= self.MIN_SEARCH_LENGTH:
+            self._debounce_timer = self.set_timer(self.DEBOUNCE_SECONDS, self._debounce_elapsed)
+
+    @on(Input.Submitted, "#searchInput")
+    def _search_input_submitted(self, event: Input.Submitted) -> None:
+        """a submitted search makes a pending as-you-type search redundant (the app handles the submission)"""
+        self._cancel_debounce()
+        self._searched_value = event.value
+
+    def _debounce_elapsed(self) -> None:
+        """typing paused, so search for the current text (unless it was just searched for)"""
+        self._debounce_timer = None
+
+        value = self.query_one("#searchInput", Input).value
+        if value != self._searched_value:
+            self._searched_value = value
+            self.post_message(self.Debounced(value))
+
+    def _cancel_debounce(self) -> None:
+        """stop a pending as-you-type search"""
+        if not self._debounce_timer is None:
+            self._debounce_timer.stop()
+            self._debounce_timer = None